@@ -138,6 +138,8 @@ export const mapUser = (user: any): UserGetDto => ({
   username: user.username,
   pfp_path: user.pfp_path,
   banner_path: user.banner_path,
+  pfp_variants: user.pfp_variants,
+  banner_variants: user.banner_variants,
   groups: user.groups,
   tickets: user.tickets,
 });
@@ -4,7 +4,7 @@ import api from "../config/axios";
 import {
   type GroupGetDto,
   type ApiResponse,
-  type UserGetDto,
+  type UserNameDto,
 } from "../constants/types";
 import { notifications } from "@mantine/notifications";
 import { useEffect, useMemo, useState } from "react";
@@ -17,7 +17,7 @@ export const AddUserModal = ({
   groupid: number;
   onSubmit: (updatedGroup: GroupGetDto) => void;
 }>) => {
-  const [users, setUsers] = useState<UserGetDto[]>();
+  const [users, setUsers] = useState<UserNameDto[]>();
   const usernames = useMemo(() => {
     return users?.flatMap((user) => user.username);
   }, [users]);
@@ -44,7 +44,9 @@ export const AddUserModal = ({
   };
 
   const fetchUsers = async () => {
-    const response = await api.get<ApiResponse<UserGetDto[]>>(`/users/`);
+    const response = await api.getAll<UserNameDto>(
+      `/users/?fields=id,username`
+    );
 
     if (response.data.has_errors) {
       notifications.show({
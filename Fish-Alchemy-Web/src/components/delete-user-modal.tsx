@@ -1,12 +1,12 @@
 import { modals, type ContextModalProps } from "@mantine/modals";
 import { useEffect, useMemo, useState } from "react";
-import type { ApiResponse, UserGetDto } from "../constants/types";
+import type { ApiResponse, UserNameDto } from "../constants/types";
 import api from "../config/axios";
 import { notifications } from "@mantine/notifications";
 import { Button, Flex, Select, Text } from "@mantine/core";
 
 export const UserDeleteModal = ({ context, id }: ContextModalProps<{}>) => {
-  const [users, setUsers] = useState<UserGetDto[]>();
+  const [users, setUsers] = useState<UserNameDto[]>();
   const usernames = useMemo(() => {
     return users?.flatMap((user) => user.username);
   }, [users]);
@@ -36,7 +36,9 @@ export const UserDeleteModal = ({ context, id }: ContextModalProps<{}>) => {
   };
 
   const fetchUsers = async () => {
-    const response = await api.get<ApiResponse<UserGetDto[]>>(`/users/`);
+    const response = await api.getAll<UserNameDto>(
+      `/users/?fields=id,username`
+    );
 
     if (response.data.has_errors) {
       notifications.show({
@@ -5,6 +5,7 @@ import {
   TicketState,
   type TicketShallowDto,
   type ColumnType,
+  type TicketMoveDto,
 } from "../constants/types";
 import { useMemo, useState } from "react";
 import {
@@ -29,6 +30,7 @@ import {
   faCalendarDays,
   faFilter,
   faHashtag,
+  faListOl,
   faPlus,
   faSearch,
   faSeedling,
@@ -36,6 +38,10 @@ import {
 } from "@fortawesome/free-solid-svg-icons";
 import { modals } from "@mantine/modals";
 
+// ranks compare byte by byte, ties fall back to id like the server's order
+const byRank = (a: TicketShallowDto, b: TicketShallowDto) =>
+  a.rank < b.rank ? -1 : a.rank > b.rank ? 1 : a.id - b.id;
+
 interface KanbanBoardProps {
   tickets?: TicketShallowDto[];
   projectid: number;
@@ -52,38 +58,47 @@ export const KanbanBoard: React.FC<KanbanBoardProps> = ({
       id: "todo",
       title: "To Do",
       state: TicketState.BACKLOG,
-      tickets: tickets?.filter((ticket) => {
-        return ticket.state === TicketState.BACKLOG;
-      })!,
+      tickets: tickets
+        ?.filter((ticket) => {
+          return ticket.state === TicketState.BACKLOG;
+        })
+        .sort(byRank)!,
     },
     {
       id: "inprogress",
       title: "In Progress",
       state: TicketState.INPROGRESS,
-      tickets: tickets?.filter((ticket) => {
-        return ticket.state === TicketState.INPROGRESS;
-      })!,
+      tickets: tickets
+        ?.filter((ticket) => {
+          return ticket.state === TicketState.INPROGRESS;
+        })
+        .sort(byRank)!,
     },
     {
       id: "inreview",
       title: "In Review",
       state: TicketState.REVIEW,
-      tickets: tickets?.filter((ticket) => {
-        return ticket.state === TicketState.REVIEW;
-      })!,
+      tickets: tickets
+        ?.filter((ticket) => {
+          return ticket.state === TicketState.REVIEW;
+        })
+        .sort(byRank)!,
     },
     {
       id: "finished",
       title: "Finished",
       state: TicketState.FINISHED,
-      tickets: tickets?.filter((ticket) => {
-        return ticket.state === TicketState.FINISHED;
-      })!,
+      tickets: tickets
+        ?.filter((ticket) => {
+          return ticket.state === TicketState.FINISHED;
+        })
+        .sort(byRank)!,
     },
   ];
   const [columns, setColumns] = useState(initialColumns);
   const [activeId, setActiveId] = useState<UniqueIdentifier | null>(null);
   const [ascending, setAscending] = useState(true);
+  const [ranked, setRanked] = useState(true);
   const [search, setSearch] = useState("");
   const filteredColumns = useMemo(() => {
     if (!search.trim()) return columns;
@@ -147,7 +162,20 @@ export const KanbanBoard: React.FC<KanbanBoardProps> = ({
     });
   };
 
+  const sortRank = () => {
+    setRanked(true);
+    setColumns((columns) => {
+      const next = structuredClone(columns);
+      next.forEach((column) => {
+        column.tickets.sort(byRank);
+        if (!ascending) column.tickets.reverse();
+      });
+      return next;
+    });
+  };
+
   const sortName = () => {
+    setRanked(false);
     setColumns((columns) => {
       const next = structuredClone(columns);
       next.forEach((column) => {
@@ -162,6 +190,7 @@ export const KanbanBoard: React.FC<KanbanBoardProps> = ({
   };
 
   const sortNum = () => {
+    setRanked(false);
     setColumns((columns) => {
       const next = structuredClone(columns);
       next.forEach((column) => {
@@ -176,6 +205,7 @@ export const KanbanBoard: React.FC<KanbanBoardProps> = ({
   };
 
   const sortUsername = () => {
+    setRanked(false);
     setColumns((columns) => {
       const next = structuredClone(columns);
       next.forEach((column) => {
@@ -190,6 +220,7 @@ export const KanbanBoard: React.FC<KanbanBoardProps> = ({
   };
 
   const sortDuedate = () => {
+    setRanked(false);
     setColumns((columns) => {
       const next = structuredClone(columns);
       next.forEach((column) => {
@@ -214,13 +245,20 @@ export const KanbanBoard: React.FC<KanbanBoardProps> = ({
     setAscending(!ascending);
   };
 
-  const changeTicketState = async (
+  const moveTicket = async (
     ticket: TicketShallowDto,
-    state: TicketState
+    state: TicketState,
+    previous?: TicketShallowDto,
+    next?: TicketShallowDto
   ) => {
+    const move: TicketMoveDto = {
+      state: state,
+      previous_id: previous?.id ?? null,
+      next_id: next?.id ?? null,
+    };
     const response = await api.patch<ApiResponse<TicketGetDto>>(
-      `/tickets/${ticket.id}/state`,
-      { state: state }
+      `/tickets/${ticket.id}/move`,
+      move
     );
 
     if (response.data.has_errors) {
@@ -248,11 +286,13 @@ export const KanbanBoard: React.FC<KanbanBoardProps> = ({
 
     if (response.data.data) {
       ticket.state = response.data.data.state;
+      ticket.rank = response.data.data.rank;
       setColumns((columns) => {
         const next = structuredClone(columns);
         const col = next.find((column) => column.state === state)!;
         const tick = col.tickets.find((t) => t.id === ticket.id)!;
         tick.state = ticket.state;
+        tick.rank = ticket.rank;
         return next;
       });
     }
@@ -323,27 +363,46 @@ export const KanbanBoard: React.FC<KanbanBoardProps> = ({
       return;
     }
 
+    if (!ranked || !ascending) {
+      // the column isn't shown in rank order, so where it was dropped says nothing about its rank: a
+      // ticket changing column goes to the bottom of it and one staying put keeps its place
+      setActiveId(null);
+      const tick = activeColumn.tickets.find(
+        (ticket) => ticket.ticketnum === active.id
+      )!;
+      if (activeColumn.state !== tick.state) {
+        moveTicket(tick, activeColumn.state);
+      }
+      return;
+    }
+
+    const oldIndex = activeColumn.tickets.findIndex(
+      (ticket) => ticket.ticketnum === active.id
+    );
+    const newIndex = activeColumn.tickets.findIndex(
+      (ticket) => ticket.ticketnum === over.id
+    );
+    const ordered = arrayMove(activeColumn.tickets, oldIndex, newIndex);
+
     setColumns((columns) => {
       const next = structuredClone(columns);
       const column = next.find((column) => column.id === activeColumn.id)!;
-
-      const oldIndex = column.tickets.findIndex(
-        (ticket) => ticket.ticketnum === active.id
-      );
-      const newIndex = column.tickets.findIndex(
-        (ticket) => ticket.ticketnum === over.id
-      );
-
       column.tickets = arrayMove(column.tickets, oldIndex, newIndex);
       setActiveId(null);
       return next;
     });
 
-    const tick = columns
-      .flatMap((column) => column.tickets)
-      .find((ticket) => ticket.ticketnum === active.id)!;
-    if (activeColumn.state !== tick.state) {
-      changeTicketState(tick, activeColumn.state);
+    const position = ordered.findIndex(
+      (ticket) => ticket.ticketnum === active.id
+    );
+    const tick = ordered[position];
+    if (activeColumn.state !== tick.state || oldIndex !== newIndex) {
+      moveTicket(
+        tick,
+        activeColumn.state,
+        ordered[position - 1],
+        ordered[position + 1]
+      );
     }
   };
 
@@ -377,6 +436,12 @@ export const KanbanBoard: React.FC<KanbanBoardProps> = ({
             </Menu.Target>
             <Menu.Dropdown>
               <Menu.Label>Sort By</Menu.Label>
+              <Menu.Item
+                leftSection={<FontAwesomeIcon icon={faListOl} />}
+                onClick={() => sortRank()}
+              >
+                Rank
+              </Menu.Item>
               <Menu.Item
                 leftSection={<FontAwesomeIcon icon={faSeedling} />}
                 onClick={() => sortName()}
@@ -56,7 +56,7 @@ export const NavBar: React.FC<NavBarProps> = ({ user }) => {
       >
         <Flex align="center">
           <Avatar
-            src={`${baseurl}${user?.pfp_path}`}
+            src={`${baseurl}${user?.pfp_variants["64"]}`}
             onClick={() => navigate(routes.user.replace(":id", `${user?.id}`))}
             style={{ cursor: "pointer" }}
           />
@@ -114,7 +114,7 @@ export const TicketDraggable: React.FC<TicketDraggableProps> = ({
         <HoverCard shadow="sm" openDelay={250}>
           <HoverCard.Target>
             <Avatar
-              src={baseurl + ticket?.user.pfp_path!}
+              src={baseurl + ticket?.user.pfp_variants["64"]}
               style={{ cursor: "pointer" }}
               onClick={() =>
                 navigate(routes.user.replace(":id", `${ticket?.user.id}`))
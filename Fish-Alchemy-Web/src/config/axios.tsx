@@ -3,6 +3,7 @@ import axios, { AxiosError } from "axios";
 import type { AxiosResponse } from "axios";
 import { EnvVars } from "./env-vars";
 import type { FileWithPath } from "@mantine/dropzone";
+import type { ApiResponse } from "../constants/types";
 
 const baseurl = EnvVars.apiBaseUrl;
 
@@ -84,6 +85,25 @@ function get<T>(route: string) {
   return axiosInstance.get<T>(url, { withCredentials: true });
 }
 
+// follows next_cursor until the list runs out, a page at a time at the server's largest limit
+async function getAll<T>(route: string) {
+  const separator = route.includes("?") ? "&" : "?";
+  const url = baseurl + route + separator + "limit=500";
+  let response = await axiosInstance.get<ApiResponse<T[]>>(url, {
+    withCredentials: true,
+  });
+  const items = response.data.data ?? [];
+  while (!response.data.has_errors && response.data.next_cursor) {
+    response = await axiosInstance.get<ApiResponse<T[]>>(
+      url + "&after=" + encodeURIComponent(response.data.next_cursor),
+      { withCredentials: true }
+    );
+    items.push(...(response.data.data ?? []));
+  }
+  response.data.data = items;
+  return response;
+}
+
 function put<T>(route: string, data: any) {
   var url = baseurl + route;
   return axiosInstance.put<T>(url, data, { withCredentials: true });
@@ -114,6 +134,7 @@ function patchf<T>(route: string, file: FileWithPath) {
 type Api = {
   post<T>(route: string, data?: any): Promise<AxiosResponse<T>>;
   get<T>(url: string): Promise<AxiosResponse<T>>;
+  getAll<T>(route: string): Promise<AxiosResponse<ApiResponse<T[]>>>;
   delete<T>(route: string): Promise<AxiosResponse<T>>;
   put<T>(route: string, data: any): Promise<AxiosResponse<T>>;
   patch<T>(route: string, data: any): Promise<AxiosResponse<T>>;
@@ -124,6 +145,7 @@ type Api = {
 const api = {} as Api;
 
 api.get = get;
+api.getAll = getAll;
 api.put = put;
 api.patch = patch;
 api.post = post;
@@ -4,6 +4,7 @@ export interface ApiResponse<T> {
   data: T;
   errors: ApiError[];
   has_errors: boolean;
+  next_cursor?: string | null;
 }
 
 export interface ApiError {
@@ -11,6 +12,9 @@ export interface ApiError {
   message: string;
 }
 
+// resized webp copies of an image keyed by size in px ("32", "64", "256") or banner width ("640", "1280")
+export type MediaVariants = Record<string, string>;
+
 //user types --------------------------------------------------------------------------------
 
 export enum UserRole {
@@ -23,6 +27,8 @@ export interface UserGetDto {
   username: string;
   pfp_path: string;
   banner_path: string;
+  pfp_variants: MediaVariants;
+  banner_variants: MediaVariants;
   groups: GroupShallowDto[];
   tickets: TicketShallowDto[];
 }
@@ -43,11 +49,15 @@ export interface UserUpdateDto {
   username: string;
 }
 
+export type UserNameDto = Pick<UserGetDto, "id" | "username">;
+
 export interface UserShallowDto {
   id: number;
   username: string;
   pfp_path: string;
   banner_path: string;
+  pfp_variants: MediaVariants;
+  banner_variants: MediaVariants;
 }
 
 //Group types ----------------------------------------------------------------------------------
@@ -57,6 +67,8 @@ export interface GroupGetDto {
   name: string;
   logo_path: string;
   banner_path: string;
+  logo_variants: MediaVariants;
+  banner_variants: MediaVariants;
   creator: UserShallowDto;
   users: UserShallowDto[];
   projects: ProjectShallowDto[];
@@ -74,6 +86,7 @@ export interface GroupShallowDto {
   id: number;
   name: string;
   logo_path: string;
+  logo_variants: MediaVariants;
   creatorid: number;
 }
 
@@ -89,6 +102,8 @@ export interface ProjectGetDto {
   github_url: string;
   logo_path: string;
   banner_path: string;
+  logo_variants: MediaVariants;
+  banner_variants: MediaVariants;
   group: GroupShallowDto;
   tickets: TicketShallowDto[];
   graphs: GraphShallowDto[];
@@ -112,6 +127,7 @@ export interface ProjectShallowDto {
   id: number;
   name: string;
   logo_path: string;
+  logo_variants: MediaVariants;
   lead: UserShallowDto;
 }
 
@@ -133,6 +149,7 @@ export interface TicketGetDto {
   github_url: string;
   created_at: string;
   duedate: string;
+  rank: string;
   user: UserShallowDto;
   project: ProjectShallowDto;
 }
@@ -157,6 +174,12 @@ export interface TicketDateDto {
   date: string;
 }
 
+export interface TicketMoveDto {
+  state: TicketState;
+  previous_id?: number | null;
+  next_id?: number | null;
+}
+
 export interface TicketShallowDto {
   id: number;
   name: string;
@@ -166,11 +189,19 @@ export interface TicketShallowDto {
   github_url: string;
   created_at: string;
   duedate: string;
+  rank: string;
   projectid: number;
   projectname: string;
   user: UserShallowDto;
 }
 
+export interface TicketBoardColumnDto {
+  state: TicketState;
+  count: number;
+  tickets: TicketGetDto[];
+  next_cursor?: string | null;
+}
+
 //Graph Types ---------------------------------------------------------------------------------------
 
 export interface GraphGetDto {
@@ -196,6 +227,15 @@ export interface GraphShallowDto {
   name: string;
 }
 
+export interface GraphSnapshotDto {
+  id: number;
+  name: string;
+  version: number;
+  ids: number[];
+  names: string[];
+  edges: number[];
+}
+
 //Node Types ---------------------------------------------------------------------------------------------------
 
 export interface NodeGetDto {
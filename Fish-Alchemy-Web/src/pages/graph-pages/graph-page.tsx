@@ -2,6 +2,7 @@ import { useNavigate, useParams } from "react-router-dom";
 import api from "../../config/axios";
 import {
   type NodeGetDto,
+  type GraphSnapshotDto,
   type ApiResponse,
   type GraphGetDto,
 } from "../../constants/types";
@@ -190,8 +191,8 @@ export const GraphPage = () => {
   };
 
   const fetchNodes = async () => {
-    const response = await api.get<ApiResponse<NodeGetDto[]>>(
-      `/nodes/graph/${id}`
+    const response = await api.get<ApiResponse<GraphSnapshotDto>>(
+      `/graphs/${id}/snapshot`
     );
 
     if (response.data.has_errors) {
@@ -203,23 +204,27 @@ export const GraphPage = () => {
     }
 
     if (response.data.data) {
-      const nodes = response.data.data.map((node, index) => ({
-        id: node.id.toString(),
+      const snapshot = response.data.data;
+      const nodes = snapshot.ids.map((nodeid, index) => ({
+        id: nodeid.toString(),
         type: "editable",
         data: {
-          label: node.name,
+          label: snapshot.names[index],
           bgcol: nodebg,
           onEdit: (id: string, name: string) => openNodeEditModal(id, name),
         },
         position: { x: 100 * index, y: 50 * index },
       }));
-      const edges = response.data.data.flatMap((node) =>
-        node.dependencies.map((dependency) => ({
-          id: `${dependency.id}-${node.id}`,
-          source: dependency.id.toString(),
-          target: node.id.toString(),
-        }))
-      );
+      const edges: Edge[] = [];
+      for (let i = 0; i < snapshot.edges.length; i += 2) {
+        const dependency = snapshot.edges[i];
+        const dependent = snapshot.edges[i + 1];
+        edges.push({
+          id: `${dependency}-${dependent}`,
+          source: dependency.toString(),
+          target: dependent.toString(),
+        });
+      }
       const g = new dagre.graphlib.Graph();
       g.setGraph({ rankdir: "TB" });
       g.setDefaultEdgeLabel(() => ({}));
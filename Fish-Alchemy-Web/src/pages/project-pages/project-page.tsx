@@ -289,7 +289,7 @@ export const ProjectPage = () => {
                 <HoverCard.Target>
                   <Avatar
                     style={{ cursor: "pointer", marginLeft: "10px" }}
-                    src={baseurl + project?.lead.pfp_path!}
+                    src={baseurl + project?.lead.pfp_variants["64"]}
                     onClick={() =>
                       navigate(
                         routes.user.replace(":id", `${project?.lead.id}`)
@@ -491,7 +491,7 @@ export const ProjectPage = () => {
                     <HoverCard shadow="sm" openDelay={250}>
                       <HoverCard.Target>
                         <Avatar
-                          src={baseurl + ticket?.user.pfp_path!}
+                          src={baseurl + ticket?.user.pfp_variants["64"]}
                           style={{ cursor: "pointer" }}
                           onClick={() =>
                             navigate(
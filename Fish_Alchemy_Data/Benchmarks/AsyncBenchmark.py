@@ -0,0 +1,126 @@
+import argparse
+import asyncio
+import time
+
+from Fish_Alchemy_Data.Benchmarks.Harness import use_scratch_database, summarize, Server, write_results
+
+def seed(projects: int, tickets_per_project: int, nodes_per_graph: int) -> None:
+    from Fish_Alchemy_Data.database import db_session
+    from Fish_Alchemy_Data.Common.TicketState import TicketState
+    from Fish_Alchemy_Data.Entities.Groups import Group
+    from Fish_Alchemy_Data.Entities.Projects import Project
+    from Fish_Alchemy_Data.Entities.Tickets import Ticket
+    from Fish_Alchemy_Data.Entities.Graphs import Graph
+    from Fish_Alchemy_Data.Entities.Nodes import Node
+
+    with db_session() as db:
+        group = Group(name="bench", creator_id=1)
+        db.add(group)
+        for i in range(projects):
+            project = Project(name=f"project {i}", description="", discord_webhook_url="", github_url="", lead_id=1, group=group, ticket_count=tickets_per_project)
+            project.tickets = [Ticket(name=f"ticket {j}", description="", ticketnum=j + 1, state=list(TicketState)[j % len(TicketState)], github_url="", user_id=1) for j in range(tickets_per_project)]
+            project.graphs = [Graph(name="graph", description="", nodes=[Node(name=f"node {k}") for k in range(nodes_per_graph)])]
+            db.add(project)
+        db.commit()
+
+def sync_router():
+    # the threadpool-bound versions of the converted reads, kept here as the baseline they are measured against
+    from fastapi import APIRouter, Depends
+    from sqlalchemy.orm import Session
+    from Fish_Alchemy_Data.database import get_db
+    from Fish_Alchemy_Data.Common.Response import Response
+    from Fish_Alchemy_Data.Common.FastJSON import FastJSONRoute
+    from Fish_Alchemy_Data.Common.Fields import FieldSelection
+    from Fish_Alchemy_Data.Common.Pagination import paginate
+    from Fish_Alchemy_Data.Controllers import TicketsController, ProjectsController
+    from Fish_Alchemy_Data.Entities.Tickets import Ticket, TicketGetDto
+    from Fish_Alchemy_Data.Entities.Projects import Project, ProjectGetDto
+
+    router = APIRouter(prefix="/bench/sync", route_class=FastJSONRoute)
+
+    @router.get("/tickets/")
+    def get_tickets(limit: int = 50, db: Session = Depends(get_db)):
+        response = Response()
+        selection = FieldSelection(TicketGetDto, TicketsController.EXPANSIONS)
+        tickets, response.next_cursor = paginate(db.query(Ticket).options(*selection.options), "id", TicketsController.SORTABLE, Ticket.id, limit, None)
+        response.data = [selection.render(ticket) for ticket in tickets]
+        return response
+
+    @router.get("/projects/{id}")
+    def get_project(id: int, db: Session = Depends(get_db)):
+        response = Response()
+        selection = FieldSelection(ProjectGetDto, ProjectsController.EXPANSIONS)
+        project = db.query(Project).options(*selection.options).filter(Project.id == id).first()
+        response.data = selection.render(project)
+        return response
+
+    return router
+
+class ThreadLimited():
+    # anyio's threadpool limiter belongs to the server's event loop, so it is sized from inside it
+    def __init__(self, app, threads: int):
+        self.app = app
+        self.threads = threads
+        self.configured = False
+
+    async def __call__(self, scope, receive, send):
+        if not self.configured:
+            from anyio import to_thread
+            to_thread.current_default_thread_limiter().total_tokens = self.threads
+            self.configured = True
+        await self.app(scope, receive, send)
+
+async def drive(url: str, paths: list, concurrency: int, duration: float) -> dict:
+    import httpx
+
+    samples = []
+    deadline = time.perf_counter() + duration
+
+    async def client(i: int, http):
+        n = i
+        while time.perf_counter() < deadline:
+            path = paths[n % len(paths)]
+            n += 1
+            start = time.perf_counter()
+            r = await http.get(url + path)
+            r.raise_for_status()
+            samples.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as http:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(i, http) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return summarize(samples, elapsed)
+
+def main():
+    parser = argparse.ArgumentParser(description="sync Session in the threadpool versus AsyncSession on the event loop, same process, threadpool and connection pool")
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--tickets-per-project", type=int, default=40)
+    parser.add_argument("--nodes-per-graph", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=40, help="anyio threadpool size, the sync path's worker count")
+    parser.add_argument("--concurrency", default="1,8,32,128")
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    use_scratch_database()
+    from Fish_Alchemy_Data.main import app
+    app.include_router(sync_router())
+
+    routes = {
+        "sync": ["/bench/sync/tickets/?limit=50", "/bench/sync/projects/{id}"],
+        "async": ["/api/tickets/?limit=50", "/api/projects/{id}"],
+    }
+    results = {"threads": args.threads, "projects": args.projects, "tickets_per_project": args.tickets_per_project}
+    with Server(ThreadLimited(app, args.threads)) as server:
+        seed(args.projects, args.tickets_per_project, args.nodes_per_graph)
+        for mode, templates in routes.items():
+            paths = [template.format(id=i % args.projects + 1) for template in templates for i in range(args.projects)]
+            results[mode] = {}
+            for concurrency in (int(c) for c in args.concurrency.split(",")):
+                results[mode][f"concurrency {concurrency}"] = asyncio.run(drive(server.url, paths, concurrency, args.duration))
+    write_results(args.output, results)
+
+if __name__ == "__main__":
+    main()
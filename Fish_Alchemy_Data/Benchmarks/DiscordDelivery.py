@@ -0,0 +1,122 @@
+import argparse
+import sys
+import threading
+import time
+
+from Fish_Alchemy_Data.Benchmarks.Harness import Server, write_results
+
+def stub_webhook(scripts: dict):
+    # stands in for discord: each webhook answers with its scripted responses in turn, then 204s, and every
+    # request is recorded with the time it arrived
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse, Response
+
+    app = FastAPI()
+    received = {}
+    lock = threading.Lock()
+
+    @app.post("/webhooks/{name}")
+    async def webhook(name: str, request: Request):
+        body = await request.json()
+        with lock:
+            calls = received.setdefault(name, [])
+            script = scripts.get(name, [])
+            status, content = script[len(calls)] if len(calls) < len(script) else (204, None)
+            calls.append({"at": time.monotonic(), "status": status, "body": body})
+        if content is None:
+            return Response(status_code=status)
+        return JSONResponse(content, status_code=status)
+
+    return app, received
+
+def titles(calls: list) -> list:
+    return [[embed["title"] for embed in call["body"]["embeds"]] for call in calls if call["status"] < 300]
+
+def payload(username: str, title: str) -> dict:
+    from Fish_Alchemy_Data.Common.Payload import Payload
+    return Payload(username=username, title=title, description="", color=0).to_json()
+
+def rate_limited(url: str, received: dict, retry_after: float, window: float) -> tuple:
+    # a burst bigger than one message, then a rename part way through; the 429 must hold everything back
+    # until retry_after has passed and nothing may be lost or reordered
+    from Fish_Alchemy_Data.Common.Payload import DiscordDispatcher, MAX_EMBEDS
+    dispatcher = DiscordDispatcher(coalesce_window=window)
+    sent = [("fish", f"m{n}") for n in range(MAX_EMBEDS + 5)] + [("alchemy", f"m{n}") for n in range(MAX_EMBEDS + 5, MAX_EMBEDS + 8)]
+    for username, title in sent:
+        dispatcher.enqueue(f"{url}/webhooks/limited", payload(username, title))
+    dispatcher.stop(timeout=retry_after + 10)
+    calls = received.get("limited", [])
+    delivered = titles(calls)
+    stats = dispatcher.stats()
+    problems = []
+    if [title for message in delivered for title in message] != [title for _, title in sent]:
+        problems.append("messages arrived out of order or went missing")
+    if [len(message) for message in delivered] != [MAX_EMBEDS, 5, 3]:
+        problems.append(f"expected batches of {MAX_EMBEDS}, 5 and 3 embeds, got {[len(message) for message in delivered]}")
+    if len(calls) > 1 and calls[1]["at"] - calls[0]["at"] < retry_after:
+        problems.append("sent again before retry_after had passed")
+    expected = {"sent_messages": 3, "sent_embeds": len(sent), "rate_limited": 1, "retries": 0, "failed": 0, "queue_depth": 0}
+    problems += [f"{key} was {stats[key]}, expected {value}" for key, value in expected.items() if stats[key] != value]
+    return {"requests": len(calls), "batches": [len(message) for message in delivered], "stats": stats}, problems
+
+def retry_limit(url: str, received: dict, window: float) -> tuple:
+    # a webhook that only ever errors is given up on after max_attempts, and counted as failed
+    from Fish_Alchemy_Data.Common.Payload import DiscordDispatcher
+    dispatcher = DiscordDispatcher(coalesce_window=window, max_attempts=2)
+    dispatcher.enqueue(f"{url}/webhooks/down", payload("fish", "lost"))
+    dispatcher.stop(timeout=10)
+    stats = dispatcher.stats()
+    problems = []
+    if len(received.get("down", [])) != 2:
+        problems.append(f"expected 2 attempts, got {len(received.get('down', []))}")
+    expected = {"sent_messages": 0, "retries": 1, "failed": 1, "queue_depth": 0}
+    problems += [f"{key} was {stats[key]}, expected {value}" for key, value in expected.items() if stats[key] != value]
+    return {"requests": len(received.get("down", [])), "stats": stats}, problems
+
+def drain(url: str, received: dict, window: float) -> tuple:
+    # stopping straight after a burst still delivers everything that was queued
+    from Fish_Alchemy_Data.Common.Payload import DiscordDispatcher
+    dispatcher = DiscordDispatcher(coalesce_window=window)
+    sent = [f"d{n}" for n in range(5)]
+    for title in sent:
+        dispatcher.enqueue(f"{url}/webhooks/drain", payload("fish", title))
+    dispatcher.stop(timeout=10)
+    stats = dispatcher.stats()
+    problems = []
+    if [title for message in titles(received.get("drain", [])) for title in message] != sent:
+        problems.append("not everything queued before stop() was delivered")
+    if dispatcher.thread.is_alive():
+        problems.append("dispatcher thread still running after stop()")
+    expected = {"sent_embeds": len(sent), "queue_depth": 0}
+    problems += [f"{key} was {stats[key]}, expected {value}" for key, value in expected.items() if stats[key] != value]
+    return {"requests": len(received.get("drain", [])), "stats": stats}, problems
+
+def main():
+    parser = argparse.ArgumentParser(description="deliver discord messages to a local stub webhook and check rate limits, coalescing, retries and the shutdown drain")
+    parser.add_argument("--retry-after", type=float, default=0.5)
+    parser.add_argument("--window", type=float, default=0.2, help="coalesce window in seconds")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    scripts = {
+        "limited": [(429, {"message": "You are being rate limited.", "retry_after": args.retry_after, "global": False})],
+        "down": [(502, None)] * 10,
+    }
+    app, received = stub_webhook(scripts)
+    results = {}
+    failed = []
+    with Server(app) as server:
+        for name, check in (
+            ("rate_limited", lambda: rate_limited(server.url, received, args.retry_after, args.window)),
+            ("retry_limit", lambda: retry_limit(server.url, received, args.window)),
+            ("drain", lambda: drain(server.url, received, args.window)),
+        ):
+            results[name], problems = check()
+            failed += [f"{name}: {problem}" for problem in problems]
+    write_results(args.output, {"retry_after": args.retry_after, "window": args.window, "checks": results})
+    if failed:
+        print("\n".join(failed), file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import sys
+
+from Fish_Alchemy_Data.Benchmarks.Harness import use_scratch_database, write_results
+
+def access_paths() -> dict:
+    from sqlalchemy import select
+    from Fish_Alchemy_Data.Common.TicketState import TicketState
+    from Fish_Alchemy_Data.Entities.UserGroups import UserGroup
+    from Fish_Alchemy_Data.Entities.Projects import Project
+    from Fish_Alchemy_Data.Entities.Tickets import Ticket
+    from Fish_Alchemy_Data.Entities.Graphs import Graph
+    from Fish_Alchemy_Data.Entities.Nodes import Node
+    from Fish_Alchemy_Data.Entities.NodeAssociation import NodeAssociation
+
+    # the statements the relationship loads and list endpoints send, with the index each one should search
+    return {
+        # both indexes leading with project_id serve this one, and SQLite names the unique constraint's index itself
+        "project tickets": (select(Ticket).where(Ticket.project_id == 1), ("ix_tickets_project_id_state_rank", "uq_tickets_project_id_ticketnum", "sqlite_autoindex_tickets_1")),
+        "project board column": (select(Ticket).where(Ticket.project_id == 1, Ticket.state == TicketState.INPROGRESS), "ix_tickets_project_id_state_rank"),
+        "project board column in order": (select(Ticket).where(Ticket.project_id == 1, Ticket.state == TicketState.BACKLOG).order_by(Ticket.rank, Ticket.id).limit(25), "ix_tickets_project_id_state_rank"),
+        "user tickets": (select(Ticket).where(Ticket.user_id == 1), "ix_tickets_user_id_state_duedate"),
+        "user open tickets by due date": (select(Ticket).where(Ticket.user_id == 1, Ticket.state == TicketState.BACKLOG).order_by(Ticket.duedate), "ix_tickets_user_id_state_duedate"),
+        "graph nodes": (select(Node).where(Node.graph_id == 1), "ix_nodes_graph_id"),
+        "project graphs": (select(Graph).where(Graph.project_id == 1), "ix_graphs_project_id"),
+        "group projects": (select(Project).where(Project.group_id == 1), "ix_projects_group_id"),
+        "node dependents": (select(NodeAssociation).where(NodeAssociation.dependency_id.in_([1, 2, 3])), "ix_node_associations_dependency_id"),
+        "group members": (select(UserGroup).where(UserGroup.group_id == 1), "ix_user_group_group_id"),
+    }
+
+def explain(connection, statement) -> list:
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    if connection.dialect.name == "sqlite":
+        return [row.detail for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+    return [f"{row.table}: {row.key}" for row in connection.exec_driver_sql(f"EXPLAIN {sql}")]
+
+def uses(plan: list, indexes) -> bool:
+    indexes = (indexes,) if isinstance(indexes, str) else indexes
+    return any(index in line.split() for line in plan for index in indexes)
+
+def main():
+    parser = argparse.ArgumentParser(description="migrate a database, seed it, and check that EXPLAIN picks the query-path indexes")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--tickets", type=int, default=20000)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    # DBSTRING may point at a MySQL-compatible stand-in; otherwise a scratch SQLite file is used
+    dbstring = use_scratch_database()
+    from sqlalchemy import text
+    from Fish_Alchemy_Data.database import engine
+    from Fish_Alchemy_Data.Jobs.GenerateData import generate
+
+    generate(args.users, max(1, args.users // 10), args.projects, args.tickets, args.projects, 20, seed=1)
+    results = {}
+    with engine.connect() as connection:
+        # the planner only prefers an index over a scan once it has statistics to go on
+        connection.execute(text("ANALYZE"))
+        for name, (statement, index) in access_paths().items():
+            plan = explain(connection, statement)
+            results[name] = {"index": index, "used": uses(plan, index), "plan": plan}
+    write_results(args.output, {"database": dbstring.split(":", 1)[0], "paths": results})
+    missed = [name for name, result in results.items() if not result["used"]]
+    if missed:
+        print(f"not using their index: {', '.join(missed)}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
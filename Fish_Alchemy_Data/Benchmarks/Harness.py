@@ -0,0 +1,66 @@
+import os
+import json
+import socket
+import tempfile
+import threading
+import time
+from typing import Optional
+
+def use_scratch_database() -> str:
+    # must run before anything imports Fish_Alchemy_Data.database
+    if not os.getenv("DBSTRING"):
+        path = os.path.join(tempfile.mkdtemp(prefix="fish-bench-"), "bench.db")
+        os.environ["DBSTRING"] = f"sqlite:///{path}"
+    os.environ.setdefault("URIELPASS", "bench")
+    from Fish_Alchemy_Data.Common.Schema import upgrade
+    upgrade()
+    return os.environ["DBSTRING"]
+
+def percentile(samples: list, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def summarize(samples: list, elapsed: float) -> dict:
+    return {
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+    }
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+class Server():
+    def __init__(self, app, port: Optional[int] = None):
+        import uvicorn
+        self.port = port or free_port()
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join()
+
+def write_results(path: Optional[str], results: dict) -> None:
+    text = json.dumps(results, indent=2)
+    print(text)
+    if path:
+        with open(path, "w") as f:
+            f.write(text)
@@ -0,0 +1,78 @@
+import argparse
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from Fish_Alchemy_Data.Benchmarks.Harness import use_scratch_database, summarize, Server, write_results
+
+def measure_scaling(logins: int, rounds: int) -> list:
+    from Fish_Alchemy_Data.Common.Hashing import PasswordHasher
+    results = []
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        hasher = PasswordHasher(workers=workers, max_pending=logins, rounds=rounds)
+        hashed = hasher.hash("password")
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers * 2) as threads:
+            list(threads.map(lambda _: hasher.check("password", hashed), range(logins)))
+        elapsed = time.perf_counter() - start
+        hasher.shutdown()
+        results.append({"workers": workers, "logins_per_second": round(logins / elapsed, 2)})
+        workers *= 2
+    return results
+
+def measure_storm(url: str, password: str, duration: float, storm_threads: int) -> dict:
+    import requests
+
+    def probe(stop: threading.Event, samples: list):
+        session = requests.Session()
+        while not stop.is_set():
+            start = time.perf_counter()
+            session.get(f"{url}/api/projects/")
+            samples.append(time.perf_counter() - start)
+
+    def login(stop: threading.Event, samples: list):
+        session = requests.Session()
+        while not stop.is_set():
+            start = time.perf_counter()
+            session.post(f"{url}/api/auth/login", json={"username": "Uriel", "password": password})
+            samples.append(time.perf_counter() - start)
+
+    results = {}
+    for phase, logins in (("quiet", 0), ("login_storm", storm_threads)):
+        stop = threading.Event()
+        probe_samples, login_samples = [], []
+        threads = [threading.Thread(target=probe, args=(stop, probe_samples))]
+        threads += [threading.Thread(target=login, args=(stop, login_samples)) for _ in range(logins)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        results[phase] = {"GET /api/projects/": summarize(probe_samples, elapsed)}
+        if logins:
+            results[phase]["POST /api/auth/login"] = summarize(login_samples, elapsed)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="bcrypt offload benchmark: login throughput per worker count and endpoint latency during a login storm")
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--storm-threads", type=int, default=64)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    use_scratch_database()
+    from Fish_Alchemy_Data.main import app
+    results = {"scaling": measure_scaling(args.logins, args.rounds)}
+    with Server(app) as server:
+        results["storm"] = measure_storm(server.url, os.environ["URIELPASS"], args.duration, args.storm_threads)
+    write_results(args.output, results)
+
+if __name__ == "__main__":
+    main()
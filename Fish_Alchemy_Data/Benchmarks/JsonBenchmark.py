@@ -0,0 +1,80 @@
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from Fish_Alchemy_Data.Benchmarks.Harness import use_scratch_database, write_results
+
+def build_lists(tickets: int, projects: int, tickets_per_project: int) -> dict:
+    from Fish_Alchemy_Data.Common.TicketState import TicketState
+    from Fish_Alchemy_Data.Entities.Users import User
+    from Fish_Alchemy_Data.Entities.Groups import Group
+    from Fish_Alchemy_Data.Entities.Projects import Project
+    from Fish_Alchemy_Data.Entities.Tickets import Ticket
+
+    # transient entities are enough to drive the real toGetDto code without a database
+    now = datetime.now()
+    users = [User(id=i, username=f"user{i}", pfp_path=f"/media/store/00/00/{i:064x}.png", banner_path="/media/user/banner/default.jpg") for i in range(50)]
+    group = Group(id=1, name="group", logo_path="/media/group/logo/default.png", banner_path="/media/group/banner/default.png", creator=users[0])
+
+    def ticket(i: int, project: Project) -> Ticket:
+        return Ticket(id=i, name=f"ticket {i}", description="lorem ipsum dolor sit amet " * 8, ticketnum=i, state=list(TicketState)[i % len(TicketState)], github_url="https://github.com/example/repo/issues/1", created_at=now, duedate=now + timedelta(days=i % 30), user=users[i % len(users)], project=project)
+
+    def project(i: int) -> Project:
+        return Project(id=i, name=f"project {i}", description="project description " * 4, ticket_count=0, discord_webhook_url="", github_url="", logo_path="/media/project/logo/default.png", banner_path="/media/project/banner/default.jpg", lead=users[i % len(users)], group=group)
+
+    shared = project(0)
+    project_list = [project(i) for i in range(1, projects + 1)]
+    for p in project_list:
+        p.tickets = [ticket(p.id * tickets_per_project + j, p) for j in range(tickets_per_project)]
+        p.graphs = []
+    return {
+        f"GET /api/tickets/ ({tickets} tickets)": [ticket(i, shared).toGetDto() for i in range(tickets)],
+        f"GET /api/projects/ ({projects} projects x {tickets_per_project} tickets)": [p.toGetDto() for p in project_list],
+    }
+
+def time_encoder(encode, repeat: int) -> float:
+    encode()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        encode()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description="response encoding: fastapi's jsonable_encoder + JSONResponse versus FastJSONResponse")
+    parser.add_argument("--tickets", type=int, default=5000)
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--tickets-per-project", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    use_scratch_database()
+    import Fish_Alchemy_Data.main
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from Fish_Alchemy_Data.Common.Response import Response
+    from Fish_Alchemy_Data.Common.FastJSON import FastJSONResponse
+
+    results = {}
+    for name, dtos in build_lists(args.tickets, args.projects, args.tickets_per_project).items():
+        response = Response(data=dtos)
+        before = lambda: JSONResponse(jsonable_encoder(response)).body
+        after = lambda: FastJSONResponse(response).body
+        if json.loads(before()) != json.loads(after()):
+            raise SystemExit(f"{name}: encoders disagree")
+        before_seconds = time_encoder(before, args.repeat)
+        after_seconds = time_encoder(after, args.repeat)
+        results[name] = {
+            "bytes": len(after()),
+            "jsonable_encoder_ms": round(before_seconds * 1000, 2),
+            "fast_json_ms": round(after_seconds * 1000, 2),
+            "speedup": round(before_seconds / after_seconds, 1),
+        }
+    write_results(args.output, results)
+
+if __name__ == "__main__":
+    main()
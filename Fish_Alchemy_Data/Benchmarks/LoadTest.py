@@ -0,0 +1,171 @@
+import argparse
+import os
+import random
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+
+from Fish_Alchemy_Data.Benchmarks.Harness import use_scratch_database, summarize, Server, write_results
+
+PASSWORD = "load-test"
+
+# weights for what one virtual user does next, roughly what a browsing session sends
+DEFAULT_MIX = {
+    "login": 1,
+    "current_user": 3,
+    "project_page": 4,
+    "kanban_state": 3,
+    "graph_page": 1,
+    "graph_snapshot": 3,
+    "user_listing": 2,
+}
+
+@dataclass
+class Profile():
+    username: str
+    projects: list = field(default_factory=list)
+    graphs: list = field(default_factory=list)
+    tickets: list = field(default_factory=list) # tickets assigned to the user, which it may move
+
+def seed(users: int, groups: int, projects: int, tickets_per_project: int, nodes_per_graph: int, seed: int) -> dict:
+    from Fish_Alchemy_Data.Jobs.GenerateData import generate
+    return generate(users, groups, projects, projects * tickets_per_project, projects, nodes_per_graph, memberships=1, password=PASSWORD, seed=seed)
+
+def profiles(first_user: int, count: int) -> list:
+    from sqlalchemy import select
+    from Fish_Alchemy_Data.database import db_session
+    from Fish_Alchemy_Data.Entities.Users import User
+    from Fish_Alchemy_Data.Entities.UserGroups import UserGroup
+    from Fish_Alchemy_Data.Entities.Projects import Project
+    from Fish_Alchemy_Data.Entities.Tickets import Ticket
+    from Fish_Alchemy_Data.Entities.Graphs import Graph
+
+    result = []
+    with db_session() as db:
+        every_project = list(db.scalars(select(Project.id).limit(1000)))
+        every_graph = list(db.scalars(select(Graph.id).limit(1000)))
+        for user_id in range(first_user, first_user + count):
+            groups = select(UserGroup.group_id).where(UserGroup.user_id == user_id)
+            result.append(Profile(
+                username=db.scalar(select(User.username).where(User.id == user_id)),
+                projects=list(db.scalars(select(Project.id).where(Project.group_id.in_(groups)))) or every_project,
+                graphs=list(db.scalars(select(Graph.id).join(Project, Project.id == Graph.project_id).where(Project.group_id.in_(groups)))) or every_graph,
+                tickets=list(db.scalars(select(Ticket.id).where(Ticket.user_id == user_id).limit(200))),
+            ))
+    return result
+
+class VirtualUser():
+    def __init__(self, url: str, profile: Profile, rng: random.Random):
+        import requests
+        self.url = url
+        self.profile = profile
+        self.rng = rng
+        self.session = requests.Session()
+
+    def request(self, action: str):
+        profile = self.profile
+        if action == "login":
+            return self.session.post(f"{self.url}/api/auth/login", json={"username": profile.username, "password": PASSWORD})
+        if action == "current_user":
+            return self.session.get(f"{self.url}/api/auth/get-current-user")
+        if action == "project_page":
+            return self.session.get(f"{self.url}/api/projects/{self.rng.choice(profile.projects)}")
+        if action == "kanban_state":
+            return self.session.patch(f"{self.url}/api/tickets/{self.rng.choice(profile.tickets)}/state", json={"state": self.rng.choice(["backlog", "inprogress", "review", "finished"])})
+        if action == "graph_page":
+            return self.session.get(f"{self.url}/api/graphs/{self.rng.choice(profile.graphs)}")
+        if action == "graph_snapshot":
+            return self.session.get(f"{self.url}/api/graphs/{self.rng.choice(profile.graphs)}/snapshot")
+        if action == "user_listing":
+            return self.session.get(f"{self.url}/api/users/?fields=id,username")
+        raise ValueError(action)
+
+def run_mix(url: str, users: list, mix: dict, duration: float, seed: int) -> dict:
+    samples = {action: [] for action in mix}
+    errors = {action: 0 for action in mix}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def worker(index: int):
+        rng = random.Random(seed * 1000003 + index)
+        user = VirtualUser(url, users[index], rng)
+        user.request("login")
+        actions = [action for action in mix if action != "kanban_state" or user.profile.tickets]
+        weights = [mix[action] for action in actions]
+        while not stop.is_set():
+            action = rng.choices(actions, weights)[0]
+            start = time.perf_counter()
+            r = user.request(action)
+            elapsed = time.perf_counter() - start
+            with lock:
+                samples[action].append(elapsed)
+                if r.status_code >= 400:
+                    errors[action] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(len(users))]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    routes = {action: {**summarize(samples[action], elapsed), "errors": errors[action]} for action in mix}
+    every = [sample for action_samples in samples.values() for sample in action_samples]
+    return {"total": {**summarize(every, elapsed), "errors": sum(errors.values())}, "routes": routes}
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for part in value.split(","):
+        action, _, weight = part.partition("=")
+        if action not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown action {action}, expected one of {', '.join(DEFAULT_MIX)}")
+        mix[action] = float(weight or 1)
+    return mix
+
+def commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+def main():
+    parser = argparse.ArgumentParser(description="boot the app on a seeded database and drive a weighted route mix through it")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--groups", type=int, default=20)
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--tickets-per-project", type=int, default=50)
+    parser.add_argument("--nodes-per-graph", type=int, default=50)
+    parser.add_argument("--virtual-users", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="action=weight,... from " + ", ".join(DEFAULT_MIX))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    # DBSTRING may point at a MySQL-compatible stand-in; otherwise a scratch SQLite file is used
+    dbstring = use_scratch_database()
+    from Fish_Alchemy_Data.main import app
+    with Server(app) as server:
+        start = time.perf_counter()
+        generated = seed(args.users, args.groups, args.projects, args.tickets_per_project, args.nodes_per_graph, args.seed)
+        seconds = time.perf_counter() - start
+        seeded = profiles(generated["ids"]["users"][0], min(args.users, args.virtual_users))
+        users = [seeded[i % len(seeded)] for i in range(args.virtual_users)]
+        result = run_mix(server.url, users, args.mix, args.duration, args.seed)
+    write_results(args.output, {
+        "commit": commit(),
+        "database": dbstring.split(":", 1)[0],
+        "sizes": {"users": args.users, "groups": args.groups, "projects": args.projects, "tickets_per_project": args.tickets_per_project, "nodes_per_graph": args.nodes_per_graph},
+        "seed_seconds": round(seconds, 2),
+        "virtual_users": args.virtual_users,
+        "duration": args.duration,
+        "mix": args.mix,
+        "cpus": os.cpu_count(),
+        **result,
+    })
+
+if __name__ == "__main__":
+    main()
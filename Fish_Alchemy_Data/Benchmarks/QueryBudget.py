@@ -0,0 +1,99 @@
+import argparse
+import os
+import sys
+
+from Fish_Alchemy_Data.Benchmarks.Harness import use_scratch_database, write_results
+
+# the most statements each endpoint may send, whatever the size of the data behind it; a relationship that
+# loads lazily again shows up as a count growing with the rows
+BUDGETS = {
+    "GET /api/users/": 3,
+    "GET /api/users/{user}": 3,
+    "GET /api/groups/": 3,
+    "GET /api/groups/{group}": 4,
+    "GET /api/projects/": 3,
+    "GET /api/projects/{project}": 4,
+    "GET /api/projects/{project}/users": 2,
+    "GET /api/projects/{project}/board": 6,
+    "GET /api/tickets/": 1,
+    "GET /api/tickets/{ticket}": 2,
+    "GET /api/tickets/search?q=ticket": 1,
+    "GET /api/graphs/": 2,
+    "GET /api/graphs/{graph}": 3,
+    "GET /api/nodes/": 2,
+    "GET /api/nodes/graph/{graph}": 3,
+}
+
+def seed(users: int, projects: int, tickets: int) -> dict:
+    from sqlalchemy import select, insert
+    from Fish_Alchemy_Data.database import db_session
+    from Fish_Alchemy_Data.Jobs.GenerateData import generate
+    from Fish_Alchemy_Data.Entities.Users import User
+    from Fish_Alchemy_Data.Entities.UserGroups import UserGroup
+    from Fish_Alchemy_Data.Entities.Projects import Project
+    from Fish_Alchemy_Data.Entities.Tickets import Ticket
+    from Fish_Alchemy_Data.Entities.Graphs import Graph
+
+    generate(users, max(1, users // 10), projects, tickets, projects, 20, seed=1)
+    with db_session() as db:
+        user = db.scalar(select(User.id).where(User.username == "Uriel"))
+        project, group = db.execute(select(Project.id, Project.group_id).join(Graph, Graph.project_id == Project.id).order_by(Project.id).limit(1)).one()
+        # the admin joins one group so the scoped lists and lookups have rows to return
+        db.execute(insert(UserGroup).values(user_id=user, group_id=group))
+        db.commit()
+        return {
+            "user": user,
+            "group": group,
+            "project": project,
+            "ticket": db.scalar(select(Ticket.id).where(Ticket.project_id == project).limit(1)),
+            "graph": db.scalar(select(Graph.id).where(Graph.project_id == project).limit(1)),
+        }
+
+def count_queries(client, ids: dict) -> dict:
+    from sqlalchemy import event
+    from Fish_Alchemy_Data.database import engine, async_engine
+
+    counter = [0]
+
+    def count(*args):
+        counter[0] += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count)
+    results = {}
+    client.post("/api/auth/login", json={"username": "Uriel", "password": os.environ["URIELPASS"]})
+    for endpoint, budget in BUDGETS.items():
+        method, url = endpoint.split(" ")
+        # the first call also loads the session's principal, which later requests read from the cache
+        client.request(method, url.format(**ids))
+        counter[0] = 0
+        r = client.request(method, url.format(**ids))
+        results[endpoint] = {"status": r.status_code, "queries": counter[0], "budget": budget}
+    event.remove(engine, "before_cursor_execute", count)
+    event.remove(async_engine.sync_engine, "before_cursor_execute", count)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="seed a database and check no read endpoint sends more statements than its budget")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--tickets", type=int, default=5000)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    dbstring = use_scratch_database()
+    from fastapi.testclient import TestClient
+    from Fish_Alchemy_Data.main import app
+
+    # the app creates the admin account on startup
+    with TestClient(app) as client:
+        ids = seed(args.users, args.projects, args.tickets)
+        results = count_queries(client, ids)
+    write_results(args.output, {"database": dbstring.split(":", 1)[0], "endpoints": results})
+    failed = [f"{endpoint} ({result['queries']} > {result['budget']})" if result["status"] == 200 else f"{endpoint} (status {result['status']})" for endpoint, result in results.items() if result["status"] != 200 or result["queries"] > result["budget"]]
+    if failed:
+        print(f"over budget: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import argparse
+import sys
+import threading
+import time
+
+from Fish_Alchemy_Data.Benchmarks.Harness import use_scratch_database, summarize, Server, write_results
+
+PASSWORD = "stress-test"
+
+def create_tickets(url: str, cookies, projectid: int, creators: int, tickets_per_creator: int) -> dict:
+    import requests
+    samples = []
+    errors = []
+    lock = threading.Lock()
+    ready = threading.Barrier(creators)
+
+    def creator(index: int):
+        session = requests.Session()
+        session.cookies.update(cookies)
+        ready.wait()
+        for n in range(tickets_per_creator):
+            start = time.perf_counter()
+            r = session.post(f"{url}/api/tickets/project/{projectid}", json={"name": f"creator {index} ticket {n}", "description": "", "github_url": ""})
+            elapsed = time.perf_counter() - start
+            with lock:
+                samples.append(elapsed)
+                if r.status_code >= 400:
+                    errors.append(r.status_code)
+
+    threads = [threading.Thread(target=creator, args=(i,)) for i in range(creators)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {**summarize(samples, time.perf_counter() - start), "errors": len(errors)}
+
+def check_numbers(projectid: int) -> dict:
+    from sqlalchemy import select
+    from Fish_Alchemy_Data.database import db_session
+    from Fish_Alchemy_Data.Entities.Tickets import Ticket
+    from Fish_Alchemy_Data.Entities.Projects import Project
+
+    with db_session() as db:
+        numbers = list(db.scalars(select(Ticket.ticketnum).where(Ticket.project_id == projectid)))
+        counter = db.scalar(select(Project.ticket_count).where(Project.id == projectid))
+    distinct = set(numbers)
+    return {
+        "tickets": len(numbers),
+        "duplicates": len(numbers) - len(distinct),
+        "gaps": len(set(range(1, max(distinct, default=0) + 1)) - distinct),
+        "ticket_count": counter,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="create tickets in one project from many clients at once and check every ticket number is handed out once")
+    parser.add_argument("--creators", default="1,10,100", help="comma separated parallel creator counts, each run against its own project")
+    parser.add_argument("--tickets-per-creator", type=int, default=10)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+    levels = [int(level) for level in args.creators.split(",")]
+
+    # DBSTRING may point at a MySQL-compatible stand-in; otherwise a scratch SQLite file is used
+    dbstring = use_scratch_database()
+    import requests
+    from Fish_Alchemy_Data.main import app
+    from Fish_Alchemy_Data.Jobs.GenerateData import generate
+
+    # one user leading every project, so each creator can sign in as the same lead
+    generated = generate(1, 1, len(levels), 0, 0, 0, memberships=1, password=PASSWORD)
+    user = generated["ids"]["users"][0]
+    first_project = generated["ids"]["projects"][0]
+    results = {}
+    with Server(app) as server:
+        session = requests.Session()
+        session.post(f"{server.url}/api/auth/login", json={"username": f"user-{user}", "password": PASSWORD}).raise_for_status()
+        for offset, creators in enumerate(levels):
+            projectid = first_project + offset
+            latency = create_tickets(server.url, session.cookies, projectid, creators, args.tickets_per_creator)
+            results[str(creators)] = {**latency, **check_numbers(projectid), "expected": creators * args.tickets_per_creator}
+    write_results(args.output, {"database": dbstring.split(":", 1)[0], "tickets_per_creator": args.tickets_per_creator, "creators": results})
+    failed = [level for level, result in results.items() if result["duplicates"] or result["errors"] or result["tickets"] != result["expected"]]
+    if failed:
+        print(f"ticket numbers went wrong at {', '.join(failed)} creators", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+from fastapi import Request, Response as FastRes
+
+def make_etag(*parts) -> str:
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in [tag.strip() for tag in header.split(",")]
+
+def not_modified(etag: str) -> FastRes:
+    return FastRes(status_code=304, headers={"ETag": etag})
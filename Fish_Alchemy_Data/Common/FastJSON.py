@@ -0,0 +1,57 @@
+import asyncio
+import functools
+import inspect
+from typing import Any, Callable, Optional
+from fastapi.routing import APIRoute
+from pydantic_core import to_json
+from starlette.responses import Response as StarletteResponse
+
+from Fish_Alchemy_Data.Common.Response import Response
+
+SUB_RESPONSE = "_fast_json_sub_response"
+
+class FastJSONResponse(StarletteResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        # pydantic-core walks models, enums and datetimes natively, so no jsonable_encoder pass is needed
+        return to_json(content)
+
+def encode_responses(endpoint: Callable, status_code: Optional[int]) -> Callable:
+    # fastapi only skips jsonable_encoder for endpoints that return a starlette response, and then drops
+    # headers set on the injected sub-response, so the wrapper needs that sub-response to carry them over
+    signature = inspect.signature(endpoint)
+    declared = next((name for name, parameter in signature.parameters.items() if inspect.isclass(parameter.annotation) and issubclass(parameter.annotation, StarletteResponse)), None)
+    name = declared or SUB_RESPONSE
+
+    def finish(result, sub_response: StarletteResponse):
+        if not isinstance(result, Response):
+            return result
+        response = FastJSONResponse(result, status_code=sub_response.status_code or status_code or 200)
+        response.raw_headers.extend(sub_response.headers.raw)
+        return response
+
+    def sub_response(kwargs: dict) -> StarletteResponse:
+        return kwargs[name] if declared else kwargs.pop(name)
+
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            response = sub_response(kwargs)
+            return finish(await endpoint(*args, **kwargs), response)
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            response = sub_response(kwargs)
+            return finish(endpoint(*args, **kwargs), response)
+
+    if not declared:
+        parameter = inspect.Parameter(SUB_RESPONSE, inspect.Parameter.KEYWORD_ONLY, annotation=StarletteResponse)
+        wrapper.__signature__ = signature.replace(parameters=[*signature.parameters.values(), parameter])
+    return wrapper
+
+class FastJSONRoute(APIRoute):
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, encode_responses(endpoint, kwargs.get("status_code")), **kwargs)
+        # include_router rebuilds routes from .endpoint, which must stay unwrapped so it is only wrapped once
+        self.endpoint = endpoint
@@ -0,0 +1,41 @@
+from typing import Optional
+
+from Fish_Alchemy_Data.Common.Response import Response, HttpException
+
+def expanded(expand: Optional[set], name: str) -> bool:
+    return expand is None or name in expand
+
+def _split(value: Optional[str]) -> list:
+    return [name.strip() for name in value.split(",") if name.strip()] if value else []
+
+class FieldSelection():
+    def __init__(self, dto, expansions: dict, fields: Optional[str] = None, expand: Optional[str] = None):
+        response = Response()
+        requested = _split(fields)
+        expanding = _split(expand)
+        for name in requested:
+            if name not in dto.model_fields:
+                response.add_error("fields", f"unknown field {name}")
+        for name in expanding:
+            if name not in expansions:
+                response.add_error("expand", f"must be one of {', '.join(expansions)}")
+        if response.has_errors:
+            raise HttpException(status_code=400, response=response)
+        self.full = not requested and not expanding
+        if self.full:
+            self.expand = set(expansions)
+            self.include = None
+        else:
+            # a relationship named in fields is expanded too, and fields narrows the scalars when given
+            self.expand = set(expanding) | (set(requested) & set(expansions))
+            self.include = set(requested) | self.expand if requested else set(dto.model_fields) - (set(expansions) - self.expand)
+        self.options = tuple(option for name in expansions if name in self.expand for option in expansions[name])
+
+    def tag(self) -> tuple:
+        # etag parts, so a narrowed representation never validates against the full one
+        return () if self.full else ("+".join(sorted(self.include)),)
+
+    def render(self, entity):
+        if self.full:
+            return entity.toGetDto()
+        return entity.toGetDto(self.expand).model_dump(include=self.include)
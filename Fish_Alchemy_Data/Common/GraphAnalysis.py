@@ -0,0 +1,120 @@
+import threading
+from collections import OrderedDict, deque
+from functools import cached_property
+from typing import Optional
+
+GRAPH_CACHE_SIZE = 64
+
+class DependencyGraph():
+    # edges point from a dependency to the nodes that depend on it, so a topological order is a valid build order
+    def __init__(self, rows: list):
+        self.ids = []
+        self.index = {}
+        for node_id, _ in rows:
+            if node_id not in self.index:
+                self.index[node_id] = len(self.ids)
+                self.ids.append(node_id)
+        self.successors = [[] for _ in self.ids]
+        self.predecessors = [[] for _ in self.ids]
+        for node_id, dependency_id in rows:
+            if dependency_id is None or dependency_id not in self.index:
+                continue
+            dependent, dependency = self.index[node_id], self.index[dependency_id]
+            self.successors[dependency].append(dependent)
+            self.predecessors[dependent].append(dependency)
+
+    @cached_property
+    def _order(self) -> Optional[list]:
+        indegree = [len(preds) for preds in self.predecessors]
+        ready = deque(i for i, degree in enumerate(indegree) if degree == 0)
+        order = []
+        while ready:
+            i = ready.popleft()
+            order.append(i)
+            for j in self.successors[i]:
+                indegree[j] -= 1
+                if indegree[j] == 0:
+                    ready.append(j)
+        return order if len(order) == len(self.ids) else None
+
+    @property
+    def has_cycle(self) -> bool:
+        return self._order is None
+
+    def topological_order(self) -> list:
+        return [self.ids[i] for i in self._order]
+
+    @cached_property
+    def _depth(self) -> list:
+        # longest chain of dependencies ending at each node
+        depth = [0] * len(self.ids)
+        for i in self._order:
+            for j in self.successors[i]:
+                if depth[i] + 1 > depth[j]:
+                    depth[j] = depth[i] + 1
+        return depth
+
+    def layers(self) -> list:
+        layers = [[] for _ in range(max(self._depth, default=-1) + 1)]
+        for i in self._order:
+            layers[self._depth[i]].append(self.ids[i])
+        return layers
+
+    def roots(self) -> list:
+        return [self.ids[i] for i, preds in enumerate(self.predecessors) if not preds]
+
+    def leaves(self) -> list:
+        return [self.ids[i] for i, succs in enumerate(self.successors) if not succs]
+
+    def critical_path(self) -> list:
+        if not self.ids:
+            return []
+        depth = self._depth
+        end = max(range(len(self.ids)), key=depth.__getitem__)
+        path = [end]
+        while depth[path[-1]] > 0:
+            current = path[-1]
+            path.append(next(p for p in self.predecessors[current] if depth[p] == depth[current] - 1))
+        return [self.ids[i] for i in reversed(path)]
+
+    def components(self) -> list:
+        seen = [False] * len(self.ids)
+        components = []
+        for start in range(len(self.ids)):
+            if seen[start]:
+                continue
+            seen[start] = True
+            stack = [start]
+            component = []
+            while stack:
+                i = stack.pop()
+                component.append(self.ids[i])
+                for neighbours in (self.successors[i], self.predecessors[i]):
+                    for j in neighbours:
+                        if not seen[j]:
+                            seen[j] = True
+                            stack.append(j)
+            components.append(sorted(component))
+        return components
+
+class GraphCache():
+    def __init__(self, max_size: int = GRAPH_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict() # (graph id, version) -> cached value
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value) -> None:
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+graph_cache = GraphCache()
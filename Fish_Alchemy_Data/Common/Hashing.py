@@ -0,0 +1,78 @@
+import os
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, Future
+from typing import Optional
+import bcrypt
+from dotenv import load_dotenv
+
+from Fish_Alchemy_Data.Common.Response import Response, HttpException
+
+load_dotenv()
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", os.cpu_count() or 1))
+BCRYPT_MAX_PENDING = int(os.getenv("BCRYPT_MAX_PENDING", min(BCRYPT_WORKERS * 4, 16))) # well under the 40 threads sync endpoints share
+BCRYPT_ADMISSION_TIMEOUT = float(os.getenv("BCRYPT_ADMISSION_TIMEOUT", 2))
+
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
+
+def _check(plain: str, hashed: str) -> bool:
+    return bcrypt.checkpw(plain.encode(), hashed.encode())
+
+class PasswordHasher():
+    def __init__(self, workers: int = BCRYPT_WORKERS, max_pending: int = BCRYPT_MAX_PENDING, admission_timeout: float = BCRYPT_ADMISSION_TIMEOUT, rounds: int = BCRYPT_ROUNDS):
+        self.workers = workers
+        self.rounds = rounds
+        self.admission_timeout = admission_timeout
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.lock = threading.Lock()
+        self.pool: Optional[ProcessPoolExecutor] = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self.pool
+
+    def shutdown(self) -> None:
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown(cancel_futures=True)
+                self.pool = None
+
+    def submit(self, fn, *args, wait: bool = True) -> Future:
+        # refuse work instead of queueing it forever so a login storm can't pin every request thread
+        if not (self.slots.acquire(timeout=self.admission_timeout) if wait else self.slots.acquire(blocking=False)):
+            response = Response()
+            response.add_error("password", "server busy, try again")
+            raise HttpException(status_code=503, response=response)
+        try:
+            future = self._executor().submit(fn, *args)
+        except Exception:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    def hash(self, password: str) -> str:
+        return self.submit(_hash, password, self.rounds).result()
+
+    def check(self, plain: str, hashed: str) -> bool:
+        return self.submit(_check, plain, hashed).result()
+
+    # the event loop can't sit waiting for a slot, so these refuse straight away when the queue is full
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self.submit(_hash, password, self.rounds, wait=False))
+
+    async def check_async(self, plain: str, hashed: str) -> bool:
+        return await asyncio.wrap_future(self.submit(_check, plain, hashed, wait=False))
+
+    def needs_rehash(self, hashed: str) -> bool:
+        try:
+            return int(hashed.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+hasher = PasswordHasher()
@@ -0,0 +1,117 @@
+import os
+import shutil
+import tempfile
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse
+from sqlalchemy import update as sql_update
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from Fish_Alchemy_Data.Common.Variants import SIZES, MEDIA_FILE_MODE, disk_path, variant_path, has_variants, renderer
+from Fish_Alchemy_Data.Entities.MediaBlobs import MediaBlob
+
+STORE_PATH = "/media/store"
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+class UndecodableImage(Exception):
+    pass
+
+def store_path(digest: str, extension: str) -> str:
+    # two levels of sharding keeps every directory small
+    return f"{STORE_PATH}/{digest[:2]}/{digest[2:4]}/{digest}.{extension}"
+
+def is_stored(path: str) -> bool:
+    return path.startswith(STORE_PATH + "/")
+
+def digest_of(path: str) -> str:
+    return os.path.basename(path).split(".")[0].split("@")[0]
+
+def staging_dir() -> str:
+    directory = disk_path(f"{STORE_PATH}/.staging")
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+def unlink(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def discard(path: str) -> None:
+    unlink(disk_path(path))
+    for sizes in SIZES.values():
+        for size in sizes:
+            unlink(disk_path(variant_path(path, size)))
+
+def add_reference(db: Session, digest: str, path: str, size: int) -> None:
+    # a single upsert, so two uploads of the same new image can't race each other into a duplicate key
+    values = {"digest": digest, "path": path, "size": size, "refcount": 1}
+    if db.get_bind().dialect.name == "mysql":
+        statement = mysql_insert(MediaBlob).values(**values).on_duplicate_key_update(refcount=MediaBlob.refcount + 1)
+    else:
+        statement = sqlite_insert(MediaBlob).values(**values).on_conflict_do_update(index_elements=[MediaBlob.digest], set_={"refcount": MediaBlob.refcount + 1})
+    db.execute(statement)
+
+def link(staged: str, target: str) -> None:
+    # the staged copy stays behind for a second place() should the sweeper get to the target first
+    try:
+        os.link(staged, target)
+    except FileExistsError:
+        pass
+    except OSError:
+        fd, copy = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".copy-")
+        os.close(fd)
+        try:
+            shutil.copyfile(staged, copy)
+            os.chmod(copy, MEDIA_FILE_MODE)
+            os.replace(copy, target)
+        except OSError:
+            unlink(copy)
+            raise
+
+def place(staged: str, path: str, kind: str) -> None:
+    target = disk_path(path)
+    created = not os.path.exists(target)
+    if created:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.chmod(staged, MEDIA_FILE_MODE)
+        link(staged, target)
+    else:
+        # keeps the sweeper's grace period from expiring on bytes about to gain a reference
+        os.utime(target)
+    if not has_variants(path, kind):
+        try:
+            renderer.render(path, kind)
+        except Exception as e:
+            if created:
+                discard(path)
+            raise UndecodableImage(path) from e
+
+def store(db: Session, staged: str, digest: str, extension: str, size: int, kind: str) -> str:
+    # the variants are rendered before the reference is taken, so no row lock is held while they are; the
+    # staged copy is the caller's to remove once this returns
+    path = store_path(digest, extension)
+    place(staged, path, kind)
+    add_reference(db, digest, path, size)
+    if not os.path.exists(disk_path(path)):
+        # the sweeper reclaimed the bytes in between, and can't again now the reference is held
+        place(staged, path, kind)
+    return path
+
+def release(db: Session, path: str, default: str) -> None:
+    # the bytes themselves are reclaimed by the media sweeper once nothing references them
+    if path and path != default and is_stored(path):
+        db.execute(sql_update(MediaBlob).where(MediaBlob.digest == digest_of(path)).values(refcount=MediaBlob.refcount - 1))
+
+class MediaFiles(StaticFiles):
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        headers = {"cache-control": "no-cache"}
+        if f"{os.sep}store{os.sep}" in str(full_path):
+            headers = {"cache-control": IMMUTABLE, "etag": f'"{os.path.basename(str(full_path)).split(".")[0]}"'}
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result, headers=headers)
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,215 @@
+import os
+import re
+import threading
+import time
+from typing import Optional
+from dotenv import load_dotenv
+from sqlalchemy import select, union_all, delete as sql_delete
+
+from Fish_Alchemy_Data.database import db_session
+from Fish_Alchemy_Data.Common.Variants import SQUARE, BANNER, disk_path
+from Fish_Alchemy_Data.Common.MediaStore import is_stored, digest_of, unlink
+from Fish_Alchemy_Data.Entities.MediaBlobs import MediaBlob
+from Fish_Alchemy_Data.Entities.Users import User, DEFAULT_PFP, DEFAULT_BANNER as DEFAULT_USER_BANNER
+from Fish_Alchemy_Data.Entities.Groups import Group, DEFAULT_LOGO as DEFAULT_GROUP_LOGO, DEFAULT_BANNER as DEFAULT_GROUP_BANNER
+from Fish_Alchemy_Data.Entities.Projects import Project, DEFAULT_LOGO as DEFAULT_PROJECT_LOGO, DEFAULT_BANNER as DEFAULT_PROJECT_BANNER
+
+load_dotenv()
+MEDIA_GC_INTERVAL = float(os.getenv("MEDIA_GC_INTERVAL", 15 * 60)) # seconds between passes
+MEDIA_GC_BATCH = int(os.getenv("MEDIA_GC_BATCH", 500)) # files examined per batch
+MEDIA_GC_PAUSE = float(os.getenv("MEDIA_GC_PAUSE", 0.1)) # seconds between batches
+MEDIA_GC_GRACE = float(os.getenv("MEDIA_GC_GRACE", 60 * 60)) # files younger than this are never touched
+
+MEDIA_COLUMNS = (
+    (User, User.pfp_path, SQUARE),
+    (User, User.banner_path, BANNER),
+    (Group, Group.logo_path, SQUARE),
+    (Group, Group.banner_path, BANNER),
+    (Project, Project.logo_path, SQUARE),
+    (Project, Project.banner_path, BANNER),
+)
+
+DEFAULT_MEDIA = (
+    (DEFAULT_PFP, SQUARE),
+    (DEFAULT_USER_BANNER, BANNER),
+    (DEFAULT_GROUP_LOGO, SQUARE),
+    (DEFAULT_GROUP_BANNER, BANNER),
+    (DEFAULT_PROJECT_LOGO, SQUARE),
+    (DEFAULT_PROJECT_BANNER, BANNER),
+)
+
+VARIANT_SUFFIX = re.compile(r"@\d+\.webp$")
+
+def public_path(full_path: str) -> str:
+    return "/" + os.path.relpath(full_path, os.getcwd()).replace(os.sep, "/")
+
+def referenced(db, paths: list) -> set:
+    return set(db.execute(union_all(*(select(column).where(column.in_(paths)) for _, column, _ in MEDIA_COLUMNS))).scalars())
+
+class MediaSweeper():
+    def __init__(self, interval: float = MEDIA_GC_INTERVAL, batch_size: int = MEDIA_GC_BATCH, pause: float = MEDIA_GC_PAUSE, grace: float = MEDIA_GC_GRACE, root: str = "/media"):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = pause
+        self.grace = grace
+        self.root = root
+        self.defaults = {path for path, _ in DEFAULT_MEDIA}
+        self.stopping = threading.Event()
+        self.thread = None
+        self.passes = 0
+        self.scanned = 0
+        self.reclaimed_files = 0
+        self.reclaimed_bytes = 0
+        self.last_pass = {}
+        self.failures = 0
+        self.last_error = None
+
+    def start(self) -> None:
+        if self.thread and self.thread.is_alive():
+            return
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self._run, name="media-sweeper", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = 5) -> None:
+        self.stopping.set()
+        if self.thread:
+            self.thread.join(timeout)
+
+    def stats(self) -> dict:
+        return {
+            "passes": self.passes,
+            "scanned": self.scanned,
+            "reclaimed_files": self.reclaimed_files,
+            "reclaimed_bytes": self.reclaimed_bytes,
+            "last_pass": self.last_pass,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+    def _run(self) -> None:
+        while not self.stopping.wait(self.interval):
+            try:
+                self.sweep(stopping=self.stopping)
+            except Exception as e:
+                self.failures += 1
+                self.last_error = repr(e)
+
+    def _walk(self):
+        for directory, dirs, files in os.walk(disk_path(self.root)):
+            dirs.sort()
+            for name in sorted(files):
+                yield os.path.join(directory, name)
+
+    def sweep(self, dry_run: bool = False, stopping: Optional[threading.Event] = None) -> dict:
+        start = time.monotonic()
+        result = {"scanned": 0, "reclaimed_files": 0, "reclaimed_bytes": 0, "dry_run": dry_run}
+        batch = []
+        for full_path in self._walk():
+            batch.append(full_path)
+            if len(batch) >= self.batch_size:
+                self._sweep_batch(batch, dry_run, result)
+                batch = []
+                if stopping is not None and stopping.wait(self.pause):
+                    break
+        if batch:
+            self._sweep_batch(batch, dry_run, result)
+        result["seconds"] = round(time.monotonic() - start, 2)
+        if not dry_run:
+            self.passes += 1
+            self.scanned += result["scanned"]
+            self.reclaimed_files += result["reclaimed_files"]
+            self.reclaimed_bytes += result["reclaimed_bytes"]
+            self.last_pass = result
+        return result
+
+    def _sweep_batch(self, batch: list, dry_run: bool, result: dict) -> None:
+        cutoff = time.time() - self.grace
+        listings = {}
+        originals = {}
+        orphans = []
+        for full_path in batch:
+            result["scanned"] += 1
+            # anything touched inside the grace period may belong to an upload that hasn't committed yet
+            if not self._expired(full_path, cutoff):
+                continue
+            path = public_path(full_path)
+            name = os.path.basename(path)
+            if name.startswith(".") or "/.staging/" in path:
+                orphans.append((full_path, None))
+            elif VARIANT_SUFFIX.search(name):
+                # variants live and die with their original, so on their own they only matter once it is gone
+                if not any(not VARIANT_SUFFIX.search(sibling) for sibling in self._family(full_path, listings)):
+                    orphans.append((full_path, None))
+            elif path not in self.defaults:
+                originals[path] = full_path
+        if originals:
+            with db_session() as db:
+                live = referenced(db, list(originals))
+            for path, full_path in originals.items():
+                if path not in live:
+                    orphans.extend((member, path) for member in self._family(full_path, listings))
+        # an upload may have re-referenced a stored file since it was examined, and touches it when it does
+        orphans = [(full_path, path) for full_path, path in orphans if self._expired(full_path, cutoff)]
+        if not orphans:
+            return
+        digests = {digest_of(path) for _, path in orphans if path and is_stored(path)}
+        if dry_run or not digests:
+            self._reclaim(orphans, dry_run, result)
+            return
+        with db_session() as db:
+            # the delete holds the rows until the files are gone, so an upload taking a reference meanwhile
+            # either lands first and keeps them or waits and then finds its file missing and writes it again
+            db.execute(sql_delete(MediaBlob).where(MediaBlob.digest.in_(digests), MediaBlob.refcount <= 0))
+            kept = set(db.execute(select(MediaBlob.digest).where(MediaBlob.digest.in_(digests)).with_for_update()).scalars())
+            self._reclaim([(full_path, path) for full_path, path in orphans if not (path and is_stored(path) and digest_of(path) in kept)], dry_run, result)
+            db.commit()
+
+    def _reclaim(self, orphans: list, dry_run: bool, result: dict) -> None:
+        result["reclaimed_files"] += len(orphans)
+        result["reclaimed_bytes"] += sum(self._size(full_path) for full_path, _ in orphans)
+        if dry_run:
+            return
+        for full_path, _ in orphans:
+            unlink(full_path)
+            self._prune(os.path.dirname(full_path))
+
+    def _expired(self, full_path: str, cutoff: float) -> bool:
+        try:
+            return os.stat(full_path).st_mtime <= cutoff
+        except FileNotFoundError:
+            return False
+
+    def _size(self, full_path: str) -> int:
+        try:
+            return os.path.getsize(full_path)
+        except FileNotFoundError:
+            return 0
+
+    def _family(self, full_path: str, listings: dict) -> list:
+        # the original and every variant sharing its stem, from one listing per directory per batch
+        directory, name = os.path.split(full_path)
+        if directory not in listings:
+            families = {}
+            try:
+                names = os.listdir(directory)
+            except FileNotFoundError:
+                names = []
+            for sibling in names:
+                stem = VARIANT_SUFFIX.sub("", sibling) if VARIANT_SUFFIX.search(sibling) else os.path.splitext(sibling)[0]
+                families.setdefault(stem, []).append(os.path.join(directory, sibling))
+            listings[directory] = families
+        stem = VARIANT_SUFFIX.sub("", name) if VARIANT_SUFFIX.search(name) else os.path.splitext(name)[0]
+        return listings[directory].get(stem, [])
+
+    def _prune(self, directory: str) -> None:
+        # only the sharded store directories are created on demand, so only those are removed when empty
+        store = disk_path("/media/store")
+        while directory.startswith(store + os.sep):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                return
+            directory = os.path.dirname(directory)
+
+sweeper = MediaSweeper()
@@ -0,0 +1,84 @@
+import base64
+import binascii
+import json
+import operator
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import and_, or_
+
+from Fish_Alchemy_Data.Common.Response import Response, HttpException
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+
+def _to_json(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _from_json(value, column):
+    if value is None:
+        return None
+    if column.type.python_type is datetime:
+        return datetime.fromisoformat(value)
+    return column.type.python_type(value)
+
+def encode_cursor(sort: str, values: list) -> str:
+    raw = json.dumps({"s": sort, "v": [_to_json(value) for value in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort: str, columns: list) -> Optional[list]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        if data["s"] != sort or len(data["v"]) != len(columns):
+            return None
+        return [_from_json(value, column) for value, column in zip(data["v"], columns)]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        return None
+
+def parse_sort(sort: str, sortable: dict):
+    response = Response()
+    descending = sort.startswith("-")
+    key = sort[1:] if descending else sort
+    if key not in sortable:
+        response.add_error("sort", f"must be one of {', '.join(sortable)}")
+        raise HttpException(status_code=400, response=response)
+    return sortable[key], descending
+
+def _keyset(query, sort: str, sortable: dict, id_column, limit: int, after: Optional[str]):
+    response = Response()
+    if limit < 1 or limit > MAX_LIMIT:
+        response.add_error("limit", f"must be between 1 and {MAX_LIMIT}")
+        raise HttpException(status_code=400, response=response)
+    sort_column, descending = parse_sort(sort, sortable)
+    columns = [id_column] if sort_column is id_column else [sort_column, id_column]
+    if after:
+        values = decode_cursor(after, sort, columns)
+        if values is None:
+            response.add_error("after", "invalid cursor")
+            raise HttpException(status_code=400, response=response)
+        beyond = operator.lt if descending else operator.gt
+        query = query.filter(or_(*[
+            and_(*[column == value for column, value in zip(columns[:i], values[:i])], beyond(columns[i], values[i]))
+            for i in range(len(columns))
+        ]))
+    query = query.order_by(*[column.desc() if descending else column.asc() for column in columns])
+    return query.limit(limit + 1), columns
+
+def _page(rows: list, sort: str, columns: list, limit: int):
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort, [getattr(rows[-1], column.key) for column in columns])
+    return rows, next_cursor
+
+def paginate(query, sort: str, sortable: dict, id_column, limit: int, after: Optional[str]):
+    query, columns = _keyset(query, sort, sortable, id_column, limit, after)
+    return _page(query.all(), sort, columns, limit)
+
+async def paginate_async(db, statement, sort: str, sortable: dict, id_column, limit: int, after: Optional[str]):
+    # the same keyset pagination for a select() run on an AsyncSession
+    statement, columns = _keyset(statement, sort, sortable, id_column, limit, after)
+    return _page((await db.scalars(statement)).unique().all(), sort, columns, limit)
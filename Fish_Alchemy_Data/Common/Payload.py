@@ -1,5 +1,15 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Optional
+import queue
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
+
+MAX_EMBEDS = 10 # discord rejects messages with more embeds than this
+COALESCE_WINDOW = 0.5 # seconds to wait for more messages before sending a burst
+MAX_ATTEMPTS = 5
+REQUEST_TIMEOUT = 10
 
 @dataclass
 class Payload():
@@ -20,7 +30,169 @@ class Payload():
             ]
         }
         return payjson
-    
+
+@dataclass
+class Delivery():
+    webhook: str
+    username: str
+    embeds: list
+    enqueued_at: float = field(default_factory=time.monotonic)
+    attempts: int = 0
+
+class DiscordDispatcher():
+    def __init__(self, coalesce_window: float = COALESCE_WINDOW, max_attempts: int = MAX_ATTEMPTS, session: Optional[requests.Session] = None):
+        self.coalesce_window = coalesce_window
+        self.max_attempts = max_attempts
+        if session is None:
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+            session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+        self.session = session
+        self.queue = queue.Queue()
+        self.pending = {} # webhook -> deliveries waiting on a rate limit or retry
+        self.blocked_until = {} # webhook -> monotonic time it may be used again
+        self.lock = threading.Lock()
+        self.thread = None
+        self.running = False
+        self.sent_messages = 0
+        self.sent_embeds = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.failed = 0
+        self.latency_last = 0.0
+        self.latency_max = 0.0
+        self.latency_total = 0.0
+
+    def start(self) -> None:
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return
+            self.running = True
+            self.thread = threading.Thread(target=self._run, name="discord-dispatcher", daemon=True)
+            self.thread.start()
+
+    def stop(self, timeout: float = 5) -> None:
+        self.running = False
+        self.queue.put(None)
+        if self.thread:
+            self.thread.join(timeout)
+
+    def enqueue(self, webhook: str, payload: dict) -> None:
+        if not webhook:
+            return
+        if not self.running:
+            self.start()
+        self.queue.put(Delivery(webhook=webhook, username=payload.get("username", ""), embeds=list(payload.get("embeds", []))))
+
+    def stats(self) -> dict:
+        pending = sum(len(deliveries) for deliveries in list(self.pending.values()))
+        return {
+            "queue_depth": self.queue.qsize() + pending,
+            "sent_messages": self.sent_messages,
+            "sent_embeds": self.sent_embeds,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "failed": self.failed,
+            "latency_last_ms": round(self.latency_last * 1000, 2),
+            "latency_max_ms": round(self.latency_max * 1000, 2),
+            "latency_avg_ms": round(self.latency_total / self.sent_embeds * 1000, 2) if self.sent_embeds else 0.0,
+        }
+
+    def _run(self) -> None:
+        while self.running or self.pending or not self.queue.empty():
+            if not self._collect():
+                if not self.running and not self.pending:
+                    return
+            self._flush()
+
+    def _collect(self) -> bool:
+        # blocks for the first delivery, then keeps draining for the coalesce window so a burst goes out together
+        try:
+            delivery = self.queue.get(timeout=self._next_wakeup())
+        except queue.Empty:
+            return False
+        if delivery is None:
+            return False
+        self.pending.setdefault(delivery.webhook, []).append(delivery)
+        deadline = time.monotonic() + self.coalesce_window
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                delivery = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if delivery is None:
+                break
+            self.pending.setdefault(delivery.webhook, []).append(delivery)
+        return True
+
+    def _next_wakeup(self) -> Optional[float]:
+        if not self.pending:
+            return None if self.running else 0.1
+        now = time.monotonic()
+        return max(0.01, min(self.blocked_until.get(webhook, now) for webhook in self.pending) - now)
+
+    def _flush(self) -> None:
+        now = time.monotonic()
+        for webhook in list(self.pending):
+            if self.blocked_until.get(webhook, 0) > now:
+                continue
+            deliveries = self.pending.pop(webhook)
+            while deliveries:
+                if self.blocked_until.get(webhook, 0) > time.monotonic():
+                    self.pending[webhook] = deliveries
+                    break
+                batch = [deliveries.pop(0)]
+                embeds = list(batch[0].embeds)
+                while deliveries and deliveries[0].username == batch[0].username and len(embeds) + len(deliveries[0].embeds) <= MAX_EMBEDS:
+                    batch.append(deliveries.pop(0))
+                    embeds.extend(batch[-1].embeds)
+                if not self._send(webhook, batch, embeds):
+                    self.pending[webhook] = batch + deliveries
+                    break
+
+    def _send(self, webhook: str, batch: list, embeds: list) -> bool:
+        try:
+            r = self.session.post(webhook, json={"username": batch[0].username, "embeds": embeds}, timeout=REQUEST_TIMEOUT)
+        except requests.RequestException:
+            return self._retry(webhook, batch)
+        if r.status_code == 429:
+            self.rate_limited += 1
+            self.blocked_until[webhook] = time.monotonic() + self._retry_after(r)
+            return False
+        if r.status_code >= 500:
+            return self._retry(webhook, batch)
+        if r.status_code >= 400:
+            self.failed += len(batch)
+            return True
+        if r.headers.get("X-RateLimit-Remaining") == "0":
+            self.blocked_until[webhook] = time.monotonic() + float(r.headers.get("X-RateLimit-Reset-After", 0))
+        done = time.monotonic()
+        self.sent_messages += 1
+        for delivery in batch:
+            latency = done - delivery.enqueued_at
+            self.sent_embeds += 1
+            self.latency_last = latency
+            self.latency_max = max(self.latency_max, latency)
+            self.latency_total += latency
+        return True
+
+    def _retry(self, webhook: str, batch: list) -> bool:
+        for delivery in batch:
+            delivery.attempts += 1
+        if batch[0].attempts >= self.max_attempts:
+            self.failed += len(batch)
+            return True
+        self.retries += 1
+        self.blocked_until[webhook] = time.monotonic() + min(30, 2 ** batch[0].attempts)
+        return False
+
+    def _retry_after(self, r: requests.Response) -> float:
+        try:
+            return float(r.json()["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            return float(r.headers.get("Retry-After", 1))
+
+dispatcher = DiscordDispatcher()
+
 def send_discord_message(webhook: str, payload: dict) -> None:
-    r = requests.post(webhook, json=payload)
-    r.raise_for_status()
\ No newline at end of file
+    dispatcher.enqueue(webhook, payload)
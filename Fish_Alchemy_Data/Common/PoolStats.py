@@ -0,0 +1,74 @@
+import threading
+import time
+from collections import deque
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+WAIT_SAMPLES = 1000
+
+class TimedPool():
+    # times every checkout, since an exhausted pool otherwise only shows up as slow endpoints
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.Lock()
+        self.waits = deque(maxlen=WAIT_SAMPLES)
+        self.checkouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            with self.lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self.lock:
+                self.waits.append(waited)
+                self.checkouts += 1
+                self.wait_seconds += waited
+                self.max_wait = max(self.max_wait, waited)
+
+    def wait_stats(self) -> dict:
+        with self.lock:
+            ordered = sorted(self.waits)
+            checkouts, wait_seconds, max_wait, timeouts = self.checkouts, self.wait_seconds, self.max_wait, self.timeouts
+
+        def percentile(pct: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))] * 1000, 3) if ordered else 0.0
+
+        return {
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "wait_total_ms": round(wait_seconds * 1000, 3),
+            "wait_max_ms": round(max_wait * 1000, 3),
+            "wait_p50_ms": percentile(50),
+            "wait_p95_ms": percentile(95),
+            "wait_p99_ms": percentile(99),
+        }
+
+class TimedQueuePool(TimedPool, QueuePool):
+    pass
+
+class TimedAsyncQueuePool(TimedPool, AsyncAdaptedQueuePool):
+    pass
+
+def pool_stats(engine) -> dict:
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(0, pool.overflow()),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        })
+    if isinstance(pool, TimedPool):
+        stats.update(pool.wait_stats())
+    return stats
@@ -0,0 +1,119 @@
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Optional
+from dotenv import load_dotenv
+from sqlalchemy import event
+
+load_dotenv()
+SQL_REPEAT_THRESHOLD = int(os.getenv("SQL_REPEAT_THRESHOLD", 10)) # same statement shape this many times in one request is flagged
+SQL_FLAGS_KEPT = int(os.getenv("SQL_FLAGS_KEPT", 100))
+
+logger = logging.getLogger("fish_alchemy.sql")
+
+WHITESPACE = re.compile(r"\s+")
+PARAMETER_LIST = re.compile(r"\((?:\s*(?:\?|%s|:\w+)\s*,)+\s*(?:\?|%s|:\w+)\s*\)")
+
+def statement_shape(statement: str) -> str:
+    # an IN list's length varies with its input, so it doesn't make two statements different
+    return PARAMETER_LIST.sub("(?)", WHITESPACE.sub(" ", statement).strip())
+
+class RequestQueries():
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+
+current: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    queries = current.get()
+    if queries is not None:
+        queries.count += 1
+        queries.seconds += elapsed
+        queries.shapes[statement_shape(statement)] += 1
+
+def instrument(engine) -> None:
+    # async engines raise their events from the sync engine underneath
+    engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+class QueryMonitor():
+    def __init__(self, threshold: int = SQL_REPEAT_THRESHOLD, kept: int = SQL_FLAGS_KEPT):
+        self.threshold = threshold
+        self.lock = threading.Lock()
+        self.flags = deque(maxlen=kept)
+        self.flagged_routes = Counter()
+        self.requests = 0
+        self.queries = 0
+
+    def finish(self, method: str, route: str, status: Optional[int], queries: RequestQueries, seconds: float) -> None:
+        repeated = [(shape, count) for shape, count in queries.shapes.items() if count > self.threshold]
+        with self.lock:
+            self.requests += 1
+            self.queries += queries.count
+            for shape, count in repeated:
+                self.flags.append({"route": f"{method} {route}", "statement": shape, "count": count, "at": time.time()})
+                self.flagged_routes[f"{method} {route}"] += 1
+        fields = {
+            "method": method,
+            "route": route,
+            "status": status,
+            "queries": queries.count,
+            "db_ms": round(queries.seconds * 1000, 2),
+            "duration_ms": round(seconds * 1000, 2),
+        }
+        logger.info("%s %s %s queries=%d db_ms=%.2f duration_ms=%.2f", method, route, status, fields["queries"], fields["db_ms"], fields["duration_ms"], extra=fields)
+        for shape, count in repeated:
+            logger.warning("possible N+1 in %s %s: statement ran %d times: %s", method, route, count, shape, extra={"method": method, "route": route, "count": count, "statement": shape})
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "threshold": self.threshold,
+                "requests": self.requests,
+                "queries": self.queries,
+                "flagged_routes": dict(self.flagged_routes),
+                "recent_flags": list(self.flags),
+            }
+
+monitor = QueryMonitor()
+
+class QueryTimingMiddleware():
+    def __init__(self, app, monitor: QueryMonitor = monitor):
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        queries = RequestQueries()
+        token = current.set(queries)
+        start = time.perf_counter()
+        status = None
+
+        async def timed_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                timing = f'db;dur={queries.seconds * 1000:.2f};desc="{queries.count} queries", app;dur={(time.perf_counter() - start) * 1000:.2f}'
+                message["headers"] = [*message.get("headers", []), (b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            current.reset(token)
+            route = scope.get("route")
+            self.monitor.finish(scope["method"], getattr(route, "path", scope["path"]), status, queries, time.perf_counter() - start)
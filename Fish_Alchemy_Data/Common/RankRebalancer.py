@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from sqlalchemy import select, update, bindparam
+
+from Fish_Alchemy_Data.database import db_session
+from Fish_Alchemy_Data.Common.Ranks import spread
+from Fish_Alchemy_Data.Common.Versioning import bump_where
+from Fish_Alchemy_Data.Entities.Tickets import Ticket
+from Fish_Alchemy_Data.Entities.Projects import Project
+
+load_dotenv()
+RANK_REBALANCE_LENGTH = int(os.getenv("RANK_REBALANCE_LENGTH", 32)) # a move producing a longer rank queues its column
+RANK_REBALANCE_BATCH = int(os.getenv("RANK_REBALANCE_BATCH", 1000)) # tickets per executemany
+
+class RankRebalancer():
+    def __init__(self, length: int = RANK_REBALANCE_LENGTH, batch_size: int = RANK_REBALANCE_BATCH):
+        self.length = length
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.pending = set()
+        self.wake = threading.Event()
+        self.stopping = threading.Event()
+        self.thread = None
+        self.columns = 0
+        self.tickets = 0
+        self.skipped = 0
+        self.last_column = {}
+        self.failures = 0
+        self.last_error = None
+
+    def start(self) -> None:
+        if self.thread and self.thread.is_alive():
+            return
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self._run, name="rank-rebalancer", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = 5) -> None:
+        self.stopping.set()
+        self.wake.set()
+        if self.thread:
+            self.thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self.lock:
+            pending = len(self.pending)
+        return {
+            "length": self.length,
+            "pending": pending,
+            "columns": self.columns,
+            "tickets": self.tickets,
+            "skipped": self.skipped,
+            "last_column": self.last_column,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+    def check(self, project_id: int, state, rank: str) -> None:
+        if len(rank) > self.length:
+            self.request(project_id, state)
+
+    def request(self, project_id: int, state) -> None:
+        with self.lock:
+            self.pending.add((project_id, state))
+        self.wake.set()
+
+    def _run(self) -> None:
+        while not self.stopping.is_set():
+            self.wake.wait()
+            self.wake.clear()
+            while not self.stopping.is_set():
+                with self.lock:
+                    if not self.pending:
+                        break
+                    project_id, state = self.pending.pop()
+                try:
+                    self.rebalance(project_id, state)
+                except Exception as e:
+                    self.failures += 1
+                    self.last_error = repr(e)
+
+    def rebalance(self, project_id: int, state) -> dict:
+        # rewrites the column with the shortest keys in its current order; a ticket moved meanwhile no longer
+        # has the rank it was read with and keeps its move, and the column is queued again for another pass
+        start = time.monotonic()
+        result = {"project_id": project_id, "state": state, "tickets": 0, "skipped": 0}
+        with db_session() as db:
+            rows = db.execute(select(Ticket.id, Ticket.rank).where(Ticket.project_id == project_id, Ticket.state == state).order_by(Ticket.rank, Ticket.id)).all()
+            statement = (
+                update(Ticket.__table__)
+                .where(Ticket.id == bindparam("ticket_id"), Ticket.state == state, Ticket.rank == bindparam("old_rank"))
+                .values(rank=bindparam("new_rank"))
+            )
+            changes = [{"ticket_id": id, "old_rank": old, "new_rank": new} for (id, old), new in zip(rows, spread(len(rows))) if old != new]
+            for i in range(0, len(changes), self.batch_size):
+                batch = changes[i:i + self.batch_size]
+                updated = db.execute(statement, batch).rowcount
+                result["tickets"] += updated
+                result["skipped"] += max(0, len(batch) - updated)
+            if result["tickets"]:
+                # the board's etag comes from the project's version
+                bump_where(db, Project, Project.id == project_id)
+            # one transaction, so nobody reads the column half old keys and half new
+            db.commit()
+        if result["skipped"]:
+            self.request(project_id, state)
+        result["seconds"] = round(time.monotonic() - start, 3)
+        self.columns += 1
+        self.tickets += result["tickets"]
+        self.skipped += result["skipped"]
+        self.last_column = result
+        return result
+
+rebalancer = RankRebalancer()
@@ -0,0 +1,106 @@
+from typing import Optional
+
+# fractional indexing: a key is a variable-length integer part, whose head letter gives its length, then a
+# fraction with no trailing zero, so there is always another key between any two and they sort as plain strings
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+INTEGER_ZERO = "a0"
+SMALLEST_INTEGER = "A" + DIGITS[0] * 26
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    if b:
+        n = 0
+        while (a[n] if n < len(a) else DIGITS[0]) == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+    low = DIGITS.index(a[0]) if a else 0
+    high = DIGITS.index(b[0]) if b is not None else len(DIGITS)
+    if high - low > 1:
+        return DIGITS[(low + high + 1) // 2]
+    if b and len(b) > 1:
+        return b[:1]
+    return DIGITS[low] + _midpoint(a[1:], None)
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"invalid rank head {head!r}")
+
+def _split(key: str) -> tuple:
+    length = _integer_length(key[0])
+    if length > len(key) or key == SMALLEST_INTEGER or key[length:].endswith(DIGITS[0]):
+        raise ValueError(f"invalid rank {key!r}")
+    return key[:length], key[length:]
+
+def _increment(integer: str) -> Optional[str]:
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        digit = DIGITS.index(digits[i]) + 1
+        if digit < len(DIGITS):
+            digits[i] = DIGITS[digit]
+            return head + "".join(digits)
+        digits[i] = DIGITS[0]
+    if head == "Z":
+        return INTEGER_ZERO
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append(DIGITS[0])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+def _decrement(integer: str) -> Optional[str]:
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        digit = DIGITS.index(digits[i]) - 1
+        if digit >= 0:
+            digits[i] = DIGITS[digit]
+            return head + "".join(digits)
+        digits[i] = DIGITS[-1]
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+def rank_between(before: Optional[str], after: Optional[str]) -> str:
+    # a key sorting after `before` and ahead of `after`, either of which may be None for an open end
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"{before!r} does not sort ahead of {after!r}")
+    if before is None and after is None:
+        return INTEGER_ZERO
+    if before is None:
+        integer, fraction = _split(after)
+        if integer == SMALLEST_INTEGER:
+            return integer + _midpoint("", fraction)
+        if integer < after:
+            return integer
+        return _decrement(integer)
+    integer, fraction = _split(before)
+    if after is None:
+        return _increment(integer) or integer + _midpoint(fraction, None)
+    after_integer, after_fraction = _split(after)
+    if integer == after_integer:
+        return integer + _midpoint(fraction, after_fraction)
+    following = _increment(integer)
+    if following is not None and following < after:
+        return following
+    return integer + _midpoint(fraction, None)
+
+def spread(count: int) -> list:
+    # consecutive integers from zero, the shortest keys there are for a column of this size
+    keys = []
+    key = None
+    for _ in range(count):
+        key = rank_between(key, None)
+        keys.append(key)
+    return keys
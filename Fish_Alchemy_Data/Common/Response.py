@@ -9,6 +9,7 @@ class Response(BaseModel):
     errors: List[Error] = Field(default_factory=list)
     has_errors: bool = False
     data: Optional[object] = None
+    next_cursor: Optional[str] = None
 
     def add_error(self, property: str, message: str):
         self.errors.append(Error(property=property, message=message))
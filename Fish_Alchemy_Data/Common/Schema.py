@@ -0,0 +1,15 @@
+import os
+from alembic import command
+from alembic.config import Config
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def alembic_config() -> Config:
+    # the app and the jobs migrate from wherever they're started, so nothing here may depend on the working directory
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "Fish_Alchemy_Data", "Migrations"))
+    config.attributes["configure_logging"] = False
+    return config
+
+def upgrade(revision: str = "head") -> None:
+    command.upgrade(alembic_config(), revision)
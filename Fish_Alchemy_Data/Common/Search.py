@@ -0,0 +1,31 @@
+import re
+from sqlalchemy import table, column, literal, literal_column, func, bindparam, type_coerce, or_, Float
+from sqlalchemy.dialects.mysql import match
+
+from Fish_Alchemy_Data.Entities.Tickets import Ticket
+
+WORD = re.compile(r"\w+")
+MAX_TERMS = 16
+
+def search_terms(q: str) -> list:
+    # only words reach the full-text engine, so operators and quotes in the query can't make it a syntax error
+    return WORD.findall(q)[:MAX_TERMS]
+
+tickets_fts = table("tickets_fts", column("rowid"))
+
+def ticket_search(statement, dialect: str, terms: list):
+    # adds the full-text match to a select of tickets, every term required and the last one matched as a
+    # prefix; returns it with a score where higher is more relevant
+    if dialect in ("mysql", "mariadb"):
+        score = type_coerce(match(Ticket.name, Ticket.description, against=bindparam("terms", " ".join(f"+{term}" for term in terms) + "*")).in_boolean_mode(), Float)
+        return statement.where(score > 0), score
+    if dialect == "sqlite":
+        score = -func.bm25(literal_column("tickets_fts"), type_=Float) # bm25 is lower for better matches
+        query = " ".join(f'"{term}"' for term in terms) + "*"
+        statement = statement.join(tickets_fts, tickets_fts.c.rowid == Ticket.id).where(literal_column("tickets_fts").op("MATCH")(bindparam("terms", query)))
+        return statement, score
+    # anywhere else a scan stands in for the index: every term somewhere in the name or description, all of them
+    # equally relevant
+    for term in terms:
+        statement = statement.where(or_(Ticket.name.icontains(term, autoescape=True), Ticket.description.icontains(term, autoescape=True)))
+    return statement, literal(0, Float)
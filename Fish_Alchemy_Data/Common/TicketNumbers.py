@@ -0,0 +1,19 @@
+from typing import Optional
+from sqlalchemy import update, select, func
+from sqlalchemy.orm import Session
+
+from Fish_Alchemy_Data.Entities.Projects import Project
+
+def allocate_ticketnum(db: Session, projectid: int) -> Optional[int]:
+    # one increment committed straight away, so the project row is locked for that statement and not for the rest
+    # of the request; commits whatever else the session has pending, and a number whose ticket never gets inserted
+    # is skipped rather than reused
+    statement = update(Project).where(Project.id == projectid).execution_options(synchronize_session=False)
+    if db.get_bind().dialect.update_returning:
+        number = db.scalar(statement.values(ticket_count=func.coalesce(Project.ticket_count, 0) + 1).returning(Project.ticket_count))
+    else:
+        # MySQL has no RETURNING, LAST_INSERT_ID(expr) hands the new value back to this connection instead
+        result = db.execute(statement.values(ticket_count=func.last_insert_id(func.coalesce(Project.ticket_count, 0) + 1)))
+        number = db.scalar(select(func.last_insert_id())) if result.rowcount else None
+    db.commit()
+    return number
@@ -0,0 +1,65 @@
+import os
+import hashlib
+import tempfile
+from typing import Optional
+from fastapi import UploadFile
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+
+from Fish_Alchemy_Data.Common.Response import Response, HttpException
+from Fish_Alchemy_Data.Common.MediaStore import UndecodableImage, staging_dir, store, unlink
+
+load_dotenv()
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", 10 * 1024 * 1024))
+CHUNK_SIZE = 64 * 1024
+HEADER_SIZE = 12 # enough bytes to tell every accepted format apart
+
+def detect_image(header: bytes) -> Optional[str]:
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if header.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if header.startswith((b"GIF87a", b"GIF89a")):
+        return "gif"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+def reject(status_code: int, message: str):
+    response = Response()
+    response.add_error("file", message)
+    raise HttpException(status_code=status_code, response=response)
+
+def save_image(db: Session, file: UploadFile, kind: str, max_bytes: int = MAX_UPLOAD_BYTES) -> str:
+    # blocking, call from a sync endpoint so it runs on the threadpool
+    if file.size is not None and file.size > max_bytes:
+        reject(413, f"file must be at most {max_bytes} bytes")
+    fd, staged = tempfile.mkstemp(dir=staging_dir(), prefix="upload-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            digest = hashlib.sha256()
+            header = b""
+            extension = None
+            written = 0
+            while chunk := file.file.read(CHUNK_SIZE):
+                written += len(chunk)
+                if written > max_bytes:
+                    reject(413, f"file must be at most {max_bytes} bytes")
+                if extension is None:
+                    header += chunk
+                    if len(header) < HEADER_SIZE:
+                        continue
+                    extension = detect_image(header)
+                    if extension is None:
+                        reject(415, "file must be a png, jpeg, gif or webp image")
+                    chunk = header
+                digest.update(chunk)
+                out.write(chunk)
+        if extension is None:
+            reject(415, "file must be a png, jpeg, gif or webp image")
+        try:
+            return store(db, staged, digest.hexdigest(), extension, written, kind)
+        except UndecodableImage:
+            reject(415, "file could not be decoded as an image")
+    finally:
+        unlink(staged)
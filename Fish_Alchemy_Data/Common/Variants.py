@@ -0,0 +1,90 @@
+import os
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from PIL import Image, ImageOps
+from dotenv import load_dotenv
+
+load_dotenv()
+VARIANT_WORKERS = int(os.getenv("VARIANT_WORKERS", max(1, (os.cpu_count() or 1) // 2)))
+VARIANT_TIMEOUT = float(os.getenv("VARIANT_TIMEOUT", 30))
+VARIANT_FORMAT = "webp"
+VARIANT_QUALITY = 80
+MEDIA_FILE_MODE = 0o644 # mkstemp creates files private to the owner
+
+SQUARE = "square" # avatars and logos, center-cropped
+BANNER = "banner" # wide images, scaled to a width keeping the aspect ratio
+SIZES = {
+    SQUARE: (32, 64, 256),
+    BANNER: (640, 1280),
+}
+
+def disk_path(path: str) -> str:
+    return os.path.join(os.getcwd(), path.lstrip("/"))
+
+def variant_path(path: str, size: int) -> str:
+    return f"{os.path.splitext(path)[0]}@{size}.{VARIANT_FORMAT}"
+
+def variant_paths(path: str, kind: str) -> dict:
+    return {str(size): variant_path(path, size) for size in SIZES[kind]}
+
+def has_variants(path: str, kind: str) -> bool:
+    return all(os.path.exists(disk_path(variant)) for variant in variant_paths(path, kind).values())
+
+def _render(source: str, kind: str) -> list:
+    sizes = SIZES[kind]
+    written = []
+    with Image.open(source) as image:
+        # lets the jpeg decoder downscale while decoding instead of inflating a full size bitmap
+        image.draft("RGB", (max(sizes), max(sizes)))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        for size in sizes:
+            if kind == SQUARE:
+                variant = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+            elif image.width > size:
+                variant = image.resize((size, max(1, round(image.height * size / image.width))), Image.Resampling.LANCZOS)
+            else:
+                variant = image
+            target = variant_path(source, size)
+            fd, temp = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".variant-")
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    variant.save(out, VARIANT_FORMAT, quality=VARIANT_QUALITY)
+                os.chmod(temp, MEDIA_FILE_MODE)
+                os.replace(temp, target)
+            except BaseException:
+                os.remove(temp)
+                raise
+            written.append(target)
+    return written
+
+class VariantRenderer():
+    def __init__(self, workers: int = VARIANT_WORKERS, timeout: float = VARIANT_TIMEOUT):
+        self.workers = workers
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.pool: Optional[ProcessPoolExecutor] = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self.pool
+
+    def shutdown(self) -> None:
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown(cancel_futures=True)
+                self.pool = None
+
+    def submit(self, path: str, kind: str):
+        return self._executor().submit(_render, disk_path(path), kind)
+
+    def render(self, path: str, kind: str) -> list:
+        return self.submit(path, kind).result(self.timeout)
+
+renderer = VariantRenderer()
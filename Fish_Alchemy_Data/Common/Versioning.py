@@ -0,0 +1,13 @@
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+def bump(*entities) -> None:
+    # evaluated by the database on flush, so concurrent writers can't lose an increment
+    for entity in entities:
+        if entity is not None and entity.id is not None:
+            entity.version = type(entity).version + 1
+
+def bump_where(db: Session, model, *criteria) -> None:
+    db.execute(
+        update(model).where(*criteria).values(version=model.version + 1).execution_options(synchronize_session=False)
+    )
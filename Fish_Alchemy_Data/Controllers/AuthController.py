@@ -1,25 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, Response as FastRes, Request, Cookie
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-import bcrypt
 import itsdangerous
-from typing import Optional
 
-from Fish_Alchemy_Data.database import get_db
+from Fish_Alchemy_Data.database import get_async_db
 from Fish_Alchemy_Data.Entities.Users import User, LoginDto
-from Fish_Alchemy_Data.Entities.Auth import UserAuth, ChangePassDto, create_password_hash
+from Fish_Alchemy_Data.Entities.Auth import UserAuth, ChangePassDto, create_password_hash_async
 from Fish_Alchemy_Data.Common.Response import Response, HttpException
+from Fish_Alchemy_Data.Common.FastJSON import FastJSONRoute
 from Fish_Alchemy_Data.Common.Role import Role
+from Fish_Alchemy_Data.Common.Hashing import hasher
+from Fish_Alchemy_Data.Common.PrincipalCache import Principal, principal_cache
+from Fish_Alchemy_Data.Entities.Groups import Group
+from Fish_Alchemy_Data.Entities.Tickets import Ticket
 
-router = APIRouter(prefix="/api/auth", tags=["Auth"])
+router = APIRouter(prefix="/api/auth", tags=["Auth"], route_class=FastJSONRoute)
 
 SECRET_KEY = "Fish"
 serializer = itsdangerous.URLSafeTimedSerializer(SECRET_KEY)
 COOKIE_NAME = "session_token"
 COOKIE_MAX_AGE = 60 * 60 * 24 # one day
 
-def verify_password(plain:str, hashed: str) -> bool:
-    return bcrypt.checkpw(plain.encode(), hashed.encode())
+async def verify_password(plain:str, hashed: str) -> bool:
+    return await hasher.check_async(plain, hashed)
 
 def create_session_token(user_id: int) -> str:
     return serializer.dumps({"user_id": user_id})
@@ -31,7 +36,7 @@ def verify_session_token(token: str) -> Optional[int]:
     except itsdangerous.BadSignature:
         return None
     
-def get_current_user(session_token: Optional[str] = Cookie(None), db: Session = Depends(get_db)) -> Optional[User]:
+async def get_current_user(session_token: Optional[str] = Cookie(None), db: AsyncSession = Depends(get_async_db)) -> Principal:
     response = Response()
     if not session_token:
         response.add_error("cookie", "not authenticated")
@@ -40,30 +45,44 @@ def get_current_user(session_token: Optional[str] = Cookie(None), db: Session =
     if not user_id:
         response.add_error("cookie", "Invalid or expired token")
         raise HttpException(status_code=401, response=response)
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+    principal = principal_cache.get(user_id)
+    if principal:
+        return principal
+    row = (await db.execute(select(User.id, User.username, UserAuth.role).join(UserAuth, UserAuth.id == User.id).where(User.id == user_id))).first()
+    # hand the connection back now rather than holding it for the rest of the request
+    await db.close()
+    if not row:
         response.add_error("id", "user not found")
         raise HttpException(status_code=404, response=response)
-    return user
+    principal = Principal(id=row.id, username=row.username, role=row.role)
+    principal_cache.put(principal)
+    return principal
 
-def require_admin(user: User = Depends(get_current_user)):
+def require_admin(user: Principal = Depends(get_current_user)):
     response = Response()
-    if user.auth.role != Role.ADMIN:
+    if user.role != Role.ADMIN:
         response.add_error("role", "Admin only")
         raise HttpException(status_code=403, response=response)
     return user
 
 @router.get("/get-current-user")
-def get_current_user_endpoint(user: User = Depends(get_current_user)):
+async def get_current_user_endpoint(db: AsyncSession = Depends(get_async_db), principal: Principal = Depends(get_current_user)):
     response = Response()
+    user = await db.scalar(select(User).options(
+        selectinload(User.groups).joinedload(Group.creator),
+        selectinload(User.tickets).joinedload(Ticket.project),
+    ).where(User.id == principal.id))
+    if not user:
+        principal_cache.invalidate(principal.id)
+        response.add_error("id", "user not found")
+        raise HttpException(status_code=404, response=response)
     response.data = user.toGetDto()
     return response
 
 @router.get("/role")
-def get_role(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def get_role(user: Principal = Depends(get_current_user)):
     response = Response()
-    role = db.query(UserAuth).filter(UserAuth.id == user.id).first().role
-    response.data = {"role": role}
+    response.data = {"role": user.role}
     return response
 
 @router.post("/logout")
@@ -74,12 +93,15 @@ def user_logout(fastres: FastRes):
     return response
 
 @router.post("/login")
-def user_login(fastres: FastRes, logindto: LoginDto, db: Session = Depends(get_db)):
+async def user_login(fastres: FastRes, logindto: LoginDto, db: AsyncSession = Depends(get_async_db)):
     response = Response()
-    user = db.query(User).filter(User.username == logindto.username).first()
-    if not user or not verify_password(logindto.password, user.auth.password_hash):
+    user = await db.scalar(select(User).options(joinedload(User.auth)).where(User.username == logindto.username))
+    if not user or not await verify_password(logindto.password, user.auth.password_hash):
         response.add_error("password", "Username or password is incorrect")
         raise HttpException(status_code=401, response=response)
+    if hasher.needs_rehash(user.auth.password_hash):
+        user.auth.password_hash = await create_password_hash_async(logindto.password)
+        await db.commit()
     token = create_session_token(user.id)
     fastres.set_cookie(
         key=COOKIE_NAME,
@@ -93,16 +115,17 @@ def user_login(fastres: FastRes, logindto: LoginDto, db: Session = Depends(get_d
     return response
 
 @router.post("/password")
-def change_password(changepassdto: ChangePassDto, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+async def change_password(changepassdto: ChangePassDto, db: AsyncSession = Depends(get_async_db), user: Principal = Depends(get_current_user)):
     response = Response()
-    userAuth = db.query(UserAuth).filter(UserAuth.id == user.id).first()
-    if not verify_password(changepassdto.current_password, userAuth.password_hash):
+    userAuth = await db.scalar(select(UserAuth).where(UserAuth.id == user.id))
+    if not await verify_password(changepassdto.current_password, userAuth.password_hash):
         response.add_error("current_password", "incorrect password")
         raise HttpException(status_code=403, response=response)
     if changepassdto.new_password != changepassdto.confirm_new:
         response.add_error("confrim_new", "fields do not match")
         raise HttpException(status_code=400, response=response)
-    userAuth.password_hash = create_password_hash(changepassdto.new_password)
-    db.commit()
+    userAuth.password_hash = await create_password_hash_async(changepassdto.new_password)
+    await db.commit()
+    principal_cache.invalidate(user.id)
     response.data = True
     return response
\ No newline at end of file
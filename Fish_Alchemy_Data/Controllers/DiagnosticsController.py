@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends
+
+from Fish_Alchemy_Data.database import engine, async_engine
+
+from Fish_Alchemy_Data.Common.Response import Response
+from Fish_Alchemy_Data.Common.FastJSON import FastJSONRoute
+from Fish_Alchemy_Data.Common.Payload import dispatcher
+from Fish_Alchemy_Data.Common.MediaSweeper import sweeper
+from Fish_Alchemy_Data.Common.RankRebalancer import rebalancer
+from Fish_Alchemy_Data.Common.PoolStats import pool_stats
+from Fish_Alchemy_Data.Common.QueryMonitor import monitor
+from Fish_Alchemy_Data.Common.PrincipalCache import Principal
+from Fish_Alchemy_Data.Controllers.AuthController import require_admin
+
+router = APIRouter(prefix="/api/diagnostics", tags=["Diagnostics"], route_class=FastJSONRoute)
+
+@router.get("/notifications")
+def get_notification_stats(admin: Principal = Depends(require_admin)):
+    response = Response()
+    response.data = dispatcher.stats()
+    return response
+
+@router.get("/media")
+def get_media_stats(admin: Principal = Depends(require_admin)):
+    response = Response()
+    response.data = sweeper.stats()
+    return response
+
+@router.get("/ranks")
+def get_rank_stats(admin: Principal = Depends(require_admin)):
+    response = Response()
+    response.data = rebalancer.stats()
+    return response
+
+@router.get("/pool")
+def get_pool_stats(admin: Principal = Depends(require_admin)):
+    response = Response()
+    response.data = {"sync": pool_stats(engine), "async": pool_stats(async_engine.sync_engine)}
+    return response
+
+@router.get("/sql")
+def get_sql_stats(admin: Principal = Depends(require_admin)):
+    response = Response()
+    response.data = monitor.stats()
+    return response
@@ -1,30 +1,62 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from Fish_Alchemy_Data.database import get_db
+from fastapi import APIRouter, Depends, Request, Response as FastRes
+from typing import Optional
+from sqlalchemy import select, insert as sql_insert, update as sql_update, delete as sql_delete, or_, tuple_
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from Fish_Alchemy_Data.database import get_db, get_async_db
 from Fish_Alchemy_Data.Common.Response import Response, HttpException
+from Fish_Alchemy_Data.Common.FastJSON import FastJSONRoute
+from Fish_Alchemy_Data.Common.Pagination import paginate_async, DEFAULT_LIMIT
+from Fish_Alchemy_Data.Common.Fields import FieldSelection
+from Fish_Alchemy_Data.Common.Versioning import bump
+from Fish_Alchemy_Data.Common.ETag import make_etag, is_not_modified, not_modified
+from Fish_Alchemy_Data.Common.GraphAnalysis import DependencyGraph, graph_cache
 
-from Fish_Alchemy_Data.Entities.Graphs import Graph, GraphCreateDto, GraphUpdateDto
+from Fish_Alchemy_Data.Entities.Graphs import Graph, GraphGetDto, GraphCreateDto, GraphUpdateDto, GraphBatchDto
 from Fish_Alchemy_Data.Entities.Projects import Project
+from Fish_Alchemy_Data.Entities.Nodes import Node
+from Fish_Alchemy_Data.Entities.NodeAssociation import NodeAssociation
 from Fish_Alchemy_Data.Entities.Users import User
+from Fish_Alchemy_Data.Entities.UserGroups import UserGroup
+from Fish_Alchemy_Data.Common.PrincipalCache import Principal
 from Fish_Alchemy_Data.Controllers.AuthController import get_current_user
 
-router = APIRouter(prefix="/api/graphs", tags=['Graphs'])
+router = APIRouter(prefix="/api/graphs", tags=['Graphs'], route_class=FastJSONRoute)
+
+EXPANSIONS = {
+    "project": (joinedload(Graph.project).joinedload(Project.lead),),
+    "nodes": (selectinload(Graph.nodes),),
+}
+
+SORTABLE = {"id": Graph.id, "name": Graph.name}
+
+MAX_BATCH_OPERATIONS = 20000
 
 @router.get("/")
-def get_all(db: Session = Depends(get_db)):
+async def get_all(projectid: Optional[int] = None, sort: str = "id", limit: int = DEFAULT_LIMIT, after: Optional[str] = None, fields: Optional[str] = None, expand: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
     response = Response()
-    graphs = db.query(Graph).all()
-    response.data = [graph.toGetDto() for graph in graphs]
+    selection = FieldSelection(GraphGetDto, EXPANSIONS, fields, expand)
+    query = select(Graph).options(*selection.options)
+    if projectid is not None:
+        query = query.filter(Graph.project_id == projectid)
+    graphs, response.next_cursor = await paginate_async(db, query, sort, SORTABLE, Graph.id, limit, after)
+    response.data = [selection.render(graph) for graph in graphs]
     return response
 
 @router.get("/{id}")
-def get_by_id(id: int, db: Session = Depends(get_db)):
+async def get_by_id(id: int, request: Request, fastres: FastRes, fields: Optional[str] = None, expand: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
     response = Response()
-    graph = db.query(Graph).filter(Graph.id == id).first()
-    if not graph:
+    selection = FieldSelection(GraphGetDto, EXPANSIONS, fields, expand)
+    versions = (await db.execute(select(Graph.version, Project.version).outerjoin(Project, Project.id == Graph.project_id).where(Graph.id == id))).first()
+    if not versions:
         response.add_error("id", "graph not found")
         raise HttpException(status_code=404, response=response)
-    response.data = graph.toGetDto()
+    etag = make_etag("graph", id, *versions, *selection.tag())
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    graph = await db.scalar(select(Graph).options(*selection.options).where(Graph.id == id))
+    fastres.headers["ETag"] = etag
+    response.data = selection.render(graph)
     return response
 
 @router.post("/project/{projectid}")
@@ -43,6 +75,7 @@ def create(graphdto: GraphCreateDto, projectid: int, db: Session = Depends(get_d
         project=project
     )
     db.add(graph)
+    bump(project)
     db.commit()
     response.data = graph.toGetDto()
     return response
@@ -59,6 +92,7 @@ def update(graphdto: GraphUpdateDto, id: int, db: Session = Depends(get_db)):
         raise HttpException(status_code=400, response=response)
     graph.name = graphdto.name
     graph.description = graphdto.description
+    bump(graph, graph.project)
     db.commit()
     response.data = graph.toGetDto()
     return response
@@ -70,17 +104,231 @@ def delete(id: int, db: Session = Depends(get_db)):
     if not graph:
         response.add_error("id", "graph not found")
         raise HttpException(status_code=404, response=response)
+    bump(graph.project)
     db.delete(graph)
     db.commit()
     response.data = True
     return response
 
 @router.get("/{id}/auth")
-def does_user_have_auth(id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def does_user_have_auth(id: int, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     response = Response()
     graph = db.query(Graph).filter(Graph.id == id).first()
     if not graph:
         response.add_error("id", "cannot find graph")
         raise HttpException(status_code=404, response=response)
-    response.data = graph.project.group in user.groups
-    return response
\ No newline at end of file
+    response.data = db.query(UserGroup).filter(UserGroup.user_id == user.id, UserGroup.group_id == graph.project.group_id).first() is not None
+    return response
+
+def load_dependency_graph(id: int, db: Session, acyclic: bool = False) -> DependencyGraph:
+    response = Response()
+    version = db.query(Graph.version).filter(Graph.id == id).scalar()
+    if version is None:
+        response.add_error("id", "graph not found")
+        raise HttpException(status_code=404, response=response)
+    graph = graph_cache.get(("analysis", id, version))
+    if graph is None:
+        rows = db.query(Node.id, NodeAssociation.dependency_id).outerjoin(
+            NodeAssociation, NodeAssociation.dependent_id == Node.id
+        ).filter(Node.graph_id == id).order_by(Node.id).all()
+        graph = DependencyGraph(rows)
+        graph_cache.put(("analysis", id, version), graph)
+    if acyclic and graph.has_cycle:
+        response.add_error("graph", "graph contains a cycle")
+        raise HttpException(status_code=400, response=response)
+    return graph
+
+@router.get("/{id}/topological-order")
+def get_topological_order(id: int, db: Session = Depends(get_db)):
+    response = Response()
+    response.data = load_dependency_graph(id, db, acyclic=True).topological_order()
+    return response
+
+@router.get("/{id}/layers")
+def get_layers(id: int, db: Session = Depends(get_db)):
+    response = Response()
+    response.data = load_dependency_graph(id, db, acyclic=True).layers()
+    return response
+
+@router.get("/{id}/roots")
+def get_roots(id: int, db: Session = Depends(get_db)):
+    response = Response()
+    response.data = load_dependency_graph(id, db).roots()
+    return response
+
+@router.get("/{id}/leaves")
+def get_leaves(id: int, db: Session = Depends(get_db)):
+    response = Response()
+    response.data = load_dependency_graph(id, db).leaves()
+    return response
+
+@router.get("/{id}/critical-path")
+def get_critical_path(id: int, db: Session = Depends(get_db)):
+    response = Response()
+    response.data = load_dependency_graph(id, db, acyclic=True).critical_path()
+    return response
+
+@router.get("/{id}/components")
+def get_components(id: int, db: Session = Depends(get_db)):
+    response = Response()
+    response.data = load_dependency_graph(id, db).components()
+    return response
+
+
+def plan_batch(batchdto: GraphBatchDto, names: dict, edges: set, response: Response) -> dict:
+    # replays the operations against an in-memory copy of the graph so the whole batch is validated before any write
+    live = dict(names)
+    created, renamed, deleted, temp_ids = {}, {}, set(), set()
+    original, edges = edges, set(edges)
+
+    def resolve(ref, prop: str):
+        if ref in live:
+            return ref
+        if ref is None:
+            response.add_error(prop, "node is required")
+        elif isinstance(ref, int) and ref in deleted:
+            response.add_error(prop, f"node {ref} was deleted earlier in the batch")
+        elif isinstance(ref, int):
+            response.add_error(prop, f"node {ref} is not in this graph")
+        else:
+            response.add_error(prop, f"unknown temp id {ref}")
+        return None
+
+    for i, operation in enumerate(batchdto.operations):
+        prop = f"operations[{i}]"
+        if operation.op == "create":
+            if not operation.temp_id or operation.temp_id in temp_ids:
+                response.add_error(f"{prop}.temp_id", "temp id must be unique and not empty")
+                continue
+            if not operation.name:
+                response.add_error(f"{prop}.name", "name cannot be empty")
+                continue
+            temp_ids.add(operation.temp_id)
+            live[operation.temp_id] = created[operation.temp_id] = operation.name
+        elif operation.op == "rename":
+            node = resolve(operation.node, f"{prop}.node")
+            if node is None:
+                continue
+            if not operation.name:
+                response.add_error(f"{prop}.name", "name cannot be empty")
+                continue
+            live[node] = operation.name
+            if node in created:
+                created[node] = operation.name
+            else:
+                renamed[node] = operation.name
+        elif operation.op == "delete":
+            node = resolve(operation.node, f"{prop}.node")
+            if node is None:
+                continue
+            del live[node]
+            edges = {edge for edge in edges if node not in edge}
+            if node in created:
+                del created[node]
+            else:
+                renamed.pop(node, None)
+                deleted.add(node)
+        elif operation.op in ("connect", "disconnect"):
+            dependent = resolve(operation.dependent, f"{prop}.dependent")
+            dependency = resolve(operation.dependency, f"{prop}.dependency")
+            if dependent is None or dependency is None:
+                continue
+            if operation.op == "connect":
+                if dependent == dependency:
+                    response.add_error(prop, "cannot connect node to itself")
+                elif (dependent, dependency) in edges:
+                    response.add_error(prop, "nodes already connected")
+                else:
+                    edges.add((dependent, dependency))
+            elif (dependent, dependency) not in edges:
+                response.add_error(prop, "nodes not connected")
+            else:
+                edges.remove((dependent, dependency))
+        else:
+            response.add_error(f"{prop}.op", "op must be one of create, rename, delete, connect, disconnect")
+    # a graph that already had a cycle can still be edited, but a batch may not be what introduces one
+    if not response.has_errors and DependencyGraph([(node, None) for node in live] + list(edges)).has_cycle:
+        if not DependencyGraph([(node, None) for node in names] + list(original)).has_cycle:
+            response.add_error("operations", "batch would create a dependency cycle")
+    return {"created": created, "renamed": renamed, "deleted": deleted, "edges": edges}
+
+@router.post("/{id}/batch")
+def apply_batch(batchdto: GraphBatchDto, id: int, db: Session = Depends(get_db)):
+    response = Response()
+    graph = db.query(Graph).filter(Graph.id == id).first()
+    if not graph:
+        response.add_error("id", "graph not found")
+        raise HttpException(status_code=404, response=response)
+    if len(batchdto.operations) > MAX_BATCH_OPERATIONS:
+        response.add_error("operations", f"at most {MAX_BATCH_OPERATIONS} operations per batch")
+        raise HttpException(status_code=400, response=response)
+    names = dict(db.query(Node.id, Node.name).filter(Node.graph_id == id).all())
+    edges = set(db.query(NodeAssociation.dependent_id, NodeAssociation.dependency_id).join(
+        Node, Node.id == NodeAssociation.dependent_id
+    ).filter(Node.graph_id == id).all())
+    plan = plan_batch(batchdto, names, edges, response)
+    if response.has_errors:
+        raise HttpException(status_code=400, response=response)
+
+    ids = {}
+    if plan["created"] and db.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+        new_ids = db.scalars(
+            sql_insert(Node).returning(Node.id, sort_by_parameter_order=True),
+            [{"name": name, "graph_id": id} for name in plan["created"].values()]
+        ).all()
+        ids = dict(zip(plan["created"], new_ids))
+    elif plan["created"]:
+        # no ordered RETURNING (mysql), let the unit of work fetch each generated key
+        nodes = {temp_id: Node(name=name, graph_id=id) for temp_id, name in plan["created"].items()}
+        db.add_all(nodes.values())
+        db.flush()
+        ids = {temp_id: node.id for temp_id, node in nodes.items()}
+    final_edges = {(ids.get(dependent, dependent), ids.get(dependency, dependency)) for dependent, dependency in plan["edges"]}
+    removed = edges - final_edges
+    added = final_edges - edges
+    if removed:
+        db.execute(sql_delete(NodeAssociation).where(
+            tuple_(NodeAssociation.dependent_id, NodeAssociation.dependency_id).in_(list(removed))
+        ).execution_options(synchronize_session=False))
+    if plan["deleted"]:
+        db.execute(sql_delete(NodeAssociation).where(or_(
+            NodeAssociation.dependent_id.in_(plan["deleted"]), NodeAssociation.dependency_id.in_(plan["deleted"])
+        )).execution_options(synchronize_session=False))
+        db.execute(sql_delete(Node).where(Node.id.in_(plan["deleted"])).execution_options(synchronize_session=False))
+    if plan["renamed"]:
+        db.execute(sql_update(Node), [{"id": node, "name": name} for node, name in plan["renamed"].items()])
+    if added:
+        db.execute(sql_insert(NodeAssociation), [{"dependent_id": dependent, "dependency_id": dependency} for dependent, dependency in added])
+    bump(graph)
+    db.commit()
+    response.data = {"ids": ids}
+    return response
+
+@router.get("/{id}/snapshot")
+async def get_snapshot(id: int, request: Request, fastres: FastRes, db: AsyncSession = Depends(get_async_db)):
+    response = Response()
+    graph = (await db.execute(select(Graph.name, Graph.version).where(Graph.id == id))).first()
+    if not graph:
+        response.add_error("id", "graph not found")
+        raise HttpException(status_code=404, response=response)
+    etag = make_etag("graph-snapshot", id, graph.version)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    snapshot = graph_cache.get(("snapshot", id, graph.version))
+    if snapshot is None:
+        nodes = (await db.execute(select(Node.id, Node.name).where(Node.graph_id == id).order_by(Node.id))).all()
+        edges = (await db.execute(select(NodeAssociation.dependency_id, NodeAssociation.dependent_id).join(
+            Node, Node.id == NodeAssociation.dependent_id
+        ).where(Node.graph_id == id))).all()
+        snapshot = {
+            "id": id,
+            "name": graph.name,
+            "version": graph.version,
+            "ids": [node.id for node in nodes],
+            "names": [node.name for node in nodes],
+            "edges": [node_id for edge in edges for node_id in edge],
+        }
+        graph_cache.put(("snapshot", id, graph.version), snapshot)
+    fastres.headers["ETag"] = etag
+    response.data = snapshot
+    return response
@@ -1,21 +1,35 @@
-from fastapi import APIRouter, Depends, File, UploadFile
-from sqlalchemy.orm import Session
-import os
-import uuid
+from fastapi import APIRouter, Depends, File, UploadFile, Request, Response as FastRes
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import Optional
 from Fish_Alchemy_Data.database import get_db
 from Fish_Alchemy_Data.Common.Response import Response, HttpException
+from Fish_Alchemy_Data.Common.FastJSON import FastJSONRoute
+from Fish_Alchemy_Data.Common.Uploads import save_image
+from Fish_Alchemy_Data.Common.MediaStore import release
+from Fish_Alchemy_Data.Common.Variants import SQUARE, BANNER
+from Fish_Alchemy_Data.Common.Pagination import paginate, DEFAULT_LIMIT
+from Fish_Alchemy_Data.Common.Fields import FieldSelection
+from Fish_Alchemy_Data.Common.Versioning import bump, bump_where
+from Fish_Alchemy_Data.Common.ETag import make_etag, is_not_modified, not_modified
 
-from Fish_Alchemy_Data.Entities.Groups import Group, GroupCreateDto, GroupUpdateDto, DEFAULT_LOGO, DEFAULT_BANNER
+from Fish_Alchemy_Data.Entities.Groups import Group, GroupGetDto, GroupCreateDto, GroupUpdateDto, DEFAULT_LOGO, DEFAULT_BANNER
 from Fish_Alchemy_Data.Entities.Users import User
+from Fish_Alchemy_Data.Entities.Projects import Project, DEFAULT_LOGO as PROJECT_LOGO, DEFAULT_BANNER as PROJECT_BANNER
+from Fish_Alchemy_Data.Common.PrincipalCache import Principal
 from Fish_Alchemy_Data.Controllers.AuthController import get_current_user
 
-LOGO_PATH = "/media/group/logo"
-BANNER_PATH = "/media/group/banner"
+router = APIRouter(prefix="/api/groups", tags=['Groups'], route_class=FastJSONRoute)
 
-router = APIRouter(prefix="/api/groups", tags=['Groups'])
+EXPANSIONS = {
+    "creator": (joinedload(Group.creator),),
+    "users": (selectinload(Group.users),),
+    "projects": (selectinload(Group.projects).joinedload(Project.lead),),
+}
+
+SORTABLE = {"id": Group.id, "name": Group.name}
 
 @router.post("/")
-def create_group(groupdto: GroupCreateDto, db: Session = Depends(get_db), userdto: User = Depends(get_current_user)):
+def create_group(groupdto: GroupCreateDto, db: Session = Depends(get_db), userdto: Principal = Depends(get_current_user)):
     response = Response()
     if len(groupdto.name) == 0:
         response.add_error("name", "name must not be empty")
@@ -30,7 +44,7 @@ def create_group(groupdto: GroupCreateDto, db: Session = Depends(get_db), userdt
     return response
 
 @router.patch("/{id}/name")
-def update_name(groupdto: GroupUpdateDto, id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def update_name(groupdto: GroupUpdateDto, id: int, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     response = Response()
     group = db.query(Group).filter(Group.id == id).first()
     if not group:
@@ -43,11 +57,14 @@ def update_name(groupdto: GroupUpdateDto, id: int, db: Session = Depends(get_db)
         response.add_error("user", "only creator can update group")
         raise HttpException(status_code=403, response=response)
     group.name = groupdto.name
+    bump(group)
+    bump_where(db, Project, Project.group_id == group.id)
+    db.commit()
     response.data = group.toGetDto()
     return response
 
 @router.post("/{groupId}/user/{userId}")
-def add_user(groupId: int, userId: int, db: Session = Depends(get_db), authedUser: User = Depends(get_current_user)):
+def add_user(groupId: int, userId: int, db: Session = Depends(get_db), authedUser: Principal = Depends(get_current_user)):
     response = Response()
     group = db.query(Group).filter(Group.id == groupId, Group.users.any(User.id != userId)).first()
     user = db.query(User).filter(User.id == userId).first()
@@ -64,12 +81,13 @@ def add_user(groupId: int, userId: int, db: Session = Depends(get_db), authedUse
     if response.has_errors:
         raise HttpException(status_code=400, response=response)
     group.users.append(user)
+    bump(group)
     db.commit()
     response.data = group.toGetDto()
     return response
 
 @router.delete("/{groupId}/user/{userId}")
-def remove_user(groupId: int, userId: int, db: Session = Depends(get_db), authedUser: User = Depends(get_current_user)):
+def remove_user(groupId: int, userId: int, db: Session = Depends(get_db), authedUser: Principal = Depends(get_current_user)):
     response = Response()
     group = db.query(Group).filter(Group.id == groupId, Group.users.any(User.id == userId)).first()
     user = db.query(User).filter(User.id == userId).first()
@@ -86,29 +104,40 @@ def remove_user(groupId: int, userId: int, db: Session = Depends(get_db), authed
     if response.has_errors:
         raise HttpException(status_code=400, response=response)
     group.users.remove(user)
+    bump(group)
     db.commit()
     response.data = group.toGetDto()
     return response
 
 @router.get("/")
-def get_all(db: Session = Depends(get_db)):
+def get_all(userid: Optional[int] = None, sort: str = "id", limit: int = DEFAULT_LIMIT, after: Optional[str] = None, fields: Optional[str] = None, expand: Optional[str] = None, db: Session = Depends(get_db)):
     response = Response()
-    groups = db.query(Group).all()
-    response.data = [group.toGetDto() for group in groups]
+    selection = FieldSelection(GroupGetDto, EXPANSIONS, fields, expand)
+    query = db.query(Group).options(*selection.options)
+    if userid is not None:
+        query = query.filter(Group.users.any(User.id == userid))
+    groups, response.next_cursor = paginate(query, sort, SORTABLE, Group.id, limit, after)
+    response.data = [selection.render(group) for group in groups]
     return response
 
 @router.get("/{id}")
-def get_by_id(id: int, db: Session = Depends(get_db)):
+def get_by_id(id: int, request: Request, fastres: FastRes, fields: Optional[str] = None, expand: Optional[str] = None, db: Session = Depends(get_db)):
     response = Response()
-    group = db.query(Group).filter(Group.id == id).first()
-    if not group:
+    selection = FieldSelection(GroupGetDto, EXPANSIONS, fields, expand)
+    version = db.query(Group.version).filter(Group.id == id).scalar()
+    if version is None:
         response.add_error("id", "group not found")
         raise HttpException(status_code=404, response=response)
-    response.data = group.toGetDto()
+    etag = make_etag("group", id, version, *selection.tag())
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    group = db.query(Group).options(*selection.options).filter(Group.id == id).first()
+    fastres.headers["ETag"] = etag
+    response.data = selection.render(group)
     return response
 
 @router.patch("/{id}/logo")
-async def update_logo(id: int, file: UploadFile = File(...), db: Session = Depends(get_db), authedUser: User = Depends(get_current_user)):
+def update_logo(id: int, file: UploadFile = File(...), db: Session = Depends(get_db), authedUser: Principal = Depends(get_current_user)):
     response = Response()
     group = db.query(Group).filter(Group.id == id).first()
     if not group:
@@ -120,21 +149,17 @@ async def update_logo(id: int, file: UploadFile = File(...), db: Session = Depen
     if authedUser.id != group.creator.id:
         response.add_error("user", "Only creator can update logo")
         raise HttpException(status_code=403, response=response)
-    extension = file.filename.split(".")[-1]
-    filename = f"{uuid.uuid4()}.{extension}"
-    cwd = os.getcwd()
-    filepath = os.path.join(LOGO_PATH, filename)
-    if group.logo_path != DEFAULT_LOGO:
-        os.remove(os.path.join(cwd, group.logo_path[1:]))
-    with open(os.path.join(cwd, filepath[1:]), "wb") as f:
-        f.write(await file.read())
+    filepath = save_image(db, file, SQUARE)
+    release(db, group.logo_path, DEFAULT_LOGO)
     group.logo_path = filepath
+    bump(group)
+    bump_where(db, Project, Project.group_id == group.id)
     db.commit()
     response.data = group.toGetDto()
     return response
 
 @router.patch("/{id}/banner")
-async def update_banner(id: int, file: UploadFile = File(...), db: Session = Depends(get_db), authedUser: User = Depends(get_current_user)):
+def update_banner(id: int, file: UploadFile = File(...), db: Session = Depends(get_db), authedUser: Principal = Depends(get_current_user)):
     response = Response()
     group = db.query(Group).filter(Group.id == id).first()
     if not group:
@@ -146,21 +171,16 @@ async def update_banner(id: int, file: UploadFile = File(...), db: Session = Dep
     if authedUser.id != group.creator.id:
         response.add_error("user", "Only creator can update banner")
         raise HttpException(status_code=403, response=response)
-    extension = file.filename.split(".")[-1]
-    filename = f"{uuid.uuid4()}.{extension}"
-    cwd = os.getcwd()
-    filepath = os.path.join(BANNER_PATH, filename)
-    if group.banner_path != DEFAULT_BANNER:
-        os.remove(os.path.join(cwd, group.banner_path[1:]))
-    with open(os.path.join(cwd, filepath[1:]), "wb") as f:
-        f.write(await file.read())
+    filepath = save_image(db, file, BANNER)
+    release(db, group.banner_path, DEFAULT_BANNER)
     group.banner_path = filepath
+    bump(group)
     db.commit()
     response.data = group.toGetDto()
     return response 
 
 @router.delete("/{id}/logo")
-def remove_logo(id: int, db: Session = Depends(get_db), authedUser: User = Depends(get_current_user)):
+def remove_logo(id: int, db: Session = Depends(get_db), authedUser: Principal = Depends(get_current_user)):
     response = Response()
     group = db.query(Group).filter(Group.id == id).first()
     if not group:
@@ -172,15 +192,16 @@ def remove_logo(id: int, db: Session = Depends(get_db), authedUser: User = Depen
     if authedUser.id != group.creator.id:
         response.add_error("user", "Only creator can remove logo")
         raise HttpException(status_code=403, response=response)
-    cwd = os.getcwd()
-    os.remove(os.path.join(cwd, group.logo_path[1:]))
+    release(db, group.logo_path, DEFAULT_LOGO)
     group.logo_path = DEFAULT_LOGO
+    bump(group)
+    bump_where(db, Project, Project.group_id == group.id)
     db.commit()
     response.data = group.toGetDto()
     return response
 
 @router.delete("/{id}/banner")
-def remove_banner(id: int, db: Session = Depends(get_db), authedUser: User = Depends(get_current_user)):
+def remove_banner(id: int, db: Session = Depends(get_db), authedUser: Principal = Depends(get_current_user)):
     response = Response()
     group = db.query(Group).filter(Group.id == id).first()
     if not group:
@@ -191,15 +212,15 @@ def remove_banner(id: int, db: Session = Depends(get_db), authedUser: User = Dep
     if authedUser.id != group.creator.id:
         response.add_error("user", "Only creator can remove banner")
         raise HttpException(status_code=403, response=response)
-    cwd = os.getcwd()
-    os.remove(os.path.join(cwd, group.banner_path[1:]))
+    release(db, group.banner_path, DEFAULT_BANNER)
     group.banner_path = DEFAULT_BANNER
+    bump(group)
     db.commit()
     response.data = group.toGetDto()
     return response
 
 @router.delete("/{id}")
-def delete_group(id: int, db: Session = Depends(get_db), authedUser: User = Depends(get_current_user)):
+def delete_group(id: int, db: Session = Depends(get_db), authedUser: Principal = Depends(get_current_user)):
     response = Response()
     group = db.query(Group).filter(Group.id == id).first()
     if not group:
@@ -208,6 +229,12 @@ def delete_group(id: int, db: Session = Depends(get_db), authedUser: User = Depe
     if authedUser.id != group.creator.id:
         response.add_error("user", "Only creator can delete group")
         raise HttpException(status_code=403, response=response)
+    # the group's projects go with it, and so do their references
+    for project in group.projects:
+        release(db, project.logo_path, PROJECT_LOGO)
+        release(db, project.banner_path, PROJECT_BANNER)
+    release(db, group.logo_path, DEFAULT_LOGO)
+    release(db, group.banner_path, DEFAULT_BANNER)
     db.delete(group)
     db.commit()
     response.data = True
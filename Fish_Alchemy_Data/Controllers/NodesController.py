@@ -1,39 +1,63 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request, Response as FastRes
+from typing import Optional
+from sqlalchemy.orm import Session, joinedload, selectinload
 from Fish_Alchemy_Data.database import get_db
 from Fish_Alchemy_Data.Common.Response import Response, HttpException
+from Fish_Alchemy_Data.Common.FastJSON import FastJSONRoute
+from Fish_Alchemy_Data.Common.Pagination import paginate, DEFAULT_LIMIT
+from Fish_Alchemy_Data.Common.Fields import FieldSelection
+from Fish_Alchemy_Data.Common.Versioning import bump
+from Fish_Alchemy_Data.Common.ETag import make_etag, is_not_modified, not_modified
 
-from Fish_Alchemy_Data.Entities.Nodes import Node, NodeCreateDto, NodeUpdateDto
+from Fish_Alchemy_Data.Entities.Nodes import Node, NodeGetDto, NodeCreateDto, NodeUpdateDto
 from Fish_Alchemy_Data.Entities.NodeAssociation import NodeAssociation
 from Fish_Alchemy_Data.Entities.Graphs import Graph
 
-router = APIRouter(prefix="/api/nodes", tags=['Nodes'])
+router = APIRouter(prefix="/api/nodes", tags=['Nodes'], route_class=FastJSONRoute)
+
+EXPANSIONS = {
+    "graph": (joinedload(Node.graph),),
+    "dependencies": (selectinload(Node.dependents).joinedload(NodeAssociation.dependency),),
+}
+
+SORTABLE = {"id": Node.id, "name": Node.name}
 
 @router.get("/")
-def get_all(db: Session = Depends(get_db)):
+def get_all(graphid: Optional[int] = None, sort: str = "id", limit: int = DEFAULT_LIMIT, after: Optional[str] = None, fields: Optional[str] = None, expand: Optional[str] = None, db: Session = Depends(get_db)):
     response = Response()
-    nodes = db.query(Node).all()
-    response.data = [node.toGetDto() for node in nodes]
+    selection = FieldSelection(NodeGetDto, EXPANSIONS, fields, expand)
+    query = db.query(Node).options(*selection.options)
+    if graphid is not None:
+        query = query.filter(Node.graph_id == graphid)
+    nodes, response.next_cursor = paginate(query, sort, SORTABLE, Node.id, limit, after)
+    response.data = [selection.render(node) for node in nodes]
     return response
 
 @router.get("/id")
-def get_by_id(id: int, db: Session = Depends(get_db)):
+def get_by_id(id: int, fields: Optional[str] = None, expand: Optional[str] = None, db: Session = Depends(get_db)):
     response = Response()
-    node = db.query(Node).filter(Node.id == id).first()
+    selection = FieldSelection(NodeGetDto, EXPANSIONS, fields, expand)
+    node = db.query(Node).options(*selection.options).filter(Node.id == id).first()
     if not node:
         response.add_error("id", "node not found")
         raise HttpException(status_code=404, response=response)
-    response.data = node.toGetDto()
+    response.data = selection.render(node)
     return response
 
 @router.get("/graph/{id}")
-def get_by_graph(id: int, db: Session = Depends(get_db)):
+def get_by_graph(id: int, request: Request, fastres: FastRes, fields: Optional[str] = None, expand: Optional[str] = None, db: Session = Depends(get_db)):
     response = Response()
-    graph = db.query(Graph).filter(Graph.id == id).first()
-    if not graph:
+    selection = FieldSelection(NodeGetDto, EXPANSIONS, fields, expand)
+    version = db.query(Graph.version).filter(Graph.id == id).scalar()
+    if version is None:
         response.add_error("id", "graph not found")
         raise HttpException(status_code=404, response=response)
-    response.data = [node.toGetDto() for node in graph.nodes]
+    etag = make_etag("graph-nodes", id, version, *selection.tag())
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    fastres.headers["ETag"] = etag
+    nodes = db.query(Node).options(*selection.options).filter(Node.graph_id == id).all()
+    response.data = [selection.render(node) for node in nodes]
     return response
 
 @router.post("/graph/{graphid}")
@@ -51,6 +75,7 @@ def create(nodedto: NodeCreateDto, graphid: int, db: Session = Depends(get_db)):
         graph=graph
     )
     db.add(node)
+    bump(graph)
     db.commit()
     response.data = node.toGetDto()
     return response
@@ -71,6 +96,7 @@ def connect_nodes(dependentid: int, dependencyid: int, db: Session = Depends(get
         raise HttpException(status_code=400, response=response)
     edge = NodeAssociation(dependent=dependent, dependency=dependency)
     db.add(edge)
+    bump(dependent.graph, dependency.graph)
     db.commit()
     response.data = True
     return response
@@ -78,10 +104,11 @@ def connect_nodes(dependentid: int, dependencyid: int, db: Session = Depends(get
 @router.delete("/dependent/{dependentid}/dependency/{dependencyid}")
 def disconnect_nodes(dependentid: int, dependencyid: int, db: Session = Depends(get_db)):
     response = Response()
-    connection = db.query(NodeAssociation).filter(NodeAssociation.dependency_id == dependencyid and NodeAssociation.dependent_id == dependentid).first()
+    connection = db.query(NodeAssociation).filter(NodeAssociation.dependency_id == dependencyid, NodeAssociation.dependent_id == dependentid).first()
     if not connection:
         response.add_error("edge", "nodes not connected")
         raise HttpException(status_code=400, response=response)
+    bump(connection.dependent.graph)
     db.delete(connection)
     db.commit()
     response.data = True
@@ -98,6 +125,7 @@ def update(nodedto: NodeUpdateDto, id: int, db: Session = Depends(get_db)):
         response.add_error("name", "name cannot be empty")
         raise HttpException(status_code=400, response=response)
     node.name = nodedto.name
+    bump(node.graph)
     db.commit()
     response.data = node.toGetDto()
     return response
@@ -109,6 +137,7 @@ def delete(id: int, db: Session = Depends(get_db)):
     if not node:
         response.add_error("id", "node not found")
         raise HttpException(status_code=404, response=response)
+    bump(node.graph)
     db.delete(node)
     db.commit()
     response.data = True
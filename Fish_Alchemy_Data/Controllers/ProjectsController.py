@@ -1,22 +1,43 @@
-from fastapi import APIRouter, Depends, File, UploadFile
-from sqlalchemy.orm import Session
-import os
-import uuid
-from Fish_Alchemy_Data.database import get_db
+from fastapi import APIRouter, Depends, File, UploadFile, Request, Response as FastRes
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from Fish_Alchemy_Data.database import get_db, get_async_db
 from Fish_Alchemy_Data.Common.Response import Response, HttpException
+from Fish_Alchemy_Data.Common.FastJSON import FastJSONRoute
+from Fish_Alchemy_Data.Common.Uploads import save_image
+from Fish_Alchemy_Data.Common.MediaStore import release
+from Fish_Alchemy_Data.Common.Variants import SQUARE, BANNER
+from Fish_Alchemy_Data.Common.Pagination import paginate_async, DEFAULT_LIMIT
+from Fish_Alchemy_Data.Common.Fields import FieldSelection
+from Fish_Alchemy_Data.Common.Versioning import bump
+from Fish_Alchemy_Data.Common.ETag import make_etag, is_not_modified, not_modified
 
-from Fish_Alchemy_Data.Entities.Projects import Project, ProjectUpdateDto, ProjectCreateDto, DEFAULT_LOGO, DEFAULT_BANNER
+from Fish_Alchemy_Data.Entities.Projects import Project, ProjectGetDto, ProjectUpdateDto, ProjectCreateDto, DEFAULT_LOGO, DEFAULT_BANNER
 from Fish_Alchemy_Data.Entities.Groups import Group
 from Fish_Alchemy_Data.Entities.Users import User
+from Fish_Alchemy_Data.Entities.Tickets import Ticket, TicketGetDto, TicketBoardColumnDto
+from Fish_Alchemy_Data.Common.TicketState import TicketState
+from Fish_Alchemy_Data.Common.PrincipalCache import Principal
 from Fish_Alchemy_Data.Controllers.AuthController import get_current_user
+from Fish_Alchemy_Data.Controllers.TicketsController import EXPANSIONS as TICKET_EXPANSIONS, SORTABLE as TICKET_SORTABLE
 
-LOGO_PATH = "/media/project/logo"
-BANNER_PATH = "/media/project/banner"
+router = APIRouter(prefix="/api/projects", tags=['Projects'], route_class=FastJSONRoute)
 
-router = APIRouter(prefix="/api/projects", tags=['Projects'])
+EXPANSIONS = {
+    "lead": (joinedload(Project.lead),),
+    "group": (joinedload(Project.group).joinedload(Group.creator),),
+    "tickets": (selectinload(Project.tickets).joinedload(Ticket.user),),
+    "graphs": (selectinload(Project.graphs),),
+}
+
+SORTABLE = {"id": Project.id, "name": Project.name}
+
+BOARD_LIMIT = 25 # tickets per column on the first load
 
 @router.post("/groupid/{groupid}")
-def create(projectdto: ProjectCreateDto, groupid: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def create(projectdto: ProjectCreateDto, groupid: int, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     response = Response()
     if len(projectdto.name) == 0:
         response.add_error("name", "name cannot be empty")
@@ -38,12 +59,13 @@ def create(projectdto: ProjectCreateDto, groupid: int, db: Session = Depends(get
         group=group
     )
     db.add(project)
+    bump(group)
     db.commit()
     response.data=project.toGetDto()
     return response
 
 @router.patch("/{projectid}")
-def update(projectdto: ProjectUpdateDto, projectid: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def update(projectdto: ProjectUpdateDto, projectid: int, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     response = Response()
     project = db.query(Project).filter(Project.id == projectid).first()
     if len(projectdto.name) == 0:
@@ -59,12 +81,13 @@ def update(projectdto: ProjectUpdateDto, projectid: int, db: Session = Depends(g
     project.description = projectdto.description
     project.discord_webhook_url = projectdto.discord_webhook_url
     project.github_url = projectdto.github_url
+    bump(project, project.group)
     db.commit()
     response.data = project.toGetDto()
     return response
 
 @router.patch("/{projectid}/user/{userid}")
-def change_lead(projectid: int, userid: int, db: Session = Depends(get_db), lead: User = Depends(get_current_user)):
+def change_lead(projectid: int, userid: int, db: Session = Depends(get_db), lead: Principal = Depends(get_current_user)):
     response = Response()
     project = db.query(Project).filter(Project.id == projectid).first()
     if not project:
@@ -80,41 +103,99 @@ def change_lead(projectid: int, userid: int, db: Session = Depends(get_db), lead
     if response.has_errors:
         raise HttpException(status_code=400, response=response)
     project.lead = user
+    bump(project, project.group)
     db.commit()
     response.data = project.toGetDto()
     return response
 
 @router.get("/{id}")
-def get_by_id(id: int, db: Session = Depends(get_db)):
+async def get_by_id(id: int, request: Request, fastres: FastRes, fields: Optional[str] = None, expand: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
     response = Response()
-    project = db.query(Project).filter(Project.id == id).first()
-    if not project:
+    selection = FieldSelection(ProjectGetDto, EXPANSIONS, fields, expand)
+    version = await db.scalar(select(Project.version).where(Project.id == id))
+    if version is None:
         response.add_error("id", "project not found")
         raise HttpException(status_code=404, response=response)
-    response.data = project.toGetDto()
+    etag = make_etag("project", id, version, *selection.tag())
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    project = await db.scalar(select(Project).options(*selection.options).where(Project.id == id))
+    fastres.headers["ETag"] = etag
+    response.data = selection.render(project)
     return response
 
 @router.get("/")
-def get_all(db: Session = Depends(get_db)):
+async def get_all(groupid: Optional[int] = None, sort: str = "id", limit: int = DEFAULT_LIMIT, after: Optional[str] = None, fields: Optional[str] = None, expand: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
     response = Response()
-    projects = db.query(Project).all()
-    response.data = [project.toGetDto() for project in projects]
+    selection = FieldSelection(ProjectGetDto, EXPANSIONS, fields, expand)
+    query = select(Project).options(*selection.options)
+    if groupid is not None:
+        query = query.filter(Project.group_id == groupid)
+    projects, response.next_cursor = await paginate_async(db, query, sort, SORTABLE, Project.id, limit, after)
+    response.data = [selection.render(project) for project in projects]
+    return response
+
+@router.get("/{id}/board")
+async def get_board(
+    id: int,
+    request: Request,
+    fastres: FastRes,
+    state: Optional[str] = None,
+    sort: str = "rank",
+    limit: int = BOARD_LIMIT,
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    response = Response()
+    selection = FieldSelection(TicketGetDto, TICKET_EXPANSIONS, fields, expand)
+    states = list(TicketState)
+    if state is not None:
+        try:
+            states = [TicketState(state)]
+        except ValueError:
+            response.add_error("state", "invalid ticket state")
+    elif after is not None:
+        response.add_error("after", "a cursor pages one column, pass its state too")
+    if response.has_errors:
+        raise HttpException(status_code=400, response=response)
+    version = await db.scalar(select(Project.version).where(Project.id == id))
+    if version is None:
+        response.add_error("id", "project not found")
+        raise HttpException(status_code=404, response=response)
+    etag = make_etag("board", id, version, state, sort, limit, after, *selection.tag())
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    counts = dict((await db.execute(select(Ticket.state, func.count()).where(Ticket.project_id == id).group_by(Ticket.state))).all())
+    columns = []
+    for column_state in states:
+        # each column is its own keyset page off the (project_id, state, rank) index, however many tickets the project has
+        query = select(Ticket).options(*selection.options).where(Ticket.project_id == id, Ticket.state == column_state)
+        tickets, next_cursor = await paginate_async(db, query, sort, TICKET_SORTABLE, Ticket.id, limit, after)
+        columns.append(TicketBoardColumnDto(
+            state=column_state,
+            count=counts.get(column_state, 0),
+            tickets=[selection.render(ticket) for ticket in tickets],
+            next_cursor=next_cursor,
+        ))
+    fastres.headers["ETag"] = etag
+    response.data = columns
     return response
 
 @router.get("/{id}/users")
-def get_users(id: int, db: Session = Depends(get_db)):
+async def get_users(id: int, db: AsyncSession = Depends(get_async_db)):
     response = Response()
-    project = db.query(Project).filter(Project.id == id).first()
+    project = await db.scalar(select(Project).options(joinedload(Project.group).selectinload(Group.users)).where(Project.id == id))
     if not project:
         response.add_error("id", "project not found")
         raise HttpException(status_code=404, response=response)
-    group = project.group
-    users = db.query(Group).filter(Group.id == group.id).first().users
+    users = project.group.users
     response.data = [user.toShallowDto() for user in users]
     return response
 
 @router.patch("/{projectid}/logo")
-async def update_logo(projectid: int, file: UploadFile = File(...), db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def update_logo(projectid: int, file: UploadFile = File(...), db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     response = Response()
     project = db.query(Project).filter(Project.id == projectid).first()
     if not project:
@@ -126,21 +207,16 @@ async def update_logo(projectid: int, file: UploadFile = File(...), db: Session
     if project.lead_id != user.id:
         response.add_error("user", "only lead can update logo")
         raise HttpException(status_code=400, response=response)
-    extension = file.filename.split(".")[-1]
-    filename = f"{uuid.uuid4()}.{extension}"
-    cwd = os.getcwd()
-    filepath = os.path.join(LOGO_PATH, filename)
-    if project.logo_path != DEFAULT_LOGO:
-        os.remove(os.path.join(cwd, project.logo_path[1:]))
-    with open(os.path.join(cwd, filepath[1:]), 'wb') as f:
-        f.write(await file.read())
+    filepath = save_image(db, file, SQUARE)
+    release(db, project.logo_path, DEFAULT_LOGO)
     project.logo_path = filepath
+    bump(project, project.group)
     db.commit()
     response.data = project.toGetDto()
     return response
 
 @router.patch("/{projectid}/banner")
-async def update_banner(projectid: int, file: UploadFile = File(...), db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def update_banner(projectid: int, file: UploadFile = File(...), db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     response = Response()
     project = db.query(Project).filter(Project.id == projectid).first()
     if not project:
@@ -152,21 +228,16 @@ async def update_banner(projectid: int, file: UploadFile = File(...), db: Sessio
     if project.lead_id != user.id:
         response.add_error("user", "only lead can update banner")
         raise HttpException(status_code=400, response=response)
-    extension = file.filename.split(".")[-1]
-    filename = f"{uuid.uuid4()}.{extension}"
-    cwd = os.getcwd()
-    filepath = os.path.join(BANNER_PATH, filename)
-    if project.banner_path != DEFAULT_BANNER:
-        os.remove(os.path.join(cwd, project.banner_path[1:]))
-    with open(os.path.join(cwd, filepath[1:]), 'wb') as f:
-        f.write(await file.read())
+    filepath = save_image(db, file, BANNER)
+    release(db, project.banner_path, DEFAULT_BANNER)
     project.banner_path = filepath
+    bump(project, project.group)
     db.commit()
     response.data = project.toGetDto()
     return response
 
 @router.delete("/{projectid}/logo")
-def remove_logo(projectid: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def remove_logo(projectid: int, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     response = Response()
     project = db.query(Project).filter(Project.id == projectid).first()
     if not project:
@@ -178,15 +249,15 @@ def remove_logo(projectid: int, db: Session = Depends(get_db), user: User = Depe
         response.add_error("user", "only lead can remove logo")
     if response.has_errors:
         raise HttpException(status_code=400, response=response)
-    cwd = os.getcwd()
-    os.remove(os.path.join(cwd, project.logo_path[1:]))
+    release(db, project.logo_path, DEFAULT_LOGO)
     project.logo_path = DEFAULT_LOGO
+    bump(project, project.group)
     db.commit()
     response.data = project.toGetDto()
     return response
 
 @router.delete("/{projectid}/banner")
-def remove_banner(projectid: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def remove_banner(projectid: int, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     response = Response()
     project = db.query(Project).filter(Project.id == projectid).first()
     if not project:
@@ -198,15 +269,15 @@ def remove_banner(projectid: int, db: Session = Depends(get_db), user: User = De
         response.add_error("user", "only lead can remove banner")
     if response.has_errors:
         raise HttpException(status_code=400, response=response)
-    cwd = os.getcwd()
-    os.remove(os.path.join(cwd, project.banner_path[1:]))
+    release(db, project.banner_path, DEFAULT_BANNER)
     project.banner_path = DEFAULT_BANNER
+    bump(project, project.group)
     db.commit()
     response.data = project.toGetDto()
     return response
 
 @router.delete("/{projectid}")
-def delete(projectid: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def delete(projectid: int, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     response = Response()
     project = db.query(Project).filter(Project.id == projectid).first()
     if not project:
@@ -215,6 +286,9 @@ def delete(projectid: int, db: Session = Depends(get_db), user: User = Depends(g
     if project.lead_id != user.id:
         response.add_error("user", "Only lead can delete project")
         raise HttpException(status_code=400, response=response)
+    bump(project.group)
+    release(db, project.logo_path, DEFAULT_LOGO)
+    release(db, project.banner_path, DEFAULT_BANNER)
     db.delete(project)
     db.commit()
     response.data = True
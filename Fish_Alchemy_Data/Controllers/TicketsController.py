@@ -1,39 +1,170 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request, Response as FastRes
+from typing import Optional
+from sqlalchemy import select, func, and_, or_
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
-from Fish_Alchemy_Data.database import get_db
+from Fish_Alchemy_Data.database import get_db, get_async_db
 from Fish_Alchemy_Data.Common.Response import Response, HttpException
+from Fish_Alchemy_Data.Common.FastJSON import FastJSONRoute
+from Fish_Alchemy_Data.Common.Pagination import paginate_async, encode_cursor, decode_cursor, DEFAULT_LIMIT, MAX_LIMIT
+from Fish_Alchemy_Data.Common.Fields import FieldSelection
+from Fish_Alchemy_Data.Common.Versioning import bump
+from Fish_Alchemy_Data.Common.TicketNumbers import allocate_ticketnum
+from Fish_Alchemy_Data.Common.Ranks import rank_between
+from Fish_Alchemy_Data.Common.RankRebalancer import rebalancer
+from Fish_Alchemy_Data.Common.Search import search_terms, ticket_search
+from Fish_Alchemy_Data.Common.ETag import make_etag, is_not_modified, not_modified
 
-from Fish_Alchemy_Data.Entities.Tickets import Ticket, TicketCreateDto, TicketUpdateDto, TicketStateDto, TicketDateDto
+from Fish_Alchemy_Data.Entities.Tickets import Ticket, TicketGetDto, TicketCreateDto, TicketUpdateDto, TicketStateDto, TicketDateDto, TicketMoveDto
 from Fish_Alchemy_Data.Common.TicketState import TicketState
 from Fish_Alchemy_Data.Common.Payload import Payload, send_discord_message
 from Fish_Alchemy_Data.Entities.Projects import Project
 from Fish_Alchemy_Data.Entities.Users import User
+from Fish_Alchemy_Data.Entities.UserGroups import UserGroup
+from Fish_Alchemy_Data.Common.PrincipalCache import Principal
 from Fish_Alchemy_Data.Controllers.AuthController import get_current_user
 
-router = APIRouter(prefix="/api/tickets", tags=['Tickets'])
+router = APIRouter(prefix="/api/tickets", tags=['Tickets'], route_class=FastJSONRoute)
+
+EXPANSIONS = {
+    "user": (joinedload(Ticket.user),),
+    "project": (joinedload(Ticket.project).joinedload(Project.lead),),
+}
+
+SORTABLE = {
+    "id": Ticket.id,
+    "ticketnum": Ticket.ticketnum,
+    "name": Ticket.name,
+    "created_at": Ticket.created_at,
+    "duedate": Ticket.duedate,
+    "rank": Ticket.rank,
+}
+
+def last_rank(db: Session, projectid: int, state: TicketState, exclude: Optional[int] = None):
+    query = select(func.max(Ticket.rank)).where(Ticket.project_id == projectid, Ticket.state == state)
+    if exclude is not None:
+        query = query.where(Ticket.id != exclude)
+    return db.scalar(query)
+
+def neighbour_rank(db: Session, ticket: Ticket, state: TicketState, rank: str, following: bool):
+    # the rank next to `rank` in the column, ignoring the ticket being moved
+    query = select(Ticket.rank).where(Ticket.project_id == ticket.project_id, Ticket.state == state, Ticket.id != ticket.id)
+    if following:
+        query = query.where(Ticket.rank > rank).order_by(Ticket.rank)
+    else:
+        query = query.where(Ticket.rank < rank).order_by(Ticket.rank.desc())
+    return db.scalar(query.limit(1))
+
+SEARCH_LIMIT = 20
 
 state_strings = {TicketState.BACKLOG.name: "To Do", TicketState.INPROGRESS.name: "In Progress", TicketState.REVIEW.name: "In Review", TicketState.FINISHED.name: "Finished"}
 
 @router.get("/")
-def get_all(db: Session = Depends(get_db)):
+async def get_all(
+    projectid: Optional[int] = None,
+    userid: Optional[int] = None,
+    state: Optional[str] = None,
+    due_after: Optional[str] = None,
+    due_before: Optional[str] = None,
+    sort: str = "id",
+    limit: int = DEFAULT_LIMIT,
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    response = Response()
+    selection = FieldSelection(TicketGetDto, EXPANSIONS, fields, expand)
+    query = select(Ticket).options(*selection.options)
+    if projectid is not None:
+        query = query.filter(Ticket.project_id == projectid)
+    if userid is not None:
+        query = query.filter(Ticket.user_id == userid)
+    if state is not None:
+        try:
+            query = query.filter(Ticket.state == TicketState(state))
+        except ValueError:
+            response.add_error("state", "invalid ticket state")
+    if due_after is not None:
+        try:
+            query = query.filter(Ticket.duedate >= datetime.fromisoformat(due_after))
+        except ValueError:
+            response.add_error("due_after", "invalid date format")
+    if due_before is not None:
+        try:
+            query = query.filter(Ticket.duedate < datetime.fromisoformat(due_before))
+        except ValueError:
+            response.add_error("due_before", "invalid date format")
+    if response.has_errors:
+        raise HttpException(status_code=400, response=response)
+    tickets, response.next_cursor = await paginate_async(db, query, sort, SORTABLE, Ticket.id, limit, after)
+    response.data = [selection.render(ticket) for ticket in tickets]
+    return response
+
+@router.get("/search")
+async def search(
+    q: str,
+    projectid: Optional[int] = None,
+    state: Optional[str] = None,
+    limit: int = SEARCH_LIMIT,
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user)
+):
     response = Response()
-    tickets = db.query(Ticket).all()
-    response.data = [ticket.toGetDto() for ticket in tickets]
+    selection = FieldSelection(TicketGetDto, EXPANSIONS, fields, expand)
+    terms = search_terms(q)
+    if not terms:
+        response.add_error("q", "must contain a word to search for")
+    if limit < 1 or limit > MAX_LIMIT:
+        response.add_error("limit", f"must be between 1 and {MAX_LIMIT}")
+    groups = select(UserGroup.group_id).where(UserGroup.user_id == user.id)
+    query = select(Ticket).options(*selection.options).where(Ticket.project_id.in_(select(Project.id).where(Project.group_id.in_(groups))))
+    if projectid is not None:
+        query = query.where(Ticket.project_id == projectid)
+    if state is not None:
+        try:
+            query = query.where(Ticket.state == TicketState(state))
+        except ValueError:
+            response.add_error("state", "invalid ticket state")
+    if response.has_errors:
+        raise HttpException(status_code=400, response=response)
+    query, score = ticket_search(query, db.bind.dialect.name, terms)
+    if after:
+        # keyset on (score, id); a cursor from another query just pages from wherever its score falls
+        values = decode_cursor(after, "search", [score, Ticket.id])
+        if values is None:
+            response.add_error("after", "invalid cursor")
+            raise HttpException(status_code=400, response=response)
+        query = query.where(or_(score < values[0], and_(score == values[0], Ticket.id > values[1])))
+    rows = (await db.execute(query.add_columns(score).order_by(score.desc(), Ticket.id).limit(limit + 1))).unique().all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.next_cursor = encode_cursor("search", [rows[-1][1], rows[-1][0].id])
+    response.data = [selection.render(ticket) for ticket, _ in rows]
     return response
 
 @router.get("/{id}")
-def get_by_id(id: int, db: Session = Depends(get_db)):
+async def get_by_id(id: int, request: Request, fastres: FastRes, fields: Optional[str] = None, expand: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
     response = Response()
-    ticket = db.query(Ticket).filter(Ticket.id == id).first()
-    if not ticket:
+    selection = FieldSelection(TicketGetDto, EXPANSIONS, fields, expand)
+    versions = (await db.execute(select(Ticket.version, Project.version).outerjoin(Project, Project.id == Ticket.project_id).where(Ticket.id == id))).first()
+    if not versions:
         response.add_error("id", "ticket not found")
         raise HttpException(status_code=404, response=response)
-    response.data = ticket.toGetDto()
+    etag = make_etag("ticket", id, *versions, *selection.tag())
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    ticket = await db.scalar(select(Ticket).options(*selection.options).where(Ticket.id == id))
+    fastres.headers["ETag"] = etag
+    response.data = selection.render(ticket)
     return response
 
 @router.post("/project/{projectid}")
-def create(ticketdto: TicketCreateDto, projectid: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def create(ticketdto: TicketCreateDto, projectid: int, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     response = Response()
     project = db.query(Project).filter(Project.id == projectid).first()
     if not project:
@@ -45,13 +176,18 @@ def create(ticketdto: TicketCreateDto, projectid: int, db: Session = Depends(get
     if len(ticketdto.name) == 0:
         response.add_error("name", "name cannot be empty")
         raise HttpException(status_code=400, response=response)
-    project.ticket_count += 1
+    ticketnum = allocate_ticketnum(db, projectid)
+    if ticketnum is None:
+        response.add_error("projectid", "project not found")
+        raise HttpException(status_code=404, response=response)
+    bump(project)
     ticket = Ticket(
         name=ticketdto.name,
         description=ticketdto.description,
         github_url=ticketdto.github_url,
-        ticketnum=project.ticket_count,
-        user=user,
+        ticketnum=ticketnum,
+        rank=rank_between(last_rank(db, projectid, TicketState.BACKLOG), None),
+        user_id=user.id,
         project=project,
         created_at=datetime.now(),
         duedate=datetime.now() + timedelta(weeks=1)
@@ -71,7 +207,7 @@ def create(ticketdto: TicketCreateDto, projectid: int, db: Session = Depends(get
         return response
 
 @router.patch("/{id}")
-def update(ticketdto: TicketUpdateDto, id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def update(ticketdto: TicketUpdateDto, id: int, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     response = Response()
     ticket = db.query(Ticket).filter(Ticket.id == id).first()
     if not ticket:
@@ -86,12 +222,13 @@ def update(ticketdto: TicketUpdateDto, id: int, db: Session = Depends(get_db), u
     ticket.name = ticketdto.name
     ticket.description = ticketdto.description
     ticket.github_url = ticketdto.github_url
+    bump(ticket, ticket.project)
     db.commit()
     response.data = ticket.toGetDto()
     return response
 
 @router.patch("/{id}/state")
-def change_state(dto: TicketStateDto, id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def change_state(dto: TicketStateDto, id: int, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     response = Response()
     ticket = db.query(Ticket).filter(Ticket.id == id).first()
     if not ticket:
@@ -100,10 +237,16 @@ def change_state(dto: TicketStateDto, id: int, db: Session = Depends(get_db), us
     if user.id != ticket.project.lead_id and user.id != ticket.user_id:
         response.add_error("user", "only lead or assigned user can change ticket state")
         raise HttpException(status_code=400, response=response)
-    if dto.state not in TicketState:
+    try:
+        state = TicketState(dto.state)
+    except ValueError:
         response.add_error("state", "ivalid ticket state")
         raise HttpException(status_code=400, response=response)
-    ticket.state = dto.state
+    if ticket.state != state:
+        ticket.rank = rank_between(last_rank(db, ticket.project_id, state), None)
+        rebalancer.check(ticket.project_id, state, ticket.rank)
+    ticket.state = state
+    bump(ticket, ticket.project)
     db.commit()
     response.data = ticket.toGetDto()
     try: 
@@ -117,8 +260,68 @@ def change_state(dto: TicketStateDto, id: int, db: Session = Depends(get_db), us
     finally: 
         return response
 
+@router.patch("/{id}/move")
+def move(dto: TicketMoveDto, id: int, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    response = Response()
+    ticket = db.query(Ticket).filter(Ticket.id == id).first()
+    if not ticket:
+        response.add_error("id", "ticket not found")
+        raise HttpException(status_code=404, response=response)
+    if user.id != ticket.project.lead_id and user.id != ticket.user_id:
+        response.add_error("user", "only lead or assigned user can move ticket")
+        raise HttpException(status_code=400, response=response)
+    try:
+        state = TicketState(dto.state)
+    except ValueError:
+        response.add_error("state", "invalid ticket state")
+        raise HttpException(status_code=400, response=response)
+    neighbours = {}
+    for property, neighbour_id in (("previous_id", dto.previous_id), ("next_id", dto.next_id)):
+        if neighbour_id is None:
+            continue
+        neighbour = db.execute(select(Ticket.rank, Ticket.project_id, Ticket.state).where(Ticket.id == neighbour_id)).first()
+        if not neighbour or neighbour_id == ticket.id or neighbour.project_id != ticket.project_id or neighbour.state != state:
+            response.add_error(property, "must be another ticket in the same column")
+        else:
+            neighbours[property] = neighbour.rank
+    if response.has_errors:
+        raise HttpException(status_code=400, response=response)
+    previous, following = neighbours.get("previous_id"), neighbours.get("next_id")
+    if previous is not None and following is None:
+        following = neighbour_rank(db, ticket, state, previous, following=True)
+    elif following is not None and previous is None:
+        previous = neighbour_rank(db, ticket, state, following, following=False)
+    elif previous is None:
+        previous = last_rank(db, ticket.project_id, state, exclude=ticket.id)
+    if previous is not None and following is not None and previous >= following:
+        # neighbours sharing a rank (or passed in the wrong order) leave no room, so take one of theirs and
+        # let the rebalance pull them apart
+        rank = previous
+        rebalancer.request(ticket.project_id, state)
+    else:
+        rank = rank_between(previous, following)
+        rebalancer.check(ticket.project_id, state, rank)
+    moved = ticket.state != state
+    ticket.state = state
+    ticket.rank = rank
+    bump(ticket, ticket.project)
+    db.commit()
+    response.data = ticket.toGetDto()
+    if not moved:
+        return response
+    try:
+        payload = Payload(
+            username=ticket.project.name,
+            title=f'[#{ticket.ticketnum}] {ticket.name}',
+            description=f'Changed state to "{state_strings[ticket.state.name]}"',
+            color=0x068067,
+        )
+        send_discord_message(ticket.project.discord_webhook_url, payload.to_json())
+    finally:
+        return response
+
 @router.patch("/{id}/duedate")
-def change_duedate(dto: TicketDateDto, id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def change_duedate(dto: TicketDateDto, id: int, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     response = Response()
     ticket = db.query(Ticket).filter(Ticket.id == id).first()
     if not ticket:
@@ -136,6 +339,7 @@ def change_duedate(dto: TicketDateDto, id: int, db: Session = Depends(get_db), u
         response.add_error("date", "invalid date")
         raise HttpException(status_code=400, response=response)
     ticket.duedate = date
+    bump(ticket, ticket.project)
     db.commit()
     response.data = ticket.toGetDto()
     try:
@@ -150,7 +354,7 @@ def change_duedate(dto: TicketDateDto, id: int, db: Session = Depends(get_db), u
         return response
 
 @router.patch("/{ticketid}/user/{userid}")
-def assign_user(ticketid: int, userid: int, db: Session = Depends(get_db), authedUser: User = Depends(get_current_user)):
+def assign_user(ticketid: int, userid: int, db: Session = Depends(get_db), authedUser: Principal = Depends(get_current_user)):
     response = Response()
     ticket = db.query(Ticket).filter(Ticket.id == ticketid).first()
     user = db.query(User).filter(User.id == userid).first()
@@ -163,6 +367,7 @@ def assign_user(ticketid: int, userid: int, db: Session = Depends(get_db), authe
     if response.has_errors:
         raise HttpException(status_code=400, response=response)
     ticket.user = user
+    bump(ticket, ticket.project)
     db.commit()
     response.data = ticket.toGetDto()
     try:
@@ -177,7 +382,7 @@ def assign_user(ticketid: int, userid: int, db: Session = Depends(get_db), authe
         return response
 
 @router.delete("/{id}")
-def delete(id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def delete(id: int, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     response = Response()
     ticket = db.query(Ticket).filter(Ticket.id == id).first()
     if not ticket:
@@ -186,6 +391,7 @@ def delete(id: int, db: Session = Depends(get_db), user: User = Depends(get_curr
     if ticket.project.lead_id != user.id:
         response.add_error("user", "only lead can delete ticket")
         raise HttpException(status_code=400, response=response)
+    bump(ticket.project)
     db.delete(ticket)
     db.commit()
     response.data = True
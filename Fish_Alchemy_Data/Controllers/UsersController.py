@@ -1,25 +1,46 @@
 from fastapi import APIRouter, Depends, File, UploadFile
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import select, or_
 from sqlalchemy.exc import IntegrityError
-import os
-import uuid
 
-from typing import Any
+from typing import Any, Optional
 
-from Fish_Alchemy_Data.Entities.Users import User, UserCreateDto, UserUpdateDto, DEFAULT_PFP, DEFAULT_BANNER
+from Fish_Alchemy_Data.Entities.Users import User, UserGetDto, UserCreateDto, UserUpdateDto, DEFAULT_PFP, DEFAULT_BANNER
 from Fish_Alchemy_Data.Entities.Auth import UserAuth, create_password_hash
+from Fish_Alchemy_Data.Entities.Groups import Group
+from Fish_Alchemy_Data.Entities.Tickets import Ticket
+from Fish_Alchemy_Data.Entities.Projects import Project
+from Fish_Alchemy_Data.Entities.UserGroups import UserGroup
 from Fish_Alchemy_Data.Controllers.AuthController import require_admin
 from Fish_Alchemy_Data.Common.Response import Response, HttpException
+from Fish_Alchemy_Data.Common.FastJSON import FastJSONRoute
+from Fish_Alchemy_Data.Common.Uploads import save_image
+from Fish_Alchemy_Data.Common.MediaStore import release
+from Fish_Alchemy_Data.Common.Variants import SQUARE, BANNER
+from Fish_Alchemy_Data.Common.Pagination import paginate, DEFAULT_LIMIT
+from Fish_Alchemy_Data.Common.Fields import FieldSelection
+from Fish_Alchemy_Data.Common.Versioning import bump_where
 from Fish_Alchemy_Data.Common.Role import Role
+from Fish_Alchemy_Data.Common.PrincipalCache import Principal, principal_cache
 from Fish_Alchemy_Data.database import get_db
 
-PFP_PATH = "/media/user/pfp"
-BANNER_PATH = "/media/user/banner"
+router = APIRouter(prefix='/api/users', tags=["Users"], route_class=FastJSONRoute)
 
-router = APIRouter(prefix='/api/users', tags=["Users"])
+EXPANSIONS = {
+    "groups": (selectinload(User.groups).joinedload(Group.creator),),
+    "tickets": (selectinload(User.tickets).joinedload(Ticket.project),),
+}
+
+SORTABLE = {"id": User.id, "username": User.username}
+
+def bump_dependents(db: Session, userid: int):
+    # users are embedded in ticket, project and group dtos, so those versions move with the user
+    bump_where(db, Ticket, Ticket.user_id == userid)
+    bump_where(db, Project, or_(Project.lead_id == userid, Project.id.in_(select(Ticket.project_id).where(Ticket.user_id == userid))))
+    bump_where(db, Group, or_(Group.creator_id == userid, Group.id.in_(select(UserGroup.group_id).where(UserGroup.user_id == userid))))
 
 @router.post("/")
-def create_user(userdto: UserCreateDto, db: Session = Depends(get_db), admin: User = Depends(require_admin)):
+def create_user(userdto: UserCreateDto, db: Session = Depends(get_db), admin: Principal = Depends(require_admin)):
     response = Response()
     if len(userdto.username) == 0:
         response.add_error("username", "Cannot be empty")
@@ -58,7 +79,7 @@ def create_user(userdto: UserCreateDto, db: Session = Depends(get_db), admin: Us
         raise HttpException(status_code=409, response=response)
     
 @router.patch("/{id}/username")
-def update_username(userdto: UserUpdateDto, id: int, db: Session = Depends(get_db), admin: User = Depends(require_admin)):
+def update_username(userdto: UserUpdateDto, id: int, db: Session = Depends(get_db), admin: Principal = Depends(require_admin)):
     response = Response()
     user = db.query(User).filter(User.id == id).first()
     if not user:
@@ -68,8 +89,10 @@ def update_username(userdto: UserUpdateDto, id: int, db: Session = Depends(get_d
     if response.has_errors:
         raise HttpException(status_code=400, response=response)
     user.username = userdto.username
+    bump_dependents(db, user.id)
     try:
         db.commit()
+        principal_cache.invalidate(user.id)
         response.data = user.toGetDto()
         return response
     except IntegrityError:
@@ -78,24 +101,29 @@ def update_username(userdto: UserUpdateDto, id: int, db: Session = Depends(get_d
         raise HttpException(status_code=409, response=response)
 
 @router.get("/")
-def get_all_users(db: Session = Depends(get_db)):
+def get_all_users(username: Optional[str] = None, sort: str = "id", limit: int = DEFAULT_LIMIT, after: Optional[str] = None, fields: Optional[str] = None, expand: Optional[str] = None, db: Session = Depends(get_db)):
     response = Response()
-    users = db.query(User).all()
-    response.data = [user.toGetDto() for user in users]
+    selection = FieldSelection(UserGetDto, EXPANSIONS, fields, expand)
+    query = db.query(User).options(*selection.options)
+    if username:
+        query = query.filter(User.username.startswith(username, autoescape=True))
+    users, response.next_cursor = paginate(query, sort, SORTABLE, User.id, limit, after)
+    response.data = [selection.render(user) for user in users]
     return response
 
 @router.get("/{id}")
-def get_user_by_id(id: int, db: Session = Depends(get_db)):
+def get_user_by_id(id: int, fields: Optional[str] = None, expand: Optional[str] = None, db: Session = Depends(get_db)):
     response = Response()
-    user = db.query(User).filter(User.id == id).first()
+    selection = FieldSelection(UserGetDto, EXPANSIONS, fields, expand)
+    user = db.query(User).options(*selection.options).filter(User.id == id).first()
     if not user:
         response.add_error("id", "user not found")
         raise HttpException(status_code=404, response=response)
-    response.data = user.toGetDto()
+    response.data = selection.render(user)
     return response
 
 @router.patch("/{id}/pfp")
-async def update_pfp(id: int, file: UploadFile = File(...), db: Session = Depends(get_db)):
+def update_pfp(id: int, file: UploadFile = File(...), db: Session = Depends(get_db)):
     response = Response()
     user = db.query(User).filter(User.id == id).first()
     if not user:
@@ -104,21 +132,16 @@ async def update_pfp(id: int, file: UploadFile = File(...), db: Session = Depend
         response.add_error("File", "File must be an image")
     if response.has_errors:
         raise HttpException(status_code=400, response=response)
-    extension = file.filename.split(".")[-1]
-    filename = f"{uuid.uuid4()}.{extension}"
-    cwd = os.getcwd()
-    filepath = os.path.join(PFP_PATH, filename)
-    if user.pfp_path != DEFAULT_PFP:
-        os.remove(os.path.join(cwd, user.pfp_path[1:]))
-    with open(os.path.join(cwd, filepath[1:]), "wb") as f:
-        f.write(await file.read())
+    filepath = save_image(db, file, SQUARE)
+    release(db, user.pfp_path, DEFAULT_PFP)
     user.pfp_path = filepath
+    bump_dependents(db, user.id)
     db.commit()
     response.data = user.toGetDto()
     return response
 
 @router.patch("/{id}/banner")
-async def update_banner(id: int, file: UploadFile = File(...), db: Session = Depends(get_db)):
+def update_banner(id: int, file: UploadFile = File(...), db: Session = Depends(get_db)):
     response = Response()
     user = db.query(User).filter(User.id == id).first()
     if not user:
@@ -127,15 +150,10 @@ async def update_banner(id: int, file: UploadFile = File(...), db: Session = Dep
         response.add_error("File", "File must be an image")
     if response.has_errors:
         raise HttpException(status_code=400, response=response)
-    extension = file.filename.split(".")[-1]
-    filename = f"{uuid.uuid4()}.{extension}"
-    cwd = os.getcwd()
-    filepath = os.path.join(BANNER_PATH, filename)
-    if user.banner_path != DEFAULT_BANNER:
-        os.remove(os.path.join(cwd, user.banner_path[1:]))
-    with open(os.path.join(cwd, filepath[1:]), "wb") as f:
-        f.write(await file.read())
+    filepath = save_image(db, file, BANNER)
+    release(db, user.banner_path, DEFAULT_BANNER)
     user.banner_path = filepath
+    bump_dependents(db, user.id)
     db.commit()
     response.data = user.toGetDto()
     return response
@@ -150,9 +168,9 @@ def remove_pfp(id: int, db: Session = Depends(get_db)):
     if user.pfp_path == DEFAULT_PFP:
         response.add_error("pfp", "no pfp")
         raise HttpException(status_code=404, response=response)
-    cwd = os.getcwd()
-    os.remove(os.path.join(cwd, user.pfp_path[1:]))
+    release(db, user.pfp_path, DEFAULT_PFP)
     user.pfp_path = DEFAULT_PFP
+    bump_dependents(db, user.id)
     db.commit()
     response.data = user.toGetDto()
     return response
@@ -167,15 +185,15 @@ def remove_banner(id: int, db: Session = Depends(get_db)):
     if user.banner_path == DEFAULT_BANNER:
         response.add_error("pfp", "no banner")
         raise HttpException(status_code=404, response=response)
-    cwd = os.getcwd()
-    os.remove(os.path.join(cwd, user.banner_path[1:]))
+    release(db, user.banner_path, DEFAULT_BANNER)
     user.banner_path = DEFAULT_BANNER
+    bump_dependents(db, user.id)
     db.commit()
     response.data = user.toGetDto()
     return response
 
 @router.delete("/{id}")
-def delete_user(id: int, db: Session = Depends(get_db), admin: User = Depends(require_admin)):
+def delete_user(id: int, db: Session = Depends(get_db), admin: Principal = Depends(require_admin)):
     response = Response()
     user = db.query(User).filter(User.id == id).first()
     if not user:
@@ -184,7 +202,11 @@ def delete_user(id: int, db: Session = Depends(get_db), admin: User = Depends(re
     if user.username == "Uriel" and user.auth.role == Role.ADMIN:
         response.add_error("Hubris", ":(")
         raise HttpException(status_code=403, response=response)
+    bump_dependents(db, user.id)
+    release(db, user.pfp_path, DEFAULT_PFP)
+    release(db, user.banner_path, DEFAULT_BANNER)
     db.delete(user)
     db.commit()
+    principal_cache.invalidate(id)
     response.data = True
     return response
\ No newline at end of file
@@ -1,13 +1,16 @@
 from sqlalchemy import Column, Integer, String, ForeignKey, Enum
 from sqlalchemy.orm import relationship
 from pydantic import BaseModel
-import bcrypt
 
 from Fish_Alchemy_Data.database import Base
 from Fish_Alchemy_Data.Common.Role import Role
+from Fish_Alchemy_Data.Common.Hashing import hasher
 
 def create_password_hash(password: str) -> str:
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    return hasher.hash(password)
+
+async def create_password_hash_async(password: str) -> str:
+    return await hasher.hash_async(password)
 
 class ChangePassDto(BaseModel):
     current_password: str
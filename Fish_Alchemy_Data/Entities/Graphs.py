@@ -2,8 +2,10 @@ from sqlalchemy import Column, Integer, String, Text, ForeignKey, Enum, DateTime
 from sqlalchemy.orm import relationship
 from pydantic import BaseModel
 from datetime import datetime
+from typing import List, Optional, Union
 
 from Fish_Alchemy_Data.database import Base
+from Fish_Alchemy_Data.Common.Fields import expanded
 from Fish_Alchemy_Data.Entities.Projects import ProjectShallowDto
 
 class GraphCreateDto(BaseModel):
@@ -18,31 +20,43 @@ class GraphGetDto(BaseModel):
     id: int
     name: str
     description: str
-    project: ProjectShallowDto
-    nodes: list
+    project: Optional[ProjectShallowDto] = None
+    nodes: Optional[list] = None
 
 class GraphShallowDto(BaseModel):
     id: int
     name: str
 
+class GraphBatchOperationDto(BaseModel):
+    op: str
+    temp_id: Optional[str] = None
+    node: Optional[Union[int, str]] = None
+    name: Optional[str] = None
+    dependent: Optional[Union[int, str]] = None
+    dependency: Optional[Union[int, str]] = None
+
+class GraphBatchDto(BaseModel):
+    operations: List[GraphBatchOperationDto]
+
 class Graph(Base):
     __tablename__ = "graphs"
     id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
     description = Column(Text)
+    version = Column(Integer, default=1, nullable=False)
 
-    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"))
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), index=True)
     project = relationship("Project", back_populates="graphs")
 
     nodes = relationship("Node", back_populates="graph", cascade="all, delete-orphan")
 
-    def toGetDto(self) -> GraphGetDto:
+    def toGetDto(self, expand: Optional[set] = None) -> GraphGetDto:
         graphdto = GraphGetDto(
             id=self.id,
             name=self.name,
             description=self.description,
-            project=self.project.toShallowDto(),
-            nodes=[node.toShallowDto() for node in self.nodes]
+            project=self.project.toShallowDto() if expanded(expand, "project") else None,
+            nodes=[node.toShallowDto() for node in self.nodes] if expanded(expand, "nodes") else None
         )
         return graphdto
     
@@ -1,8 +1,11 @@
 from sqlalchemy import Column, Integer, String, ForeignKey
 from sqlalchemy.orm import relationship
 from pydantic import BaseModel
+from typing import Optional
 
 from Fish_Alchemy_Data.database import Base
+from Fish_Alchemy_Data.Common.Fields import expanded
+from Fish_Alchemy_Data.Common.Variants import SQUARE, BANNER, variant_paths
 from Fish_Alchemy_Data.Entities.Users import UserShallowDto
 
 DEFAULT_LOGO = "/media/group/logo/default.png"
@@ -19,22 +22,26 @@ class GroupGetDto(BaseModel):
     name: str
     logo_path: str
     banner_path: str
-    creator: UserShallowDto
-    users: list
-    projects: list
+    logo_variants: dict
+    banner_variants: dict
+    creator: Optional[UserShallowDto] = None
+    users: Optional[list] = None
+    projects: Optional[list] = None
 
 class GroupShallowDto(BaseModel):
     id: int
     name: str
     logo_path: str
+    logo_variants: dict
     creatorid: int
 
 class Group(Base):
     __tablename__ = "groups"
     id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
-    logo_path = Column(String(255), default="/media/group/logo/default.png")
-    banner_path = Column(String(255), default="/media/group/banner/default.png")
+    logo_path = Column(String(255), default="/media/group/logo/default.png", index=True)
+    banner_path = Column(String(255), default="/media/group/banner/default.png", index=True)
+    version = Column(Integer, default=1, nullable=False)
 
     users = relationship("User", secondary='user_group', back_populates='groups')
     projects = relationship("Project", back_populates="group", cascade="all, delete-orphan")
@@ -42,18 +49,20 @@ class Group(Base):
     creator_id = Column(Integer, ForeignKey("users.id"))
     creator = relationship("User")
 
-    def toGetDto(self) -> GroupGetDto:
+    def toGetDto(self, expand: Optional[set] = None) -> GroupGetDto:
         groupgetdto = GroupGetDto(
             id=self.id, 
             name=self.name, 
             logo_path=self.logo_path, 
             banner_path=self.banner_path, 
-            creator=self.creator.toShallowDto(),
-            users=[user.toShallowDto() for user in self.users], 
-            projects=[project.toShallowDto() for project in self.projects]
+            logo_variants=variant_paths(self.logo_path, SQUARE),
+            banner_variants=variant_paths(self.banner_path, BANNER),
+            creator=self.creator.toShallowDto() if expanded(expand, "creator") else None,
+            users=[user.toShallowDto() for user in self.users] if expanded(expand, "users") else None,
+            projects=[project.toShallowDto() for project in self.projects] if expanded(expand, "projects") else None
         )
         return groupgetdto
     
     def toShallowDto(self) -> GroupShallowDto:
-        groupdto = GroupShallowDto(id=self.id, name=self.name, logo_path=self.logo_path, creatorid=self.creator.id)
+        groupdto = GroupShallowDto(id=self.id, name=self.name, logo_path=self.logo_path, logo_variants=variant_paths(self.logo_path, SQUARE), creatorid=self.creator.id)
         return groupdto
\ No newline at end of file
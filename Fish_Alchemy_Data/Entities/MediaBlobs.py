@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+
+from Fish_Alchemy_Data.database import Base
+
+class MediaBlob(Base):
+    __tablename__ = "media_blobs"
+    digest = Column(String(64), primary_key=True) # sha256 of the original upload
+    path = Column(String(255), nullable=False)
+    size = Column(Integer, nullable=False)
+    refcount = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
@@ -1,8 +1,10 @@
 from sqlalchemy import Column, Integer, String, Text, ForeignKey
 from sqlalchemy.orm import relationship
 from pydantic import BaseModel
+from typing import Optional
 
 from Fish_Alchemy_Data.database import Base
+from Fish_Alchemy_Data.Common.Fields import expanded
 from Fish_Alchemy_Data.Entities.Graphs import GraphShallowDto
 from Fish_Alchemy_Data.Entities.NodeAssociation import NodeAssociation
 
@@ -15,8 +17,8 @@ class NodeUpdateDto(BaseModel):
 class NodeGetDto(BaseModel):
     id: int
     name: str
-    graph: GraphShallowDto
-    dependencies: list
+    graph: Optional[GraphShallowDto] = None
+    dependencies: Optional[list] = None
     # dependents: list
 
 class NodeShallowDto(BaseModel):
@@ -28,7 +30,7 @@ class Node(Base):
     id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
 
-    graph_id = Column(Integer, ForeignKey("graphs.id"))
+    graph_id = Column(Integer, ForeignKey("graphs.id"), index=True)
     graph = relationship("Graph", back_populates="nodes")
 
     # dependencies = relationship(
@@ -57,12 +59,12 @@ class Node(Base):
         passive_deletes=True
     )
 
-    def toGetDto(self) -> NodeGetDto:
+    def toGetDto(self, expand: Optional[set] = None) -> NodeGetDto:
         nodedto = NodeGetDto(
             id=self.id,
             name=self.name,
-            graph=self.graph.toShallowDto(),
-            dependencies=[edge.dependency.toShallowDto() for edge in self.dependents],
+            graph=self.graph.toShallowDto() if expanded(expand, "graph") else None,
+            dependencies=[edge.dependency.toShallowDto() for edge in self.dependents] if expanded(expand, "dependencies") else None,
         )
         return nodedto
     
@@ -1,8 +1,11 @@
 from sqlalchemy import Column, Integer, String, Text, ForeignKey
 from sqlalchemy.orm import relationship
 from pydantic import BaseModel
+from typing import Optional
 
 from Fish_Alchemy_Data.database import Base
+from Fish_Alchemy_Data.Common.Fields import expanded
+from Fish_Alchemy_Data.Common.Variants import SQUARE, BANNER, variant_paths
 from Fish_Alchemy_Data.Entities.Groups import GroupShallowDto
 from Fish_Alchemy_Data.Entities.Users import UserShallowDto
 
@@ -25,20 +28,23 @@ class ProjectGetDto(BaseModel):
     id: int
     name: str
     description: str
-    lead: UserShallowDto
+    lead: Optional[UserShallowDto] = None
     ticket_count: int
     discord_webhook_url: str
     github_url: str
     logo_path: str
     banner_path: str
-    group: GroupShallowDto
-    tickets: list
-    graphs: list
+    logo_variants: dict
+    banner_variants: dict
+    group: Optional[GroupShallowDto] = None
+    tickets: Optional[list] = None
+    graphs: Optional[list] = None
 
 class ProjectShallowDto(BaseModel):
     id: int
     name: str
     logo_path: str
+    logo_variants: dict
     lead: UserShallowDto
 
 class Project(Base):
@@ -49,35 +55,38 @@ class Project(Base):
     ticket_count = Column(Integer, default=0)
     discord_webhook_url = Column(String(255), nullable=True)
     github_url = Column(String(255), nullable=True)
-    logo_path = Column(String(255), default="/media/project/logo/default.png")
-    banner_path = Column(String(255), default="/media/project/banner/default.jpg")
+    logo_path = Column(String(255), default="/media/project/logo/default.png", index=True)
+    banner_path = Column(String(255), default="/media/project/banner/default.jpg", index=True)
+    version = Column(Integer, default=1, nullable=False)
 
-    group_id = Column(Integer, ForeignKey("groups.id", ondelete="CASCADE"))
+    group_id = Column(Integer, ForeignKey("groups.id", ondelete="CASCADE"), index=True)
     group = relationship("Group", back_populates="projects")
 
-    tickets = relationship("Ticket", back_populates="project", cascade="all, delete-orphan")
+    tickets = relationship("Ticket", back_populates="project", cascade="all, delete-orphan", order_by="(Ticket.state, Ticket.rank, Ticket.id)") # board order, column by column
 
     graphs = relationship("Graph", back_populates="project", cascade="all, delete-orphan")
 
     lead_id = Column(Integer, ForeignKey("users.id"))
     lead = relationship("User")
 
-    def toGetDto(self) -> ProjectGetDto:
+    def toGetDto(self, expand: Optional[set] = None) -> ProjectGetDto:
         projectdto = ProjectGetDto(
             id=self.id, 
             name=self.name, 
             description=self.description,
-            lead=self.lead.toShallowDto(), 
+            lead=self.lead.toShallowDto() if expanded(expand, "lead") else None,
             ticket_count=self.ticket_count,
             discord_webhook_url=self.discord_webhook_url, 
             github_url=self.github_url, logo_path=self.logo_path, 
             banner_path=self.banner_path, 
-            group=self.group.toShallowDto(),
-            tickets=[ticket.toShallowDto() for ticket in self.tickets],
-            graphs=[graph.toShallowDto() for graph in self.graphs]
+            logo_variants=variant_paths(self.logo_path, SQUARE),
+            banner_variants=variant_paths(self.banner_path, BANNER),
+            group=self.group.toShallowDto() if expanded(expand, "group") else None,
+            tickets=[ticket.toShallowDto() for ticket in self.tickets] if expanded(expand, "tickets") else None,
+            graphs=[graph.toShallowDto() for graph in self.graphs] if expanded(expand, "graphs") else None
         )
         return projectdto
     
     def toShallowDto(self) -> ProjectShallowDto:
-        projectdto = ProjectShallowDto(id=self.id, name=self.name, logo_path=self.logo_path, lead=self.lead.toShallowDto())
+        projectdto = ProjectShallowDto(id=self.id, name=self.name, logo_path=self.logo_path, logo_variants=variant_paths(self.logo_path, SQUARE), lead=self.lead.toShallowDto())
         return projectdto
\ No newline at end of file
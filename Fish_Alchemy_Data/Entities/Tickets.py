@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Enum, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Enum, DateTime, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
+from sqlalchemy.dialects import mysql
 from pydantic import BaseModel
+from typing import Optional
 from datetime import datetime, timedelta
 
 from Fish_Alchemy_Data.database import Base
+from Fish_Alchemy_Data.Common.Fields import expanded
 from Fish_Alchemy_Data.Common.TicketState import TicketState
+from Fish_Alchemy_Data.Common.Ranks import INTEGER_ZERO
 from Fish_Alchemy_Data.Entities.Users import UserShallowDto
 from Fish_Alchemy_Data.Entities.Projects import ProjectShallowDto
 
@@ -24,6 +28,11 @@ class TicketStateDto(BaseModel):
 class TicketDateDto(BaseModel):
     date: str
 
+class TicketMoveDto(BaseModel):
+    state: str
+    previous_id: Optional[int] = None # the ticket it now sits below, if any
+    next_id: Optional[int] = None # the ticket it now sits above, if any
+
 class TicketGetDto(BaseModel):
     id: int
     name: str
@@ -33,8 +42,9 @@ class TicketGetDto(BaseModel):
     github_url: str
     created_at: datetime
     duedate: datetime
-    user: UserShallowDto
-    project: ProjectShallowDto
+    rank: str
+    user: Optional[UserShallowDto] = None
+    project: Optional[ProjectShallowDto] = None
     
 class TicketShallowDto(BaseModel):
     id: int
@@ -45,12 +55,29 @@ class TicketShallowDto(BaseModel):
     github_url: str
     created_at: datetime
     duedate: datetime
+    rank: str
     projectid: int
     projectname: str
     user: UserShallowDto
 
+class TicketBoardColumnDto(BaseModel):
+    state: TicketState
+    count: int
+    tickets: list
+    next_cursor: Optional[str] = None
+
+# ranks compare byte by byte, which MySQL's default case-insensitive collations don't
+RankType = String(255).with_variant(mysql.VARCHAR(255, charset="ascii", collation="ascii_bin"), "mysql", "mariadb")
+
 class Ticket(Base):
     __tablename__ = 'tickets'
+    __table_args__ = (
+        Index("ix_tickets_project_id_state_rank", "project_id", "state", "rank"), # a project's board, one column at a time, already in order
+        Index("ix_tickets_user_id_state_duedate", "user_id", "state", "duedate"), # a user's open tickets by due date
+        UniqueConstraint("project_id", "ticketnum", name="uq_tickets_project_id_ticketnum"),
+        # SQLite searches through the tickets_fts table the migration creates instead
+        Index("ft_tickets_name_description", "name", "description", mysql_prefix="FULLTEXT", info={"dialects": ("mysql", "mariadb")}),
+    )
     id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
     description = Column(Text)
@@ -59,6 +86,8 @@ class Ticket(Base):
     github_url = Column(String(255))
     created_at = Column(DateTime(timezone=True), default=datetime.now())
     duedate = Column(DateTime(timezone=True), default=datetime.now() + timedelta(weeks=1))
+    version = Column(Integer, default=1, nullable=False)
+    rank = Column(RankType, default=INTEGER_ZERO, nullable=False) # order within its state column, ties fall back to id
 
     user_id = Column(Integer, ForeignKey("users.id"))
     user = relationship("User", back_populates="tickets")
@@ -66,7 +95,7 @@ class Ticket(Base):
     project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"))
     project = relationship("Project", back_populates="tickets")
 
-    def toGetDto(self) -> TicketGetDto:
+    def toGetDto(self, expand: Optional[set] = None) -> TicketGetDto:
         ticketdto = TicketGetDto(
             id=self.id,
             name=self.name,
@@ -76,8 +105,9 @@ class Ticket(Base):
             github_url=self.github_url,
             created_at=self.created_at,
             duedate=self.duedate,
-            user=self.user.toShallowDto(),
-            project=self.project.toShallowDto()
+            rank=self.rank,
+            user=self.user.toShallowDto() if expanded(expand, "user") else None,
+            project=self.project.toShallowDto() if expanded(expand, "project") else None
         )
         return ticketdto
     
@@ -91,6 +121,7 @@ class Ticket(Base):
             github_url=self.github_url,
             created_at=self.created_at,
             duedate=self.duedate,
+            rank=self.rank,
             projectid=self.project.id,
             projectname=self.project.name,
             user=self.user.toShallowDto()
@@ -7,5 +7,5 @@ from Fish_Alchemy_Data.database import Base
 class UserGroup(Base):
     __tablename__ = "user_group"
     user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
-    group_id = Column(Integer, ForeignKey('groups.id'), primary_key=True)
+    group_id = Column(Integer, ForeignKey('groups.id'), primary_key=True, index=True)
     UniqueConstraint("user_id", "group_id", name="uq_user_group")
\ No newline at end of file
@@ -1,8 +1,11 @@
 from sqlalchemy import Column, Integer, String
 from sqlalchemy.orm import relationship
 from pydantic import BaseModel
+from typing import Optional
 
 from Fish_Alchemy_Data.database import Base
+from Fish_Alchemy_Data.Common.Fields import expanded
+from Fish_Alchemy_Data.Common.Variants import SQUARE, BANNER, variant_paths
 
 DEFAULT_PFP = "/media/user/pfp/default.jpg"
 DEFAULT_BANNER = "/media/user/banner/default.jpg"
@@ -21,14 +24,18 @@ class UserGetDto(BaseModel):
     username: str
     pfp_path: str
     banner_path: str
-    groups: list
-    tickets: list
+    pfp_variants: dict
+    banner_variants: dict
+    groups: Optional[list] = None
+    tickets: Optional[list] = None
 
 class UserShallowDto(BaseModel):
     id: int
     username: str
     pfp_path: str
     banner_path: str
+    pfp_variants: dict
+    banner_variants: dict
 
 class LoginDto(BaseModel):
     username: str
@@ -38,8 +45,8 @@ class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True)
     username = Column(String(50), unique=True, nullable=False)
-    pfp_path = Column(String(255), default=DEFAULT_PFP)
-    banner_path = Column(String(255), default=DEFAULT_BANNER)
+    pfp_path = Column(String(255), default=DEFAULT_PFP, index=True)
+    banner_path = Column(String(255), default=DEFAULT_BANNER, index=True)
 
     auth = relationship("UserAuth", back_populates="user", uselist=False, cascade="all, delete-orphan")
 
@@ -47,17 +54,26 @@ class User(Base):
 
     tickets = relationship("Ticket", back_populates="user")
 
-    def toGetDto(self) -> UserGetDto:
+    def toGetDto(self, expand: Optional[set] = None) -> UserGetDto:
         userdto = UserGetDto(
             id=self.id,
             username=self.username, 
             pfp_path=self.pfp_path, 
             banner_path=self.banner_path, 
-            groups=[group.toShallowDto() for group in self.groups],
-            tickets=[ticket.toShallowDto() for ticket in self.tickets]
+            pfp_variants=variant_paths(self.pfp_path, SQUARE),
+            banner_variants=variant_paths(self.banner_path, BANNER),
+            groups=[group.toShallowDto() for group in self.groups] if expanded(expand, "groups") else None,
+            tickets=[ticket.toShallowDto() for ticket in self.tickets] if expanded(expand, "tickets") else None
         )
         return userdto
     
     def toShallowDto(self) -> UserShallowDto:
-        userdto = UserShallowDto(id=self.id, username=self.username, pfp_path=self.pfp_path, banner_path=self.banner_path)
+        userdto = UserShallowDto(
+            id=self.id,
+            username=self.username,
+            pfp_path=self.pfp_path,
+            banner_path=self.banner_path,
+            pfp_variants=variant_paths(self.pfp_path, SQUARE),
+            banner_variants=variant_paths(self.banner_path, BANNER)
+        )
         return userdto
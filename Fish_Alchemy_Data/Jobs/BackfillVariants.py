@@ -0,0 +1,74 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import wait, FIRST_COMPLETED
+
+from Fish_Alchemy_Data.database import db_session
+from Fish_Alchemy_Data.Common.Variants import disk_path, has_variants, renderer
+from Fish_Alchemy_Data.Common.MediaSweeper import MEDIA_COLUMNS, DEFAULT_MEDIA
+from Fish_Alchemy_Data.Entities.Auth import UserAuth
+from Fish_Alchemy_Data.Entities.UserGroups import UserGroup
+from Fish_Alchemy_Data.Entities.Tickets import Ticket
+from Fish_Alchemy_Data.Entities.Graphs import Graph
+from Fish_Alchemy_Data.Entities.Nodes import Node
+from Fish_Alchemy_Data.Entities.NodeAssociation import NodeAssociation
+
+def media_paths(batch_size: int):
+    yield from DEFAULT_MEDIA
+    with db_session() as db:
+        for model, column, kind in MEDIA_COLUMNS:
+            last = 0
+            while True:
+                rows = db.query(model.id, column).filter(model.id > last).order_by(model.id).limit(batch_size).all()
+                if not rows:
+                    break
+                for _, path in rows:
+                    if path:
+                        yield path, kind
+                last = rows[-1][0]
+
+def backfill(batch_size: int, force: bool) -> dict:
+    stats = {"rendered": 0, "skipped": 0, "missing": 0, "failed": 0}
+    seen = set()
+    in_flight = {}
+    start = time.perf_counter()
+
+    def drain(until: int):
+        while len(in_flight) > until:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = in_flight.pop(future)
+                try:
+                    future.result()
+                    stats["rendered"] += 1
+                except Exception as e:
+                    stats["failed"] += 1
+                    print(f"failed {path}: {e}")
+
+    for path, kind in media_paths(batch_size):
+        if (path, kind) in seen:
+            continue
+        seen.add((path, kind))
+        if not os.path.exists(disk_path(path)):
+            stats["missing"] += 1
+            continue
+        if not force and has_variants(path, kind):
+            stats["skipped"] += 1
+            continue
+        in_flight[renderer.submit(path, kind)] = path
+        drain(renderer.workers * 2)
+    drain(0)
+    renderer.shutdown()
+    stats["seconds"] = round(time.perf_counter() - start, 2)
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="render missing thumbnail variants for every stored pfp, logo and banner")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--force", action="store_true", help="re-render variants that already exist")
+    args = parser.parse_args()
+    print(json.dumps(backfill(args.batch_size, args.force), indent=2))
+
+if __name__ == "__main__":
+    main()
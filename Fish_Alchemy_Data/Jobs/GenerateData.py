@@ -0,0 +1,178 @@
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import select, func, insert as sql_insert
+
+from Fish_Alchemy_Data.database import db_session
+from Fish_Alchemy_Data.Common.Schema import upgrade
+from Fish_Alchemy_Data.Common.Role import Role
+from Fish_Alchemy_Data.Common.TicketState import TicketState
+from Fish_Alchemy_Data.Common.Ranks import rank_between
+from Fish_Alchemy_Data.Entities.Users import User
+from Fish_Alchemy_Data.Entities.Auth import UserAuth, create_password_hash
+from Fish_Alchemy_Data.Entities.Groups import Group
+from Fish_Alchemy_Data.Entities.UserGroups import UserGroup
+from Fish_Alchemy_Data.Entities.Projects import Project
+from Fish_Alchemy_Data.Entities.Tickets import Ticket
+from Fish_Alchemy_Data.Entities.Graphs import Graph
+from Fish_Alchemy_Data.Entities.Nodes import Node
+from Fish_Alchemy_Data.Entities.NodeAssociation import NodeAssociation
+from Fish_Alchemy_Data.Entities.MediaBlobs import MediaBlob
+
+EPOCH = datetime(2025, 1, 1) # fixed so the same seed always produces the same rows
+PASSWORD = "password"
+
+def write(db, model, rows, batch_size: int) -> int:
+    # core executemany in batches, committing each one so no single transaction grows with the data set
+    written = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.execute(sql_insert(model), batch)
+            db.commit()
+            written += len(batch)
+            batch = []
+    if batch:
+        db.execute(sql_insert(model), batch)
+        db.commit()
+        written += len(batch)
+    return written
+
+def split(total: int, parts: int) -> list:
+    return [total // parts + (1 if i < total % parts else 0) for i in range(parts)]
+
+def generate(
+    users: int,
+    groups: int,
+    projects: int,
+    tickets: int,
+    graphs: int,
+    nodes_per_graph: int,
+    large_graphs: int = 0,
+    large_graph_nodes: int = 50000,
+    memberships: int = 3,
+    edges_per_node: int = 2,
+    password: str = PASSWORD,
+    seed: int = 1,
+    batch_size: int = 10000,
+) -> dict:
+    rng = random.Random(seed)
+    users, groups, projects = max(1, users), max(1, groups), max(1, projects)
+    password_hash = create_password_hash(password) # bcrypt once, shared by every generated user
+    states = list(TicketState)
+    stats = {"rows": {}, "ids": {}}
+    start = time.perf_counter()
+
+    upgrade()
+    with db_session() as db:
+        base = {model: db.scalar(select(func.coalesce(func.max(model.id), 0))) for model in (User, Group, Project, Ticket, Graph, Node)}
+        user_ids = range(base[User] + 1, base[User] + users + 1)
+        group_ids = range(base[Group] + 1, base[Group] + groups + 1)
+        project_ids = range(base[Project] + 1, base[Project] + projects + 1)
+
+        creators = [rng.choice(user_ids) for _ in group_ids]
+        members = {group: {creator} for group, creator in zip(group_ids, creators)}
+        for user in user_ids:
+            for group in rng.sample(group_ids, min(memberships, groups)):
+                members[group].add(user)
+        members = {group: sorted(users) for group, users in members.items()}
+        project_groups = [rng.choice(group_ids) for _ in project_ids]
+        ticket_counts = split(tickets, projects)
+
+        def ticket_rows():
+            ticket_id = base[Ticket]
+            for project, group, count in zip(project_ids, project_groups, ticket_counts):
+                assignees = members[group]
+                ranks = {}
+                for ticketnum in range(1, count + 1):
+                    ticket_id += 1
+                    created_at = EPOCH - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+                    state = rng.choice(states)
+                    ranks[state] = rank_between(ranks.get(state), None)
+                    yield {
+                        "id": ticket_id,
+                        "name": f"ticket {ticketnum}",
+                        "description": f"generated ticket {ticketnum} of project {project}",
+                        "ticketnum": ticketnum,
+                        "state": state,
+                        "rank": ranks[state],
+                        "github_url": "",
+                        "created_at": created_at,
+                        "duedate": created_at + timedelta(days=rng.randint(1, 60)),
+                        "project_id": project,
+                        "user_id": rng.choice(assignees),
+                    }
+
+        graph_projects = [rng.choice(project_ids) for _ in range(graphs)]
+        graph_sizes = [large_graph_nodes if i < large_graphs else nodes_per_graph for i in range(graphs)]
+
+        def node_rows():
+            node_id = base[Node]
+            for i, size in enumerate(graph_sizes):
+                for n in range(size):
+                    node_id += 1
+                    yield {"id": node_id, "name": f"node {n}", "graph_id": base[Graph] + i + 1}
+
+        def edge_rows():
+            # every edge points at an earlier node of the same graph, so each graph stays acyclic
+            first = base[Node] + 1
+            for size in graph_sizes:
+                for n in range(1, size):
+                    for dependency in {rng.randrange(n) for _ in range(min(edges_per_node, n))}:
+                        yield {"dependent_id": first + n, "dependency_id": first + dependency}
+                first += size
+
+        tables = (
+            (User, ({"id": user, "username": f"user-{user}"} for user in user_ids)),
+            (UserAuth, ({"id": user, "email": f"user-{user}@example.com", "password_hash": password_hash, "role": Role.USER} for user in user_ids)),
+            (Group, ({"id": group, "name": f"group {group}", "creator_id": creator} for group, creator in zip(group_ids, creators))),
+            (UserGroup, ({"user_id": user, "group_id": group} for group in group_ids for user in members[group])),
+            (Project, ({
+                "id": project,
+                "name": f"project {project}",
+                "description": f"generated project {project}",
+                "discord_webhook_url": "",
+                "github_url": "",
+                "ticket_count": count,
+                "group_id": group,
+                "lead_id": rng.choice(members[group]),
+            } for project, group, count in zip(project_ids, project_groups, ticket_counts))),
+            (Ticket, ticket_rows()),
+            (Graph, ({"id": base[Graph] + i + 1, "name": f"graph {i}", "description": "", "project_id": project} for i, project in enumerate(graph_projects))),
+            (Node, node_rows()),
+            (NodeAssociation, edge_rows()),
+        )
+        for model, rows in tables:
+            stats["rows"][model.__tablename__] = write(db, model, rows, batch_size)
+    for model, ids in ((User, user_ids), (Group, group_ids), (Project, project_ids)):
+        stats["ids"][model.__tablename__] = [ids[0], ids[-1]]
+    stats["seconds"] = round(time.perf_counter() - start, 2)
+    stats["rows_per_second"] = round(sum(stats["rows"].values()) / stats["seconds"]) if stats["seconds"] else 0
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="bulk insert a deterministic synthetic data set for scale testing")
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--groups", type=int, default=2000)
+    parser.add_argument("--projects", type=int, default=5000)
+    parser.add_argument("--tickets", type=int, default=1000000)
+    parser.add_argument("--graphs", type=int, default=5000)
+    parser.add_argument("--nodes-per-graph", type=int, default=20)
+    parser.add_argument("--large-graphs", type=int, default=1, help="how many of the graphs get --large-graph-nodes nodes instead")
+    parser.add_argument("--large-graph-nodes", type=int, default=50000)
+    parser.add_argument("--memberships", type=int, default=3, help="groups each user joins")
+    parser.add_argument("--edges-per-node", type=int, default=2)
+    parser.add_argument("--password", default=PASSWORD, help="password of every generated user")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+    print(json.dumps(generate(
+        args.users, args.groups, args.projects, args.tickets, args.graphs, args.nodes_per_graph,
+        args.large_graphs, args.large_graph_nodes, args.memberships, args.edges_per_node, args.password, args.seed, args.batch_size,
+    ), indent=2))
+
+if __name__ == "__main__":
+    main()
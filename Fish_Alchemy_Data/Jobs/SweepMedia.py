@@ -0,0 +1,22 @@
+import argparse
+import json
+
+from Fish_Alchemy_Data.Common.MediaSweeper import MediaSweeper, MEDIA_GC_BATCH, MEDIA_GC_GRACE
+from Fish_Alchemy_Data.Entities.Auth import UserAuth
+from Fish_Alchemy_Data.Entities.UserGroups import UserGroup
+from Fish_Alchemy_Data.Entities.Tickets import Ticket
+from Fish_Alchemy_Data.Entities.Graphs import Graph
+from Fish_Alchemy_Data.Entities.Nodes import Node
+from Fish_Alchemy_Data.Entities.NodeAssociation import NodeAssociation
+
+def main():
+    parser = argparse.ArgumentParser(description="delete media files that no user, group or project references any more")
+    parser.add_argument("--batch-size", type=int, default=MEDIA_GC_BATCH)
+    parser.add_argument("--grace", type=float, default=MEDIA_GC_GRACE, help="seconds a file must be untouched before it can be deleted")
+    parser.add_argument("--dry-run", action="store_true", help="report what would be reclaimed without deleting anything")
+    args = parser.parse_args()
+    sweeper = MediaSweeper(batch_size=args.batch_size, grace=args.grace)
+    print(json.dumps(sweeper.sweep(dry_run=args.dry_run), indent=2))
+
+if __name__ == "__main__":
+    main()
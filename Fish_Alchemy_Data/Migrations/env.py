@@ -0,0 +1,51 @@
+from logging.config import fileConfig
+from alembic import context
+
+from Fish_Alchemy_Data.database import Base, engine
+from Fish_Alchemy_Data.Entities.Users import User
+from Fish_Alchemy_Data.Entities.Auth import UserAuth
+from Fish_Alchemy_Data.Entities.Groups import Group
+from Fish_Alchemy_Data.Entities.UserGroups import UserGroup
+from Fish_Alchemy_Data.Entities.Projects import Project
+from Fish_Alchemy_Data.Entities.Tickets import Ticket
+from Fish_Alchemy_Data.Entities.Graphs import Graph
+from Fish_Alchemy_Data.Entities.Nodes import Node
+from Fish_Alchemy_Data.Entities.NodeAssociation import NodeAssociation
+from Fish_Alchemy_Data.Entities.MediaBlobs import MediaBlob
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logging", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    # full-text search is a FULLTEXT index on MySQL and an FTS5 table with its own shadow tables on SQLite,
+    # so each database only has its own half
+    if type_ == "table" and reflected and name.startswith("tickets_fts"):
+        return False
+    dialects = object.info.get("dialects") if type_ == "index" and not reflected else None
+    return not dialects or context.get_context().dialect.name in dialects
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=engine.url.render_as_string(hide_password=False),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True,
+        include_object=include_object,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    # sqlite can't ALTER constraints in place, batch mode rebuilds the table there and is a plain ALTER elsewhere
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=True, include_object=include_object)
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
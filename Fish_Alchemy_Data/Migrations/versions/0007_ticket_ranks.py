@@ -0,0 +1,95 @@
+"""ticket ranks
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 10:13:35.449422
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+RANK = sa.String(length=255).with_variant(mysql.VARCHAR(charset='ascii', collation='ascii_bin', length=255), 'mariadb').with_variant(mysql.VARCHAR(charset='ascii', collation='ascii_bin', length=255), 'mysql')
+
+# a frozen copy of the keys Common/Ranks.py hands out at the end of a column, so later changes to the app can't
+# change what this revision writes: a0, a1 ... az, b00 ... where the head letter gives the length
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+FIRST_RANK = "a0"
+
+
+def next_rank(rank: str) -> str:
+    head, digits = rank[0], list(rank[1:])
+    for i in reversed(range(len(digits))):
+        digit = DIGITS.index(digits[i]) + 1
+        if digit < len(DIGITS):
+            digits[i] = DIGITS[digit]
+            return head + "".join(digits)
+        digits[i] = DIGITS[0]
+    return chr(ord(head) + 1) + "".join(digits) + DIGITS[0]
+
+
+def backfill() -> None:
+    bind = op.get_bind()
+    tickets = sa.table('tickets', sa.column('id'), sa.column('project_id'), sa.column('state'), sa.column('rank'))
+    rows = bind.execute(sa.select(tickets.c.id, tickets.c.project_id, tickets.c.state).order_by(tickets.c.project_id, tickets.c.state, tickets.c.id))
+    column, rank, batch = None, None, []
+    for id, project_id, state in rows.all():
+        rank = next_rank(rank) if column == (project_id, state) else FIRST_RANK
+        column = (project_id, state)
+        batch.append({'ticket_id': id, 'rank': rank})
+        if len(batch) >= 10000:
+            bind.execute(sa.update(tickets).where(tickets.c.id == sa.bindparam('ticket_id')), batch)
+            batch = []
+    if batch:
+        bind.execute(sa.update(tickets).where(tickets.c.id == sa.bindparam('ticket_id')), batch)
+
+
+def backfill_sql() -> None:
+    # with no rows to read, every column is numbered in SQL instead: "h" heads an eight digit integer part, and
+    # eight decimal digits keep the keys valid and in order for up to 10^8 tickets a column
+    if op.get_context().dialect.name == 'sqlite':
+        key = "'h' || printf('%08d', position)"
+    else:
+        key = "CONCAT('h', LPAD(position, 8, '0'))"
+    rank = op.get_context().dialect.identifier_preparer.quote('rank') # reserved on MySQL 8
+    op.execute("CREATE TABLE ticket_ranks AS SELECT id, ROW_NUMBER() OVER (PARTITION BY project_id, state ORDER BY id) AS position FROM tickets")
+    op.execute(f"UPDATE tickets SET {rank} = (SELECT {key} FROM ticket_ranks WHERE ticket_ranks.id = tickets.id)")
+    op.execute("DROP TABLE ticket_ranks")
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('tickets', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rank', RANK, nullable=True))
+
+    # existing columns keep the order they had, which was creation order
+    if context.is_offline_mode():
+        backfill_sql()
+    else:
+        backfill()
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('tickets', schema=None) as batch_op:
+        batch_op.alter_column('rank', existing_type=RANK, nullable=False)
+        batch_op.drop_index(batch_op.f('ix_tickets_project_id_state'))
+        batch_op.create_index('ix_tickets_project_id_state_rank', ['project_id', 'state', 'rank'], unique=False)
+
+    # ### end Alembic commands ###
+
+
+def downgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('tickets', schema=None) as batch_op:
+        batch_op.drop_index('ix_tickets_project_id_state_rank')
+        batch_op.create_index(batch_op.f('ix_tickets_project_id_state'), ['project_id', 'state'], unique=False)
+        batch_op.drop_column('rank')
+
+    # ### end Alembic commands ###
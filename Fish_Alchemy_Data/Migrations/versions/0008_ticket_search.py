@@ -0,0 +1,55 @@
+"""ticket search
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 10:31:12.518304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, Sequence[str], None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# an external-content FTS5 table reads the text from tickets and keeps only the index, which the triggers
+# update on every insert, update and delete; a batch migration that rebuilds tickets drops these triggers
+# along with the old table, so it has to create them again
+SQLITE_SEARCH = (
+    "CREATE VIRTUAL TABLE tickets_fts USING fts5(name, description, content='tickets', content_rowid='id')",
+    """CREATE TRIGGER tickets_fts_insert AFTER INSERT ON tickets BEGIN
+        INSERT INTO tickets_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    """CREATE TRIGGER tickets_fts_delete AFTER DELETE ON tickets BEGIN
+        INSERT INTO tickets_fts(tickets_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    """CREATE TRIGGER tickets_fts_update AFTER UPDATE OF name, description ON tickets BEGIN
+        INSERT INTO tickets_fts(tickets_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO tickets_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    "INSERT INTO tickets_fts(tickets_fts) VALUES ('rebuild')",
+)
+
+
+def upgrade() -> None:
+    dialect = op.get_context().dialect.name
+    if dialect in ('mysql', 'mariadb'):
+        op.create_index('ft_tickets_name_description', 'tickets', ['name', 'description'], unique=False, mysql_prefix='FULLTEXT')
+    elif dialect == 'sqlite':
+        for statement in SQLITE_SEARCH:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_context().dialect.name
+    if dialect in ('mysql', 'mariadb'):
+        op.drop_index('ft_tickets_name_description', table_name='tickets')
+    elif dialect == 'sqlite':
+        for trigger in ('tickets_fts_update', 'tickets_fts_delete', 'tickets_fts_insert'):
+            op.execute(f'DROP TRIGGER {trigger}')
+        op.execute('DROP TABLE tickets_fts')
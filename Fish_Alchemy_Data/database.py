@@ -1,17 +1,59 @@
 import os
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
 from contextlib import contextmanager
 
+from Fish_Alchemy_Data.Common.PoolStats import TimedQueuePool, TimedAsyncQueuePool
+
 load_dotenv()
 DBSTRING = os.getenv("DBSTRING")
 URIELPASS = os.getenv("URIELPASS")
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30)) # seconds a request waits for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 30 * 60)) # kept under MySQL's wait_timeout
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_CONNECT_TIMEOUT = float(os.getenv("DB_CONNECT_TIMEOUT", 10))
+
+ASYNC_DRIVERS = {"mysql": "aiomysql", "sqlite": "aiosqlite"}
+
+def async_url(dbstring: str):
+    url = make_url(dbstring)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}") if driver else url
+
+def engine_options(url) -> dict:
+    backend = make_url(url).get_backend_name()
+    if backend == "mysql":
+        connect_args = {"connect_timeout": int(DB_CONNECT_TIMEOUT)}
+    elif backend == "sqlite":
+        connect_args = {"timeout": DB_CONNECT_TIMEOUT}
+    else:
+        connect_args = {}
+    return {
+        "echo": DB_ECHO,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+# the same database through an asyncio driver, for endpoints that shouldn't hold a threadpool worker while they wait on it
+ASYNC_DBSTRING = os.getenv("ASYNC_DBSTRING") or async_url(DBSTRING)
 
-engine = create_engine(DBSTRING, echo=True, future=True)
+engine = create_engine(DBSTRING, future=True, poolclass=TimedQueuePool, **engine_options(DBSTRING))
 Base = declarative_base()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(ASYNC_DBSTRING, poolclass=TimedAsyncQueuePool, **engine_options(ASYNC_DBSTRING))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
@@ -19,10 +61,14 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 @contextmanager
 def db_session():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
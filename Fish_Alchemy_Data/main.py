@@ -1,15 +1,21 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from requests import HTTPError
 
-from Fish_Alchemy_Data.database import Base, engine, db_session, URIELPASS
+from Fish_Alchemy_Data.database import engine, async_engine, db_session, URIELPASS
 
 from Fish_Alchemy_Data.Common.Response import HttpException
+from Fish_Alchemy_Data.Common.FastJSON import FastJSONResponse
 from Fish_Alchemy_Data.Common.Role import Role
+from Fish_Alchemy_Data.Common.Payload import dispatcher
+from Fish_Alchemy_Data.Common.Hashing import hasher
+from Fish_Alchemy_Data.Common.Variants import renderer
+from Fish_Alchemy_Data.Common.MediaStore import MediaFiles
+from Fish_Alchemy_Data.Common.MediaSweeper import sweeper
+from Fish_Alchemy_Data.Common.RankRebalancer import rebalancer
+from Fish_Alchemy_Data.Common.QueryMonitor import QueryTimingMiddleware, instrument
 
 from Fish_Alchemy_Data.Entities.Users import User
 from Fish_Alchemy_Data.Entities.Auth import UserAuth
@@ -20,14 +26,23 @@ from Fish_Alchemy_Data.Entities.Tickets import Ticket
 from Fish_Alchemy_Data.Entities.Graphs import Graph
 from Fish_Alchemy_Data.Entities.Nodes import Node
 from Fish_Alchemy_Data.Entities.NodeAssociation import NodeAssociation
+from Fish_Alchemy_Data.Entities.MediaBlobs import MediaBlob
 
-from Fish_Alchemy_Data.Controllers import UsersController, AuthController, GroupsController, ProjectsController, TicketsController, GraphsController, NodesController
+from Fish_Alchemy_Data.Controllers import UsersController, AuthController, GroupsController, ProjectsController, TicketsController, GraphsController, NodesController, DiagnosticsController
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    Base.metadata.create_all(bind=engine)
     seed_Uriel()
+    dispatcher.start()
+    sweeper.start()
+    rebalancer.start()
     yield
+    rebalancer.stop()
+    sweeper.stop()
+    dispatcher.stop()
+    hasher.shutdown()
+    renderer.shutdown()
+    await async_engine.dispose()
 
 app = FastAPI(lifespan=lifespan, redirect_slashes=False)
 
@@ -38,8 +53,9 @@ app.include_router(ProjectsController.router)
 app.include_router(TicketsController.router)
 app.include_router(GraphsController.router)
 app.include_router(NodesController.router)
+app.include_router(DiagnosticsController.router)
 
-app.mount("/media", StaticFiles(directory="media"), name="media")
+app.mount("/media", MediaFiles(directory="media"), name="media")
 
 app.add_middleware(
     CORSMiddleware,
@@ -52,10 +68,14 @@ app.add_middleware(
 
 app.add_middleware(SessionMiddleware, secret_key="supersecret", https_only=False)
 
+instrument(engine)
+instrument(async_engine)
+app.add_middleware(QueryTimingMiddleware)
+
 @app.exception_handler(HttpException)
 def HttpExceptionHandler(request: Request, exception: HttpException):
-    return JSONResponse(
-        exception.response.model_dump(),
+    return FastJSONResponse(
+        exception.response,
         status_code=exception.status_code
     )
 